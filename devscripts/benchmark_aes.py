@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import time
+
+from yt_dlp.aes import BLOCK_SIZE_BYTES, _aes_cbc_decrypt_words, aes_decrypt, key_expansion, xor
+from yt_dlp.dependencies import Cryptodome
+from yt_dlp.utils import bytes_to_intlist, intlist_to_bytes
+
+
+def list_cbc_decrypt(data, key, iv):
+    """The block-by-block implementation on lists of ints, used before the lookup tables"""
+    data, key, iv = map(bytes_to_intlist, (data, key, iv))
+    expanded_key = key_expansion(key)
+    decrypted_data = []
+    previous_cipher_block = iv
+    for i in range(0, len(data), BLOCK_SIZE_BYTES):
+        block = data[i:i + BLOCK_SIZE_BYTES]
+        decrypted_data += xor(aes_decrypt(block, expanded_key), previous_cipher_block)
+        previous_cipher_block = block
+    return intlist_to_bytes(decrypted_data)
+
+
+IMPLEMENTATIONS = {
+    'list': list_cbc_decrypt,
+    'tables': _aes_cbc_decrypt_words,
+}
+if Cryptodome.AES:
+    IMPLEMENTATIONS['pycryptodome'] = lambda data, key, iv: Cryptodome.AES.new(key, Cryptodome.AES.MODE_CBC, iv).decrypt(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the AES-CBC decryption throughput')
+    parser.add_argument('--size', type=int, default=1024, help='Size of the data in KiB (default: %(default)s)')
+    parser.add_argument('--key-size', type=int, default=16, choices=(16, 24, 32), help='Key size in bytes (default: %(default)s)')
+    args = parser.parse_args()
+
+    data, key, iv = os.urandom(args.size * 1024), os.urandom(args.key_size), os.urandom(BLOCK_SIZE_BYTES)
+    expected = None
+    for name, func in IMPLEMENTATIONS.items():
+        start = time.perf_counter()
+        result = func(data, key, iv)
+        elapsed = time.perf_counter() - start
+        expected = expected or result
+        assert result == expected, f'{name} gave a different result'
+        print(f'{name:<14} {args.size / 1024 / elapsed:8.2f} MiB/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import json
+import resource
+import subprocess
+import tempfile
+import time
+
+from test.helper import FakeYDL
+from yt_dlp.archive import ARCHIVE_BACKENDS, open_download_archive
+
+
+def measure(fn, backend):
+    """Load the archive in this process and report the load time, RSS and lookup rate"""
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    archive = open_download_archive(FakeYDL(), fn, backend)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, 200000, 2):
+        f'youtube {i:011d}' in archive
+    lookup_time = time.perf_counter() - start
+    archive.close()
+
+    return {
+        'load_time': load_time,
+        'lookups_per_sec': 100000 / lookup_time,
+        # ru_maxrss is in KiB on Linux
+        'rss_mib': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_rss) / 1024,
+    }
+
+
+def generate(fn, count, backend):
+    archive = open_download_archive(FakeYDL(), fn, backend)
+    ids = (f'youtube {i:011d}' for i in range(count))
+    if backend == 'sqlite':
+        archive.add_many(ids)
+    else:
+        with open(fn, 'w', encoding='utf-8') as f:
+            f.writelines(f'{vid_id}\n' for vid_id in ids)
+    archive.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the download archive backends')
+    parser.add_argument('counts', nargs='*', type=int, default=[1_000_000, 10_000_000], help='Archive sizes')
+    parser.add_argument('--backend', action='append', choices=list(ARCHIVE_BACKENDS), dest='backends')
+    parser.add_argument('--measure', nargs=2, metavar=('FILE', 'BACKEND'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for count in args.counts:
+            for backend in args.backends or ARCHIVE_BACKENDS:
+                fn = os.path.join(tmpdir, f'{count}.{"sqlite" if backend == "sqlite" else "txt"}')
+                if not os.path.exists(fn):
+                    generate(fn, count, backend)
+                # Each backend is loaded in a fresh process so that the RSS is not shared
+                result = json.loads(subprocess.check_output(
+                    [sys.executable, __file__, '--measure', fn, backend]))
+                print(f'{count:>10} {backend:<8} load {result["load_time"]:7.2f}s  '
+                      f'RSS {result["rss_mib"]:8.1f}MiB  {result["lookups_per_sec"]:10.0f} lookups/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import http.cookiejar
+import tempfile
+import time
+import urllib.request
+
+from yt_dlp.cookies import YoutubeDLCookieJar
+
+
+def generate(fn, count):
+    expires = int(time.time()) + 86400
+    with open(fn, 'w', encoding='utf-8') as f:
+        f.write(YoutubeDLCookieJar._HEADER)
+        for i in range(count):
+            f.write(f'.site{i % (count // 10 or 1)}.example\tTRUE\t/\tFALSE\t{expires}\tname{i}\tvalue{i}\n')
+
+
+def measure(fn, requests):
+    start = time.perf_counter()
+    jar = YoutubeDLCookieJar(fn)
+    jar.load()
+    load_time = time.perf_counter() - start
+
+    urls = [f'https://www.site{i}.example/video/{i}' for i in range(requests)]
+    # The first header also checks the whole jar for expired cookies
+    jar.get_cookie_header('https://example.com/')
+    start = time.perf_counter()
+    for url in urls:
+        jar.get_cookie_header(url)
+    header_time = time.perf_counter() - start
+
+    # Same URLs again, so the headers are served from the cache
+    start = time.perf_counter()
+    for url in urls:
+        jar.get_cookie_header(url)
+    cached_time = time.perf_counter() - start
+
+    # http.cookiejar, which checks every domain of the jar for each request
+    reference = http.cookiejar.CookieJar()
+    for cookie in jar:
+        reference.set_cookie(cookie)
+    start = time.perf_counter()
+    for url in urls:
+        reference.add_cookie_header(urllib.request.Request(url))
+    reference_time = time.perf_counter() - start
+
+    return load_time, requests / header_time, requests / cached_time, requests / reference_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark loading cookie files and generating Cookie headers')
+    parser.add_argument('counts', nargs='*', type=int, default=[50_000], help='Number of cookies in the file')
+    parser.add_argument('--requests', type=int, default=1000, help='Number of headers to generate')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for count in args.counts:
+            fn = os.path.join(tmpdir, f'{count}.txt')
+            generate(fn, count)
+            load_time, header_rate, cached_rate, reference_rate = measure(fn, args.requests)
+            print(f'{count:>8} cookies: load {load_time:6.2f}s  {header_rate:9.0f} headers/s  '
+                  f'{cached_rate:9.0f} cached headers/s  (http.cookiejar: {reference_rate:7.0f} headers/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import copy
+import itertools
+import random
+import time
+
+from yt_dlp import YoutubeDL
+
+VCODECS = ('avc1.64001F', 'avc1.4d401e', 'vp09.00.40.08', 'vp9', 'av01.0.08M.08', 'hev1.1.6.L93.B0', 'none')
+ACODECS = ('mp4a.40.2', 'mp4a.40.5', 'opus', 'vorbis', 'ec-3', 'ac-3', 'none')
+PROTOCOLS = ('https', 'm3u8_native', 'http_dash_segments')
+HEIGHTS = (144, 240, 360, 480, 720, 1080, 1440, 2160)
+
+
+def make_formats(count, seed):
+    rng = random.Random(seed)
+    formats = []
+    for i, (vcodec, acodec) in zip(range(count), itertools.cycle(itertools.product(VCODECS, ACODECS))):
+        if vcodec == acodec == 'none':
+            acodec = 'opus'
+        height = None if vcodec == 'none' else rng.choice(HEIGHTS)
+        formats.append({
+            'format_id': f'f{i}',
+            'url': f'https://media.example/{i}.{"webm" if "vp" in vcodec or acodec == "opus" else "mp4"}',
+            'ext': 'webm' if 'vp' in vcodec or acodec == 'opus' else 'mp4',
+            'vcodec': vcodec,
+            'acodec': acodec,
+            'protocol': rng.choice(PROTOCOLS),
+            'height': height,
+            'width': height and height * 16 // 9,
+            'fps': rng.choice((24, 30, 60)) if height else None,
+            'tbr': rng.uniform(50, 8000),
+            'language': rng.choice(('en', 'de', None)),
+        })
+    return formats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark format sorting and selection')
+    parser.add_argument('--videos', type=int, default=200, help='Number of videos')
+    parser.add_argument('--formats', type=int, default=150, help='Number of formats of each video')
+    parser.add_argument('-f', '--format', default=None, help='Format selector (default: the default format spec)')
+    parser.add_argument('-S', '--format-sort', default=None, help='Comma-separated format sort order')
+    args = parser.parse_args()
+
+    params = {'simulate': True, 'quiet': True}
+    if args.format:
+        params['format'] = args.format
+    if args.format_sort:
+        params['format_sort'] = args.format_sort.split(',')
+    ydl = YoutubeDL(params)
+    ydl.process_info = lambda info_dict: None
+    videos = [{
+        'id': f'video{i}',
+        'title': f'Video {i}',
+        'extractor': 'test',
+        'extractor_key': 'Test',
+        'webpage_url': f'https://example.com/{i}',
+        'formats': make_formats(args.formats, i),
+    } for i in range(args.videos)]
+
+    sort_input = copy.deepcopy(videos)
+    start = time.perf_counter()
+    for info in sort_input:
+        ydl.sort_formats(info)
+    sort_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for info in videos:
+        ydl.process_video_result(info, download=False)
+    total_time = time.perf_counter() - start
+
+    print(f'{args.videos} videos with {args.formats} formats: '
+          f'sorting {sort_time / args.videos * 1000:.2f}ms/video, '
+          f'processing (sorting and selection) {total_time / args.videos * 1000:.2f}ms/video')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import http.server
+import multiprocessing
+import resource
+import time
+
+from test.helper import http_server_port
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.http import HttpFD
+from yt_dlp.networking import Request
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+CHUNK = b'\0' * (1024 * 1024)
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        size = int(self.path[1:])
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', size)
+        self.end_headers()
+        for _ in range(size // len(CHUNK)):
+            self.wfile.write(CHUNK)
+
+
+def serve(port_queue):
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), HTTPTestRequestHandler)
+    port_queue.put(http_server_port(httpd))
+    httpd.serve_forever()
+
+
+class NullStream:
+    def write(self, data):
+        return len(data)
+
+    def seek(self, pos):
+        pass
+
+    def truncate(self):
+        pass
+
+
+def read_loop(ydl, url):
+    with ydl.urlopen(Request(url)) as response:
+        while response.read(1024 * 1024):
+            pass
+
+
+def readinto_loop(ydl, url):
+    buffer = memoryview(bytearray(1024 * 1024))
+    with ydl.urlopen(Request(url)) as response:
+        while response.readinto(buffer):
+            pass
+
+
+def httpfd(ydl, url):
+    assert HttpFD(ydl, ydl.params).real_download(NullStream(), {'url': url})
+
+
+LOOPS = {
+    'read': read_loop,
+    'readinto': readinto_loop,
+    'HttpFD': httpfd,
+}
+
+
+def measure(func, ydl, url):
+    """@returns the wall time and the CPU time used by this process"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    func(ydl, url)
+    wall_time = time.perf_counter() - start
+    end_usage = resource.getrusage(resource.RUSAGE_SELF)
+    return wall_time, (end_usage.ru_utime - usage.ru_utime) + (end_usage.ru_stime - usage.ru_stime)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the CPU cost of the HTTP download loop')
+    parser.add_argument('--size', type=int, default=2048, help='Size of the download in MiB (default: %(default)s)')
+    parser.add_argument('--buffer-size', type=int, default=1024, help='Initial block size (default: %(default)s)')
+    parser.add_argument('--no-resize-buffer', action='store_true', help='Do not resize the block size')
+    parser.add_argument(
+        '--loop', action='append', choices=list(LOOPS), dest='loops', help='Download loop to measure (default: all)')
+    args = parser.parse_args()
+
+    port_queue = multiprocessing.Queue()
+    # The server runs in its own process, so that its CPU time is not counted
+    server = multiprocessing.Process(target=serve, args=(port_queue,), daemon=True)
+    server.start()
+    url = f'http://127.0.0.1:{port_queue.get()}/{args.size * 1024 * 1024}'
+
+    ydl = YoutubeDL({
+        'logger': FakeLogger(),
+        'noprogress': True,
+        'buffersize': args.buffer_size,
+        'noresizebuffer': args.no_resize_buffer,
+    })
+    gib = args.size / 1024
+    for name in args.loops or LOOPS:
+        wall_time, cpu_time = measure(LOOPS[name], ydl, url)
+        print(f'{name:<10} {gib / wall_time:6.2f} GiB/s  CPU {cpu_time / gib:6.3f}s/GiB')
+    server.terminate()
+
+
+if __name__ == '__main__':
+    main()
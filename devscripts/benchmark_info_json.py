@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import functools
+import json
+import tempfile
+import time
+import tracemalloc
+
+from yt_dlp import YoutubeDL
+from yt_dlp.utils import write_json_file
+
+
+def make_playlist(count, formats, comments):
+    return {
+        '_type': 'playlist',
+        'id': 'playlist',
+        'title': 'Playlist',
+        'extractor': 'test',
+        'extractor_key': 'Test',
+        'webpage_url': 'https://example.com/playlist',
+        'entries': [{
+            'id': f'video{i}',
+            'title': f'Video {i}',
+            'description': 'Description ' * 20,
+            'webpage_url': f'https://example.com/{i}',
+            'formats': [{
+                'format_id': f'f{j}',
+                'url': f'https://media.example/{i}/{j}.mp4?signature={"0" * 100}',
+                'ext': 'mp4',
+                'height': 144 * (j % 8 + 1),
+                'tbr': j * 100.5,
+                'http_headers': {'User-Agent': 'Mozilla/5.0'},
+            } for j in range(formats)],
+            'comments': [{
+                'id': f'c{j}',
+                'text': 'Comment ' * 10,
+                'author': f'author{j}',
+                'timestamp': 1700000000 + j,
+            } for j in range(comments)],
+        } for i in range(count)],
+    }
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the memory used to write playlists as JSON')
+    parser.add_argument('--entries', type=int, default=5000, help='Number of entries of the playlist')
+    parser.add_argument('--formats', type=int, default=20, help='Number of formats of each entry')
+    parser.add_argument('--comments', type=int, default=20, help='Number of comments of each entry')
+    args = parser.parse_args()
+
+    ydl = YoutubeDL({'quiet': True})
+    info = make_playlist(args.entries, args.formats, args.comments)
+
+    with tempfile.TemporaryDirectory() as tmpdir, open(os.devnull, 'w', encoding='utf-8') as devnull:
+        fn = os.path.join(tmpdir, 'playlist.info.json')
+        cases = {
+            # What --write-info-json and -J did before the entries were streamed
+            'infojson (whole document)': lambda: write_json_file(ydl.sanitize_info(info), fn),
+            'infojson (streamed)': lambda: write_json_file(info, fn, encoder=functools.partial(
+                ydl._iter_info_json, ensure_ascii=False)),
+            'infojson (JSON Lines)': lambda: write_json_file(info, fn, encoder=functools.partial(
+                ydl._iter_info_json, ensure_ascii=False, json_lines=True)),
+            '-J (whole document)': lambda: devnull.write(json.dumps(ydl.sanitize_info(info))),
+            '-J (streamed)': lambda: devnull.writelines(ydl._iter_info_json(info)),
+        }
+        print(f'Playlist of {args.entries} entries with {args.formats} formats and {args.comments} comments')
+        for name, func in cases.items():
+            elapsed, peak = measure(func)
+            print(f'{name:>26}: peak {peak / 2 ** 20:8.1f}MiB  {elapsed:6.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import time
+
+from yt_dlp.jsinterp import JSInterpreter
+
+# Has the same structure as the n-parameter function of the YouTube player
+NSIG_CODE = r'''var Xha=function(a){var b=a.split(""),c=[function(d,e){e=(e%d.length+d.length)%d.length;d.splice(-e).reverse().forEach(function(f){d.unshift(f)})},
+-1817342419,1276390938,function(d,e){d.push(e)},
+function(d){d.reverse()},
+function(d,e){e=(e%d.length+d.length)%d.length;var f=d[0];d[0]=d[e];d[e]=f},
+1586347419,b,null,"split",
+function(d,e){for(e=(e%d.length+d.length)%d.length;e--;)d.unshift(d.pop())},
+function(d,e){e=(e%d.length+d.length)%d.length;d.splice(e,1)},
+-2044376153,"’",1420547811,
+function(d,e){for(var f=64,h=[];++f-h.length-32;){switch(f){case 58:f-=14;case 91:case 92:case 93:continue;case 123:f=47;case 94:case 95:case 96:continue;case 46:f=95;default:h.push(String.fromCharCode(f))}}d.forEach(function(l,m,n){n[m]=h[(h.indexOf(l)-h.indexOf(this[m])+m-32+f--)%h.length]},e.split(""))},
+-704040451,"mVPMdNBx3Qz7LkP0aWcRt9YuIoEs2DfGhJ1ZxCvBn",
+function(d,e){e=(e%d.length+d.length)%d.length;d.splice(0,1,d.splice(e,1,d[0])[0])}
+];c[8]=c;
+try{c[4](c[7]),c[5](c[7],c[1]),c[10](c[7],c[2]),c[15](c[7],c[17]),c[11](c[7],c[6]),c[18](c[7],c[12]),c[0](c[7],c[14]),c[3](c[7],c[13]),c[5](c[7],c[16]),c[4](c[7]),c[15](c[7],c[17]),c[10](c[7],c[1]),c[18](c[7],c[6]),c[11](c[7],c[2]),c[0](c[7],c[12])}catch(d){return"enhanced_except_"+a}return b.join("")};'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the JS interpreter on an nsig-like function')
+    parser.add_argument('--calls', type=int, default=50, help='Number of calls (default: %(default)s)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    func = JSInterpreter(NSIG_CODE).extract_function('Xha')
+    print(f'extract   {(time.perf_counter() - start) * 1000:8.2f}ms')
+
+    start = time.perf_counter()
+    func(['first call'])
+    print(f'first     {(time.perf_counter() - start) * 1000:8.2f}ms')
+
+    start = time.perf_counter()
+    for i in range(args.calls):
+        func([f'abcdefghijklmnop{i}'])
+    print(f'per call  {(time.perf_counter() - start) * 1000 / args.calls:8.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -14,10 +14,11 @@
 
 NO_ATTR = object()
 STATIC_CLASS_PROPERTIES = [
-    'IE_NAME', '_ENABLED', '_VALID_URL',  # Used for URL matching
+    'IE_NAME', '_ENABLED', '_VALID_URL', '_URL_TOKENS',  # Used for URL matching
     '_WORKING', 'IE_DESC', '_NETRC_MACHINE', 'SEARCH_KEY',  # Used for --extractor-descriptions
     'age_limit',  # Used for --age-limit (evaluated)
     '_RETURN_TYPE',  # Accessed in CLI only with instance (evaluated)
+    '_EMBED_ANCHORS',  # Used for embed detection in generic webpages
 ]
 CLASS_METHODS = [
     'ie_key', 'suitable', '_match_valid_url',  # Used for URL matching
@@ -9,11 +9,19 @@
 
 
 import http.server
+import re
 import threading
 
-from test.helper import FakeYDL, expect_dict, expect_value, http_server_port
+from test.helper import (
+    FakeYDL,
+    expect_dict,
+    expect_value,
+    gettestcases,
+    http_server_port,
+)
 from yt_dlp.compat import compat_etree_fromstring
-from yt_dlp.extractor import YoutubeIE, get_info_extractor
+from yt_dlp.extractor import YoutubeIE, gen_extractor_classes, get_info_extractor
+from yt_dlp.extractor._embedindex import EmbedScanner, embed_regex_anchors
 from yt_dlp.extractor.common import InfoExtractor
 from yt_dlp.utils import (
     ExtractorError,
@@ -1906,6 +1914,37 @@ def test_response_with_expected_status_returns_content(self):
             expected_status=TEAPOT_RESPONSE_STATUS)
         self.assertEqual(content, TEAPOT_RESPONSE_BODY)
 
+    def test_embed_regex_anchors(self):
+        self.assertEqual(embed_regex_anchors([
+            r'<iframe[^>]+src=["\'](?P<url>(?:https?:)?//(?:www\.)?example\.com/embed/\d+)',
+        ]), (('example.com/embed/', False),))
+        self.assertEqual(embed_regex_anchors([
+            r'(?i)<iframe[^>]+src=["\'](?P<url>https?://(?:foo|bar)\.Example\.net/v/\w+)',
+        ]), (('://bar.example.net/v/', True), ('://foo.example.net/v/', True)))
+        self.assertEqual(embed_regex_anchors([]), ())
+        self.assertIsNone(embed_regex_anchors([r'<a[^>]+>(?P<url>v/\d+)']))
+
+        scanner = EmbedScanner('<IFRAME SRC="https://FOO.EXAMPLE.NET/v/1">')
+        self.assertTrue(scanner.may_match((('foo.example.net/v/', True),)))
+        self.assertFalse(scanner.may_match((('foo.example.net/v/', False),)))
+        self.assertFalse(scanner.may_match(()))
+        self.assertTrue(scanner.may_match(None))
+        self.assertTrue(EmbedScanner('<iframe src="https://ſtreamable.com/e/1">').may_match((('streamable', True),)))
+
+    def test_embed_anchors_match_embed_regex(self):
+        ies = [ie.real_class if hasattr(ie, 'real_class') else ie for ie in gen_extractor_classes()]
+        ies = [ie for ie in ies if ie._EMBED_ANCHORS]
+        for tc in gettestcases(include_onlymatching=True):
+            url = tc['url']
+            for webpage in (f'<iframe src="{url}"></iframe>', f'<a href="{url}">', f'<IFRAME SRC="{url.upper()}">'):
+                scanner = EmbedScanner(webpage)
+                for ie in ies:
+                    if scanner.may_match(ie._EMBED_ANCHORS):
+                        continue
+                    for regex in ie._EMBED_REGEX:
+                        self.assertIsNone(
+                            re.search(regex, webpage), f'{ie.__name__} embed regex matched but anchors did not: {webpage}')
+
 
 if __name__ == '__main__':
     unittest.main()
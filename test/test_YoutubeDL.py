@@ -19,6 +19,7 @@
 from yt_dlp.postprocessor.common import PostProcessor
 from yt_dlp.utils import (
     ExtractorError,
+    FormatSorter,
     LazyList,
     OnDemandPagedList,
     int_or_none,
@@ -521,6 +522,61 @@ def test_format_filtering(self):
             pass
         self.assertEqual(ydl.downloaded_info_dicts, [])
 
+    def test_format_sorter_reuse(self):
+        ydl = YDL()
+
+        def sorted_ids(ydl, fields):
+            info_dict = _make_result([
+                {'format_id': 'A', 'height': 1080, 'vcodec': 'avc1', 'url': TEST_URL},
+                {'format_id': 'B', 'height': 720, 'vcodec': 'vp9', 'url': TEST_URL},
+                {'format_id': 'C', 'height': 480, 'vcodec': 'av01', 'url': TEST_URL},
+            ], _format_sort_fields=fields)
+            ydl.sort_formats(info_dict)
+            return [f['format_id'] for f in info_dict['formats']]
+
+        # The sorters of different sort orders must not affect each other
+        cases = [((), ['C', 'B', 'A']), (('+res',), ['A', 'B', 'C']), (('res:720',), ['A', 'C', 'B'])]
+        for _ in range(2):
+            for fields, expected in cases:
+                self.assertEqual(sorted_ids(ydl, fields), expected)
+                self.assertEqual(sorted_ids(YDL(), fields), expected)
+        self.assertEqual(len(ydl._format_sorters), 3)
+
+        ydl.params['format_sort'] = ['+res']
+        self.assertEqual(sorted_ids(ydl, ()), ['A', 'B', 'C'])
+        self.assertEqual(len(ydl._format_sorters), 4)
+
+    def test_format_sort_keys(self):
+        formats = [
+            {'format_id': 'A', 'height': 1080, 'vcodec': 'avc1', 'url': TEST_URL},
+            {'format_id': 'B', 'height': 720, 'vcodec': 'vp9', 'url': TEST_URL},
+        ]
+        # The ranks of the codecs are remembered across the sorters
+        FormatSorter._rank_ordered_value.cache_clear()
+        for _ in range(3):
+            YDL().sort_formats(_make_result(copy.deepcopy(formats)))
+        cache_info = FormatSorter._rank_ordered_value.cache_info()
+        self.assertGreater(cache_info.hits, 0)
+        self.assertLessEqual(cache_info.currsize, cache_info.maxsize)
+
+        ydl = YDL({'verbose': True, 'listformats': True})
+        messages = []
+        ydl.write_debug = messages.append
+        ydl.sort_formats(_make_result(copy.deepcopy(formats)))
+        self.assertEqual(messages[-3], 'Sort keys of the formats, from worst to best:')
+        self.assertRegex(messages[-2], r'^  B: .* res=0,720(\.0)?,0 ')
+        self.assertRegex(messages[-1], r'^  A: .* res=0,1080(\.0)?,0 ')
+        self.assertEqual(
+            ydl._get_format_sorter([]).get_sort_key(formats[0])['res'], (0, 1080, 0))
+
+    def test_format_selector_reuse(self):
+        ydl = YDL({'format': None})
+        for i in range(3):
+            ydl.process_ie_result(_make_result(
+                [{'format_id': f'{i}-{j}', 'height': j, 'url': TEST_URL} for j in range(3)], id=str(i)))
+        self.assertEqual([d['format_id'] for d in ydl.downloaded_info_dicts], ['0-2', '1-2', '2-2'])
+        self.assertEqual(len(ydl._format_selectors), 1)
+
     def test_default_format_spec(self):
         ydl = YDL({'simulate': True})
         self.assertEqual(ydl._default_format_spec({}), 'bestvideo*+bestaudio/best')
@@ -1218,6 +1274,70 @@ def _real_extract(self, url):
         self.assertEqual(downloaded['extractor'], 'Video')
         self.assertEqual(downloaded['extractor_key'], 'Video')
 
+    def test_concurrent_extractions(self):
+        import threading
+        import time
+
+        class _YDL(YDL):
+            def trouble(self, s, tb=None):
+                pass
+
+        ydl = _YDL({'concurrent_extractions': 4, 'ignoreerrors': True})
+        lock = threading.Lock()
+        running = []
+        extracted = []
+        max_running = 0
+        initialized = 0
+
+        class VideoIE(InfoExtractor):
+            _VALID_URL = r'video:(?P<id>\d+)'
+
+            def _real_initialize(self):
+                nonlocal initialized
+                time.sleep(0.05)
+                initialized += 1
+
+            def _real_extract(self, url):
+                nonlocal max_running
+                video_id = self._match_id(url)
+                with lock:
+                    running.append(video_id)
+                    extracted.append(video_id)
+                time.sleep(0.05)
+                with lock:
+                    max_running = max(max_running, len(running))
+                    running.remove(video_id)
+                if video_id == '3':
+                    raise ExtractorError('foo')
+                return {
+                    'id': video_id,
+                    'title': f'Video {video_id}',
+                    'url': TEST_URL,
+                }
+
+        class PlaylistIE(InfoExtractor):
+            _VALID_URL = r'playlist:'
+
+            def _real_extract(self, url):
+                return self.playlist_result(
+                    self.url_result(f'video:{i}', VideoIE) for i in range(8))
+
+        ydl.add_info_extractor(VideoIE(ydl))
+        ydl.add_info_extractor(PlaylistIE(ydl))
+        info = ydl.extract_info('playlist:')
+
+        self.assertEqual(sorted(extracted, key=int), [str(i) for i in range(8)])
+        self.assertGreater(max_running, 1)
+        # The extractor is initialized (e.g. logged in) only once
+        self.assertEqual(initialized, 1)
+        self.assertEqual(
+            [d['id'] for d in ydl.downloaded_info_dicts], ['0', '1', '2', '4', '5', '6', '7'])
+        self.assertEqual(
+            [d['playlist_index'] for d in ydl.downloaded_info_dicts], [1, 2, 3, 5, 6, 7, 8])
+        self.assertEqual(len(info['entries']), 8)
+        self.assertIsNone(info['entries'][3])
+        self.assertEqual(ydl._prefetched_extractions, {})
+
     def test_header_cookies(self):
         from http.cookiejar import Cookie
 
@@ -1322,6 +1442,76 @@ def test(initial_info, note):
 
         try_rm(TEST_FILE)
 
+    def test_forced_printings(self):
+        ydl = FakeYDL({'forcetitle': True, 'forceid': True, 'forceurl': True, 'simulate': True})
+        output = []
+        ydl.to_stdout = output.append
+        ydl.process_ie_result(_make_result([{'format_id': 'a', 'url': TEST_URL, 'ext': 'mp4'}]))
+        self.assertEqual(output, ['testttitle', 'testid', TEST_URL])
+
+    def test_info_json_streaming(self):
+        TEST_FILE = 'test_info_json_streaming.info.json'
+
+        def make_playlist():
+            return {
+                '_type': 'playlist',
+                'id': 'playlist',
+                'title': 'Playlist \u00e9',
+                'extractor': 'test:playlist',
+                'extractor_key': 'test:playlist',
+                'webpage_url': 'http://example.com/playlist',
+                'entries': [
+                    {'id': '1', 'title': '1', 'url': TEST_URL, 'tags': {'a'}, '__private': 1},
+                    None,
+                    {
+                        '_type': 'playlist',
+                        'id': 'nested',
+                        'extractor': 'test:playlist',
+                        'extractor_key': 'test:playlist',
+                        'webpage_url': 'http://example.com/nested',
+                        'entries': ({'id': '2', 'title': '2', 'url': TEST_URL},),
+                    },
+                ],
+            }
+
+        ydl = YDL()
+        for remove_private_keys in (False, True):
+            for ensure_ascii in (False, True):
+                info = make_playlist()
+                self.assertEqual(
+                    ''.join(ydl._iter_info_json(info, remove_private_keys, ensure_ascii)),
+                    json.dumps(ydl.sanitize_info(info, remove_private_keys), ensure_ascii=ensure_ascii))
+
+        info = make_playlist()
+        lines = ''.join(ydl._iter_info_json(info, json_lines=True)).split('\n')
+        expected = ydl.sanitize_info(info)
+        self.assertEqual(json.loads(lines[0]), {**expected, 'entries': None})
+        self.assertEqual(list(map(json.loads, lines[1:])), expected['entries'])
+
+        ydl = YDL({'writeinfojson': True, 'clean_infojson': False, 'json_lines': True})
+        self.assertTrue(ydl._write_info_json('test', make_playlist(), TEST_FILE))
+        with open(TEST_FILE, encoding='utf-8') as f:
+            self.assertEqual(len(f.read().splitlines()), 4)
+
+        output = []
+        ydl = YDL({'dump_single_json': True, 'json_lines': True, 'clean_infojson': False})
+
+        def write_string(message, out=None, only_once=False):
+            if out is ydl._out_files.out:
+                output.append(message)
+
+        ydl._write_string = write_string
+        ydl.download_with_info_file(TEST_FILE)
+        self.assertEqual([i['id'] for i in ydl.downloaded_info_dicts], ['1', '2'])
+        lines = ''.join(output).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])['id'], 'playlist')
+        self.assertIsNone(json.loads(lines[0])['entries'])
+        self.assertEqual(json.loads(lines[1])['id'], '1')
+        self.assertEqual(traverse_obj(json.loads(lines[2]), ('entries', 0, 'id')), '2')
+
+        try_rm(TEST_FILE)
+
     def test_add_headers_cookie(self):
         def check_for_cookie_header(result):
             return traverse_obj(result, ((None, ('formats', 0)), 'http_headers', 'Cookie'), casesense=False, get_all=False)
@@ -8,8 +8,11 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import http.cookiejar
 import re
 import tempfile
+import time
+import urllib.request
 
 from yt_dlp.cookies import YoutubeDLCookieJar
 
@@ -61,6 +64,102 @@ def test_get_cookies_for_url(self):
         cookies = cookiejar.get_cookies_for_url('https://foobar.foobar/')
         self.assertFalse(cookies)
 
+    @staticmethod
+    def _make_cookie(domain, name, value, path='/', secure=False, expires=None):
+        return http.cookiejar.Cookie(
+            0, name, value, None, False, domain, domain.startswith('.'), domain.startswith('.'),
+            path, False, secure, expires, expires is None, None, None, {})
+
+    def test_cookie_header_matches_cookiejar(self):
+        cookiejar = YoutubeDLCookieJar()
+        reference = http.cookiejar.CookieJar()
+        expires = int(time.time()) + 3600
+        cookies = [
+            ('.foobar.foobar', 'a', '1', '/'),
+            ('www.foobar.foobar', 'b', '2', '/'),
+            ('foobar.foobar', 'c', '3', '/'),
+            ('.www.foobar.foobar', 'd', '4', '/path'),
+            ('other.foobar', 'e', '5', '/'),
+            ('.ar.foobar', 'f', '6', '/'),
+            ('127.0.0.1', 'g', '7', '/'),
+            ('localhost.local', 'h', '8', '/'),
+            ('.foobar.foobar', 'i', '9', '/path/sub'),
+        ]
+        for domain, name, value, path in cookies:
+            for jar in (cookiejar, reference):
+                jar.set_cookie(self._make_cookie(domain, name, value, path, expires=expires))
+        cookiejar.set_cookie(self._make_cookie('.foobar.foobar', 'secure', 'x', secure=True))
+        reference.set_cookie(self._make_cookie('.foobar.foobar', 'secure', 'x', secure=True))
+
+        for url in (
+            'https://www.foobar.foobar/', 'http://www.foobar.foobar/path/sub/file?query',
+            'https://foobar.foobar/path', 'http://sub.www.foobar.foobar/path', 'https://other.foobar/',
+            'http://127.0.0.1:8080/', 'http://localhost/', 'https://unrelated.example/',
+        ):
+            request = urllib.request.Request(url)
+            reference.add_cookie_header(request)
+            self.assertEqual(cookiejar.get_cookie_header(url), request.get_header('Cookie'), url)
+            # Cached header
+            self.assertEqual(cookiejar.get_cookie_header(url), request.get_header('Cookie'), url)
+
+    def test_cookie_header_cache_invalidation(self):
+        cookiejar = YoutubeDLCookieJar()
+        cookiejar.set_cookie(self._make_cookie('.foobar.foobar', 'a', '1'))
+        self.assertEqual(cookiejar.get_cookie_header('https://www.foobar.foobar/'), 'a=1')
+
+        cookiejar.set_cookie(self._make_cookie('.foobar.foobar', 'a', '2'))
+        self.assertEqual(cookiejar.get_cookie_header('https://www.foobar.foobar/'), 'a=2')
+
+        cookiejar.set_cookie(self._make_cookie('www.foobar.foobar', 'b', '3', expires=int(time.time()) + 3600))
+        self.assertEqual(cookiejar.get_cookie_header('https://www.foobar.foobar/'), 'a=2; b=3')
+
+        cookiejar.clear('.foobar.foobar')
+        self.assertEqual(cookiejar.get_cookie_header('https://www.foobar.foobar/'), 'b=3')
+
+        # Expired cookies are not returned and are removed from the jar
+        next(iter(cookiejar)).expires = int(time.time()) - 1
+        cookiejar._invalidate()
+        self.assertIsNone(cookiejar.get_cookie_header('https://www.foobar.foobar/'))
+        self.assertEqual(len(cookiejar), 0)
+
+        cookiejar.set_cookie(self._make_cookie('.foobar.foobar', 'c', '4'))
+        cookiejar.clear()
+        self.assertIsNone(cookiejar.get_cookie_header('https://www.foobar.foobar/'))
+
+    def test_load_save_round_trip(self):
+        cookiejar = YoutubeDLCookieJar()
+        expires = int(time.time()) + 3600
+        for i in range(100):
+            cookiejar.set_cookie(self._make_cookie(f'.site{i}.foobar', f'name{i}', f'value{i}', expires=expires))
+        cookiejar.set_cookie(self._make_cookie('www.foobar.foobar', 'session', 'value'))
+        cookiejar.set_cookie(self._make_cookie('www.foobar.foobar', '', 'novalue'))
+
+        tf = tempfile.NamedTemporaryFile(delete=False)
+        try:
+            cookiejar.save(filename=tf.name)
+            loaded = YoutubeDLCookieJar(tf.name)
+            loaded.load()
+        finally:
+            tf.close()
+            os.remove(tf.name)
+
+        self.assertEqual(len(loaded), 102)
+        self.assertEqual(loaded.get_cookie_header('https://www.site42.foobar/'), 'name42=value42')
+        session_cookie = loaded._cookies['www.foobar.foobar']['/']['session']
+        self.assertIsNone(session_cookie.expires)
+        self.assertTrue(session_cookie.discard)
+        self.assertIsNone(loaded._cookies['www.foobar.foobar']['/']['novalue'].value)
+
+    def test_load_requires_header(self):
+        tf = tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8')
+        try:
+            tf.write('www.foobar.foobar\tFALSE\t/\tFALSE\t0\tname\tvalue\n')
+            tf.close()
+            with self.assertRaises(http.cookiejar.LoadError):
+                YoutubeDLCookieJar(tf.name).load()
+        finally:
+            os.remove(tf.name)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -9,8 +9,10 @@
 
 
 import base64
+import random
 
 from yt_dlp.aes import (
+    BLOCK_SIZE_BYTES,
     aes_cbc_decrypt,
     aes_cbc_decrypt_bytes,
     aes_cbc_encrypt,
@@ -25,6 +27,7 @@
     aes_gcm_decrypt_and_verify_bytes,
     key_expansion,
     pad_block,
+    xor,
 )
 from yt_dlp.dependencies import Cryptodome
 from yt_dlp.utils import bytes_to_intlist, intlist_to_bytes
@@ -52,6 +55,22 @@ def test_cbc_decrypt(self):
             decrypted = aes_cbc_decrypt_bytes(data, intlist_to_bytes(self.key), intlist_to_bytes(self.iv))
             self.assertEqual(decrypted.rstrip(b'\x08'), self.secret_msg)
 
+    def test_cbc_decrypt_tables(self):
+        # The table driven implementation must match decrypting each block with aes_decrypt
+        rng = random.Random(0)
+        for key_size in (16, 24, 32):
+            key = [rng.randrange(256) for _ in range(key_size)]
+            expanded_key = key_expansion(key)
+            for length in (0, 5, 16, 48, 70):
+                data = [rng.randrange(256) for _ in range(length)]
+                expected, previous_cipher_block = [], self.iv
+                for i in range(0, length, BLOCK_SIZE_BYTES):
+                    block = data[i:i + BLOCK_SIZE_BYTES]
+                    block += [0] * (BLOCK_SIZE_BYTES - len(block))
+                    expected += xor(aes_decrypt(block, expanded_key), previous_cipher_block)
+                    previous_cipher_block = block
+                self.assertEqual(aes_cbc_decrypt(data, key, self.iv), expected[:length], (key_size, length))
+
     def test_cbc_encrypt(self):
         data = bytes_to_intlist(self.secret_msg)
         encrypted = intlist_to_bytes(aes_cbc_encrypt(data, self.key, self.iv))
@@ -12,6 +12,7 @@
 
 from test.helper import gettestcases
 from yt_dlp.extractor import FacebookIE, YoutubeIE, gen_extractors
+from yt_dlp.extractor._urlindex import URLDispatchIndex, url_regex_tokens
 
 
 class TestAllURLsMatching(unittest.TestCase):
@@ -82,6 +83,25 @@ def test_no_duplicates(self):
                         ie.suitable(url),
                         f'{type(ie).__name__} should not match URL {url!r} . That URL belongs to {tc["name"]}.')
 
+    def test_url_dispatch_index(self):
+        ies = {ie.ie_key(): ie for ie in self.ies}
+        index = URLDispatchIndex(ies)
+        for tc in gettestcases(include_onlymatching=True):
+            for url in (tc['url'], tc['url'].upper()):
+                ie = ies[tc['name']]
+                if ie.suitable(url):
+                    self.assertIn((tc['name'], ie), list(index.candidates(url)),
+                                  f'{type(ie).__name__} should be a candidate for URL {url!r}')
+
+    def test_url_regex_tokens(self):
+        self.assertEqual(url_regex_tokens(r'https?://(?:www\.)?example\.com/(?P<id>\d+)'), ('example',))
+        self.assertEqual(url_regex_tokens(r'https?://(?:www\.)?(?:foo\.com|fo\.o)/'), ('fo', 'foo'))
+        self.assertEqual(url_regex_tokens(r'(?i)https?://(?:[^/]+\.)?Vid[/?#]'), ('vid',))
+        self.assertEqual(url_regex_tokens(r'https?://vid\.(?:[a-z]+)/\w+'), ('vid',))
+        self.assertIsNone(url_regex_tokens(r'[^/]+example'))
+        self.assertIsNone(url_regex_tokens(r'ytsearch(?:\d+|all)?:'))
+        self.assertIsNone(url_regex_tokens(r'.*'))
+
     def test_keywords(self):
         self.assertMatch(':ytsubs', ['youtube:subscriptions'])
         self.assertMatch(':ytsubscriptions', ['youtube:subscriptions'])
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import multiprocessing
+import shutil
+
+from test.helper import FakeYDL
+from yt_dlp.archive import SQLiteDownloadArchive, open_download_archive
+from yt_dlp.dependencies import sqlite3
+
+TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testdata', 'archive_test')
+
+
+def _write_many(fn, start):
+    archive = SQLiteDownloadArchive(FakeYDL(), fn)
+    for i in range(start, start + 50):
+        archive.add(f'youtube {i}')
+    archive.close()
+
+
+class TestDownloadArchive(unittest.TestCase):
+    def setUp(self):
+        self.tearDown()
+        os.makedirs(TEST_DIR)
+
+    def tearDown(self):
+        if os.path.exists(TEST_DIR):
+            shutil.rmtree(TEST_DIR)
+
+    def _test_archive(self, backend):
+        fn = os.path.join(TEST_DIR, f'archive.{backend}')
+        archive = open_download_archive(FakeYDL(), fn, backend)
+        self.assertNotIn('youtube abc', archive)
+        archive.add('youtube abc')
+        archive.add_many(['youtube def', 'vimeo 123', 'youtube abc'])
+        self.assertIn('youtube abc', archive)
+        self.assertIn('vimeo 123', archive)
+        self.assertNotIn('vimeo abc', archive)
+        self.assertEqual(len(archive), 3)
+        archive.close()
+
+        archive = open_download_archive(FakeYDL(), fn, backend)
+        self.assertIn('youtube def', archive)
+        self.assertEqual(len(archive), 3)
+        archive.close()
+
+    def test_text_archive(self):
+        self._test_archive('text')
+        with open(os.path.join(TEST_DIR, 'archive.text'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'youtube abc\nyoutube def\nvimeo 123\n')
+
+    def test_compact_archive(self):
+        self._test_archive('compact')
+        with open(os.path.join(TEST_DIR, 'archive.compact'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'youtube abc\nyoutube def\nvimeo 123\n')
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_sqlite_archive(self):
+        self._test_archive('sqlite')
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_sqlite_import(self):
+        text_fn = os.path.join(TEST_DIR, 'archive.txt')
+        with open(text_fn, 'w', encoding='utf-8') as f:
+            f.write('youtube abc\n\nvimeo 123\nyoutube abc\n')
+        archive = SQLiteDownloadArchive(FakeYDL(), os.path.join(TEST_DIR, 'archive.sqlite'))
+        archive.import_text(text_fn)
+        self.assertIn('youtube abc', archive)
+        self.assertIn('vimeo 123', archive)
+        self.assertEqual(len(archive), 2)
+        archive.close()
+
+        with self.assertRaises(OSError):
+            SQLiteDownloadArchive(FakeYDL(), text_fn)
+
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_sqlite_concurrent_writers(self):
+        fn = os.path.join(TEST_DIR, 'archive.sqlite')
+        SQLiteDownloadArchive(FakeYDL(), fn).close()
+        processes = [multiprocessing.Process(target=_write_many, args=(fn, i * 50)) for i in range(4)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        archive = SQLiteDownloadArchive(FakeYDL(), fn)
+        self.assertEqual(len(archive), 200)
+        self.assertIn('youtube 199', archive)
+        archive.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,10 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import json
 import shutil
+import time
+import unittest.mock
 
 from test.helper import FakeYDL
 from yt_dlp.cache import Cache
@@ -52,6 +55,56 @@ def test_cache(self):
         self.assertFalse(os.path.exists(self.test_dir))
         self.assertEqual(c.load('test_cache', 'k.'), None)
 
+    def test_cache_memory(self):
+        c = Cache(FakeYDL({'cachedir': self.test_dir}))
+        c.store('test_cache', 'k', {'x': [1]})
+        # Loads are served from memory, and return a new object each time
+        with unittest.mock.patch('builtins.open', side_effect=AssertionError):
+            obj = c.load('test_cache', 'k')
+            self.assertEqual(obj, {'x': [1]})
+            obj['x'].append(2)
+            self.assertEqual(c.load('test_cache', 'k'), {'x': [1]})
+
+        # A new instance loads the file
+        self.assertEqual(Cache(FakeYDL({'cachedir': self.test_dir})).load('test_cache', 'k'), {'x': [1]})
+
+    def test_cache_ttl(self):
+        c = Cache(FakeYDL({'cachedir': self.test_dir, 'cache_ttl': {'default': 100, 'short': 10}}))
+        c.store('short', 'k', 1)
+        c.store('long', 'k', 2)
+        fn = os.path.join(self.test_dir, 'short', 'k.json')
+        with open(fn, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['data'], 1)
+
+        now = time.time()
+        with unittest.mock.patch('time.time', lambda: now + 50):
+            self.assertEqual(c.load('short', 'k'), None)
+            self.assertEqual(c.load('long', 'k'), 2)
+        self.assertFalse(os.path.exists(fn))
+
+        # Entries without a timestamp never expire
+        with open(os.path.join(self.test_dir, 'long', 'old.json'), 'w', encoding='utf-8') as f:
+            json.dump({'yt-dlp_version': '2023.01.01', 'data': 3}, f)
+        with unittest.mock.patch('time.time', lambda: now + 1000):
+            self.assertEqual(c.load('long', 'old'), 3)
+            self.assertEqual(c.load('long', 'k'), None)
+
+    def test_cache_max_size(self):
+        c = Cache(FakeYDL({'cachedir': self.test_dir, 'cache_max_size': 1000}))
+        data = 'x' * 200
+        for i in range(3):
+            c.store('test_cache', f'k{i}', data)
+            # Make the order of the mtimes certain
+            os.utime(os.path.join(self.test_dir, 'test_cache', f'k{i}.json'), (i, i))
+        # Loading k0 marks it as recently used
+        self.assertEqual(Cache(FakeYDL({'cachedir': self.test_dir})).load('test_cache', 'k0'), data)
+        for i in range(3, 5):
+            c.store('test_cache', f'k{i}', data)
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.test_dir, 'test_cache'))),
+            ['k0.json', 'k3.json', 'k4.json'])
+        self.assertEqual(c.load('test_cache', 'k1'), None)
+
 
 if __name__ == '__main__':
     unittest.main()
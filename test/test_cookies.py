@@ -1,3 +1,6 @@
+import os
+import sys
+import tempfile
 import unittest
 from datetime import datetime, timezone
 
@@ -12,6 +15,7 @@
     parse_safari_cookies,
     pbkdf2_sha1,
 )
+from yt_dlp.dependencies import sqlite3
 
 
 class Logger:
@@ -120,6 +124,63 @@ def test_chrome_cookie_decryptor_mac_v10(self):
             decryptor = MacChromeCookieDecryptor('', Logger())
             self.assertEqual(decryptor.decrypt(encrypted_value), value)
 
+    @unittest.skipUnless(sqlite3, 'sqlite3 is not available')
+    def test_chrome_cookies_cache(self):
+        from yt_dlp import YoutubeDL
+
+        created_decryptors = []
+
+        def get_cookie_decryptor(*args, **kwargs):
+            created_decryptors.append(args)
+            return LinuxChromeCookieDecryptor('Chrome', Logger())
+
+        with tempfile.TemporaryDirectory() as tmpdir, MonkeyPatch(cookies, {
+            'get_cookie_decryptor': get_cookie_decryptor,
+            '_get_linux_keyring_password': lambda *args, **kwargs: b'',
+        }):
+            profile = os.path.join(tmpdir, 'profile')
+            os.mkdir(profile)
+            database_path = os.path.join(profile, 'Cookies')
+            with sqlite3.connect(database_path) as conn:
+                conn.execute(
+                    'CREATE TABLE cookies (host_key TEXT, name TEXT, value TEXT, encrypted_value BLOB, '
+                    'path TEXT, expires_utc INTEGER, is_secure INTEGER)')
+                conn.executemany('INSERT INTO cookies VALUES (?, ?, ?, ?, ?, ?, ?)', [
+                    ('.example.com', 'currency', '', b'v10\xccW%\xcd\xe6\xe6\x9fM" \xa7\xb0\xca\xe4\x07\xd6', '/', 0, 1),
+                    ('other.org', 'plain', 'value', b'', '/', 0, 0),
+                ])
+            conn.close()
+
+            cache = YoutubeDL({'cachedir': os.path.join(tmpdir, 'cache')}).cache
+
+            def extract(**kwargs):
+                jar = cookies.extract_cookies_from_browser('chrome', profile, Logger(), cache=cache, **kwargs)
+                return {(cookie.domain, cookie.name): cookie.value for cookie in jar}
+
+            expected = {('.example.com', 'currency'): 'USD', ('other.org', 'plain'): 'value'}
+            self.assertEqual(extract(), expected)
+            self.assertEqual(len(created_decryptors), 1)
+
+            # Unmodified database: the cookies are taken from the cache
+            cache._forget()
+            self.assertEqual(extract(), expected)
+            self.assertEqual(len(created_decryptors), 1)
+            if sys.platform != 'win32':
+                cache_dir = os.path.join(tmpdir, 'cache', 'browser-cookies')
+                for fn in os.listdir(cache_dir):
+                    self.assertEqual(os.stat(os.path.join(cache_dir, fn)).st_mode & 0o777, 0o600)
+
+            # Modified database: only new encrypted cookies need decrypting
+            with sqlite3.connect(database_path) as conn:
+                conn.execute('INSERT INTO cookies VALUES (?, ?, ?, ?, ?, ?, ?)', ('.example.net', 'new', 'x', b'', '/', 0, 0))
+            conn.close()
+            os.utime(database_path, (0, 0))
+            self.assertEqual(extract(), {**expected, ('.example.net', 'new'): 'x'})
+            self.assertEqual(len(created_decryptors), 1)
+
+            self.assertEqual(extract(hosts=['www.example.com']), {('.example.com', 'currency'): 'USD'})
+            self.assertEqual(extract(hosts=['example.org']), {})
+
     def test_safari_cookie_parsing(self):
         cookies = \
             b'cook\x00\x00\x00\x01\x00\x00\x00i\x00\x00\x01\x00\x01\x00\x00\x00\x10\x00\x00\x00\x00\x00\x00\x00Y' \
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import http.server
+import json
+import re
+import socket
+import threading
+import time
+import unittest.mock
+
+from test.helper import http_server_port, try_rm
+from yt_dlp import YoutubeDL
+from yt_dlp.aes import aes_cbc_encrypt_bytes
+from yt_dlp.downloader.dash import DashSegmentsFD
+from yt_dlp.downloader.fragment import (
+    DecryptingStream,
+    FragmentConcurrencyController,
+    PositionalFragmentWriter,
+)
+from yt_dlp.downloader.hls import HlsFD
+from yt_dlp.networking._helper import Resolver
+from yt_dlp.networking.common import Response
+from yt_dlp.networking.exceptions import HTTPError
+from yt_dlp.utils import encodeFilename
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+TEST_FILE = os.path.join(TEST_DIR, 'testfile_fragments.ts')
+
+FRAGMENT_COUNT = 10
+FRAGMENT_SIZE = 4 * 1024
+
+
+def fragment_content(idx):
+    return bytes([idx]) * FRAGMENT_SIZE
+
+
+MEDIA = b''.join(map(fragment_content, range(FRAGMENT_COUNT)))
+MISSING_FRAGMENT = 4
+
+ENCRYPTED_COUNT = 3
+ENCRYPTED_SIZE = 1000
+AES_KEY = bytes(range(16))
+
+
+def encrypted_content(idx):
+    # PKCS#7 padded, with the media sequence number as the IV
+    padding = 16 - ENCRYPTED_SIZE % 16
+    return aes_cbc_encrypt_bytes(
+        bytes([idx]) * ENCRYPTED_SIZE + bytes([padding]) * padding, AES_KEY, idx.to_bytes(16, 'big'))
+
+
+ENCRYPTED = [encrypted_content(i) for i in range(ENCRYPTED_COUNT)]
+
+
+class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    requested_ranges = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_content(self, content, content_type, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', len(content))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        if self.path in ('/playlist.m3u8', '/playlist-missing.m3u8'):
+            self.send_content(''.join((
+                '#EXTM3U\n#EXT-X-TARGETDURATION:10\n#EXT-X-MEDIA-SEQUENCE:0\n',
+                # The first fragment is missing, while the following ones are downloaded concurrently
+                *(f'#EXTINF:10.0,\n{"missing" if i == 0 and "missing" in self.path else f"fragment{i}"}.ts\n'
+                  for i in range(FRAGMENT_COUNT)),
+                '#EXT-X-ENDLIST\n')).encode(), 'application/vnd.apple.mpegurl')
+            return
+        elif self.path in ('/byterange.m3u8', '/byterange-missing.m3u8'):
+            self.send_content(''.join((
+                '#EXTM3U\n#EXT-X-TARGETDURATION:10\n#EXT-X-MEDIA-SEQUENCE:0\n',
+                *(f'#EXTINF:10.0,\n#EXT-X-BYTERANGE:{FRAGMENT_SIZE}@{i * FRAGMENT_SIZE}\n'
+                  f'{"missing" if i == MISSING_FRAGMENT and "missing" in self.path else "media"}.ts\n'
+                  for i in range(FRAGMENT_COUNT)),
+                '#EXT-X-ENDLIST\n')).encode(), 'application/vnd.apple.mpegurl')
+            return
+        elif self.path == '/encrypted.m3u8':
+            self.send_content(''.join((
+                '#EXTM3U\n#EXT-X-TARGETDURATION:10\n#EXT-X-MEDIA-SEQUENCE:0\n#EXT-X-KEY:METHOD=AES-128,URI="key.bin"\n',
+                *(f'#EXTINF:10.0,\nencrypted{i}.ts\n' for i in range(ENCRYPTED_COUNT)),
+                '#EXT-X-ENDLIST\n')).encode(), 'application/vnd.apple.mpegurl')
+            return
+        elif self.path == '/key.bin':
+            self.send_content(AES_KEY, 'application/octet-stream')
+            return
+        elif self.path.startswith('/encrypted'):
+            self.send_content(ENCRYPTED[int(self.path[len('/encrypted'):-len('.ts')])], 'video/mp2t')
+            return
+        elif self.path == '/media.ts':
+            start, end = map(int, re.fullmatch(r'bytes=(\d+)-(\d+)', self.headers['Range']).groups())
+            self.requested_ranges.append(start)
+            if start == 0:
+                # The first fragment is the slowest
+                time.sleep(0.5)
+            self.send_content(MEDIA[start:end + 1], 'video/mp2t', 206)
+            return
+        elif self.path == '/missing.ts':
+            self.send_content(b'', 'text/plain', 404)
+            return
+        mobj = re.fullmatch(r'/(slow-)?fragment(\d+)\.ts', self.path)
+        assert mobj
+        if mobj.group(1):
+            time.sleep(0.2)
+        self.send_content(fragment_content(int(mobj.group(2))), 'video/mp2t')
+
+
+class TestFragmentFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.port = http_server_port(self.httpd)
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        for suffix in ('', '.part', '.ytdl'):
+            try_rm(encodeFilename(TEST_FILE + suffix))
+
+    def download(self, params, playlist='playlist.m3u8', expected=MEDIA, host='127.0.0.1'):
+        params['logger'] = FakeLogger()
+        ydl = YoutubeDL(params)
+        downloader = HlsFD(ydl, params)
+        HTTPTestRequestHandler.requested_ranges = []
+        try:
+            self.assertTrue(downloader.real_download(TEST_FILE, {
+                'url': f'http://{host}:{self.port}/{playlist}',
+                'ext': 'ts',
+            }))
+            with open(TEST_FILE, 'rb') as f:
+                self.assertEqual(f.read(), expected)
+            self.assertFalse([fn for fn in os.listdir(TEST_DIR) if '-Frag' in fn])
+            self.assertFalse(os.path.exists(TEST_FILE + '.ytdl'))
+            self.assertEqual(downloader._fragment_memory, 0)
+        finally:
+            try_rm(encodeFilename(TEST_FILE))
+
+    def test_fragments_in_memory(self):
+        self.download({})
+        self.download({'concurrent_fragment_downloads': 4})
+
+    def test_fragments_on_disk(self):
+        self.download({'fragment_memory_limit': 0})
+        self.download({'fragment_memory_limit': 0, 'concurrent_fragment_downloads': 4})
+
+    def test_fragment_memory_limit(self):
+        self.download({'fragment_memory_limit': 3 * FRAGMENT_SIZE, 'concurrent_fragment_downloads': 4})
+
+    def test_adaptive_concurrency(self):
+        self.download({'max_concurrent_fragment_downloads': 4})
+        self.download({'concurrent_fragment_downloads': 2, 'max_concurrent_fragment_downloads': 4}, 'byterange.m3u8')
+
+    def test_encrypted(self):
+        expected = b''.join(bytes([i]) * ENCRYPTED_SIZE for i in range(ENCRYPTED_COUNT))
+        streamed = []
+        finish = DecryptingStream.finish
+        with unittest.mock.patch.object(
+                DecryptingStream, 'finish', lambda self: (streamed.append(self), finish(self))):
+            self.download({}, 'encrypted.m3u8', expected)
+            self.assertEqual(len(streamed), ENCRYPTED_COUNT)
+            self.download({'concurrent_fragment_downloads': 2}, 'encrypted.m3u8', expected)
+            self.assertEqual(len(streamed), 2 * ENCRYPTED_COUNT)
+            # Fragments on disk are decrypted once downloaded
+            self.download({'fragment_memory_limit': 0}, 'encrypted.m3u8', expected)
+            self.assertEqual(len(streamed), 2 * ENCRYPTED_COUNT)
+
+    def test_asyncio_engine(self):
+        params = {'fragment_engine': 'asyncio', 'concurrent_fragment_downloads': 4}
+        download_fragments = HlsFD._download_fragments_asyncio
+        with unittest.mock.patch.object(
+                HlsFD, '_download_fragments_asyncio', autospec=True, side_effect=download_fragments) as engine:
+            self.download(dict(params))
+            self.download(dict(params), 'byterange.m3u8')
+            self.download(
+                {**params, 'fragment_retries': 0}, 'byterange-missing.m3u8',
+                MEDIA[:MISSING_FRAGMENT * FRAGMENT_SIZE] + MEDIA[(MISSING_FRAGMENT + 1) * FRAGMENT_SIZE:])
+            self.download(
+                dict(params), 'encrypted.m3u8',
+                b''.join(bytes([i]) * ENCRYPTED_SIZE for i in range(ENCRYPTED_COUNT)))
+            self.assertEqual(engine.call_count, 4)
+
+            # Falls back to threads
+            self.download({**params, 'ratelimit': 1024 * 1024})
+            self.download({**params, 'fragment_memory_limit': 0})
+            self.assertEqual(engine.call_count, 4)
+
+    def test_asyncio_engine_resolver(self):
+        lookups = []
+
+        def getaddrinfo(host, port, *args):
+            lookups.append(host)
+            # Nothing listens on the first address
+            return [*socket.getaddrinfo('127.0.0.2', port, *args), *socket.getaddrinfo('127.0.0.1', port, *args)]
+
+        resolver = Resolver(cache_ttl=60, happy_eyeballs_delay=0.1, getaddrinfo=getaddrinfo)
+        download_fragments = HlsFD._download_fragments_asyncio
+        with unittest.mock.patch.object(YoutubeDL, '_resolver', resolver), unittest.mock.patch.object(
+                HlsFD, '_download_fragments_asyncio', autospec=True, side_effect=download_fragments) as engine:
+            self.download({'fragment_engine': 'asyncio', 'concurrent_fragment_downloads': 4}, host='yt-dlp.test')
+            self.assertEqual(engine.call_count, 1)
+        self.assertEqual(lookups, ['yt-dlp.test'])
+
+    def test_concurrency_controller(self):
+        # Each round takes a second, and the speed grows with the limit upto 4
+        clock, downloaded = [0], [0]
+
+        def run_round():
+            limit = controller.limit
+            for i in range(limit):
+                with controller.slot():
+                    if i == limit - 1:
+                        clock[0] += 1
+                        downloaded[0] += min(limit, 4) * 1000
+
+        with unittest.mock.patch('time.monotonic', lambda: clock[0]):
+            controller = FragmentConcurrencyController(1, 8, lambda: downloaded[0])
+            limits = []
+            for _ in range(12):
+                run_round()
+                limits.append(controller.limit)
+            self.assertEqual(limits[:5], [2, 3, 4, 5, 4])
+            self.assertEqual(max(limits), 5)
+            self.assertGreaterEqual(min(limits[4:]), 4)
+
+            controller.report_error(HTTPError(Response(None, 'http://example.com', {}, status=429)))
+            run_round()
+            self.assertEqual(controller.limit, 2)
+            controller.limit = 1
+            controller.report_error(HTTPError(Response(None, 'http://example.com', {}, status=429)))
+            run_round()
+            self.assertEqual(controller.limit, 1)
+
+    def test_positional_writer(self):
+        self.assertTrue(PositionalFragmentWriter.fragment_sizes_known([
+            {'byte_range': {'start': 0, 'end': 10}}, {'byte_range': {'start': 10, 'end': 20}}]))
+        self.assertFalse(PositionalFragmentWriter.fragment_sizes_known([
+            {'byte_range': {'start': 0, 'end': 10}}, {'byte_range': {}}]))
+        self.assertFalse(PositionalFragmentWriter.fragment_sizes_known([
+            {'byte_range': {'start': 0, 'end': 10}, 'decrypt_info': {'METHOD': 'AES-128'}}]))
+
+        written = []
+        write = PositionalFragmentWriter.write
+        with unittest.mock.patch.object(
+                PositionalFragmentWriter, 'write', lambda self, idx, content: (written.append(idx), write(self, idx, content))):
+            self.download({'concurrent_fragment_downloads': 4}, 'byterange.m3u8')
+        # The slow first fragment must not hold back the others
+        self.assertEqual(sorted(written), list(range(1, FRAGMENT_COUNT + 1)))
+        self.assertEqual(written[-1], 1)
+
+        self.download({'concurrent_fragment_downloads': 4, 'fragment_memory_limit': 0}, 'byterange.m3u8')
+
+    def test_fatal_missing_fragment(self):
+        params = {
+            'concurrent_fragment_downloads': 4,
+            'fragment_retries': 0,
+            'skip_unavailable_fragments': False,
+            'ignoreerrors': True,
+            'logger': FakeLogger(),
+        }
+        downloader = HlsFD(YoutubeDL(params), params)
+        self.assertFalse(downloader.real_download(TEST_FILE, {
+            'url': f'http://127.0.0.1:{self.port}/playlist-missing.m3u8',
+            'ext': 'ts',
+        }))
+        # The fragments downloaded after the missing one are released
+        self.assertEqual(downloader._fragment_memory, 0)
+
+    def test_fatal_missing_fragment_multiple(self):
+        params = {
+            'concurrent_fragment_downloads': 8,
+            'fragment_retries': 0,
+            'ignoreerrors': True,
+            'logger': FakeLogger(),
+        }
+        base_url = f'http://127.0.0.1:{self.port}/'
+        filenames = [f'{TEST_FILE}.f{i}' for i in range(2)]
+        downloader = DashSegmentsFD(YoutubeDL(params), params)
+        try:
+            self.assertFalse(downloader.real_download(TEST_FILE, {
+                'protocol': 'http_dash_segments',
+                'requested_formats': [{
+                    'format_id': str(i),
+                    'filepath': filenames[i],
+                    'fragment_base_url': base_url,
+                    # The first fragment of the first format is missing, while the others are still being downloaded
+                    'fragments': [{'path': 'missing.ts' if i == 0 and j == 0 else f'slow-fragment{j}.ts'}
+                                  for j in range(FRAGMENT_COUNT)],
+                } for i in range(2)],
+            }))
+            self.assertEqual(downloader._fragment_memory, 0)
+        finally:
+            for filename in filenames:
+                for suffix in ('', '.part', '.ytdl'):
+                    try_rm(encodeFilename(filename + suffix))
+
+    def test_positional_skipped_fragment(self):
+        self.download(
+            {'concurrent_fragment_downloads': 4, 'fragment_retries': 0}, 'byterange-missing.m3u8',
+            MEDIA[:MISSING_FRAGMENT * FRAGMENT_SIZE] + MEDIA[(MISSING_FRAGMENT + 1) * FRAGMENT_SIZE:])
+
+    def test_positional_resume(self):
+        # Fragments 1-3 and 6 (1-based) were written by a previous run
+        completed = {1, 2, 3, 6}
+        with open(TEST_FILE + '.part', 'wb') as f:
+            f.write(b''.join(
+                fragment_content(i) if i + 1 in completed else bytes(FRAGMENT_SIZE) for i in range(FRAGMENT_COUNT)))
+        with open(TEST_FILE + '.ytdl', 'w') as f:
+            json.dump({'downloader': {
+                'current_fragment': {'index': 3},
+                'positional': {'offset': 3 * FRAGMENT_SIZE, 'completed': bytes([0b00100111, 0]).hex()},
+            }}, f)
+        self.download({'concurrent_fragment_downloads': 4}, 'byterange.m3u8')
+        self.assertEqual(
+            sorted(HTTPTestRequestHandler.requested_ranges),
+            [i * FRAGMENT_SIZE for i in range(FRAGMENT_COUNT) if i + 1 not in completed])
+
+        # Without concurrency, the fragments after the current one are downloaded again
+        with open(TEST_FILE + '.part', 'wb') as f:
+            f.write(MEDIA[:5 * FRAGMENT_SIZE] + bytes(FRAGMENT_SIZE) + MEDIA[6 * FRAGMENT_SIZE:])
+        with open(TEST_FILE + '.ytdl', 'w') as f:
+            json.dump({'downloader': {
+                'current_fragment': {'index': 5},
+                'positional': {'offset': 5 * FRAGMENT_SIZE, 'completed': bytes([0b00011111, 0b10]).hex()},
+            }}, f)
+        self.download({}, 'playlist.m3u8')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,8 +9,11 @@
 
 
 import http.server
+import io
+import json
 import re
 import threading
+import unittest.mock
 
 from test.helper import http_server_port, try_rm
 from yt_dlp import YoutubeDL
@@ -22,9 +25,12 @@
 
 
 TEST_SIZE = 10 * 1024
+TEST_DATA = bytes(i % 251 for i in range(TEST_SIZE))
 
 
 class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
+    requested_ranges = []
+
     def log_message(self, format, *args):
         pass
 
@@ -55,8 +61,28 @@ def serve(self, range=True, content_length=True):
         self.end_headers()
         self.wfile.write(b'#' * size)
 
+    def serve_partial(self, flaky=False):
+        start, end = map(int, re.fullmatch(r'bytes=(\d+)-(\d+)', self.headers['Range']).groups())
+        first_request = start not in self.requested_ranges
+        self.requested_ranges.append(start)
+        self.send_response(206)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Range', f'bytes {start}-{end}/{TEST_SIZE}')
+        self.send_header('Content-Length', end - start + 1)
+        self.end_headers()
+        if flaky and first_request and start == TEST_SIZE // 2:
+            # Drop the connection halfway through the segment
+            self.wfile.write(TEST_DATA[start:start + 1000])
+            self.close_connection = True
+            return
+        self.wfile.write(TEST_DATA[start:end + 1])
+
     def do_GET(self):
-        if self.path == '/regular':
+        if self.path == '/partial':
+            self.serve_partial()
+        elif self.path == '/partial-flaky':
+            self.serve_partial(flaky=True)
+        elif self.path == '/regular':
             self.serve()
         elif self.path == '/no-content-length':
             self.serve(content_length=False)
@@ -70,7 +96,7 @@ def do_GET(self):
 
 class TestHttpFD(unittest.TestCase):
     def setUp(self):
-        self.httpd = http.server.HTTPServer(
+        self.httpd = http.server.ThreadingHTTPServer(
             ('127.0.0.1', 0), HTTPTestRequestHandler)
         self.port = http_server_port(self.httpd)
         self.server_thread = threading.Thread(target=self.httpd.serve_forever)
@@ -101,6 +127,61 @@ def test_chunked(self):
             'http_chunk_size': 1000,
         })
 
+    def test_download_to_stream(self):
+        for params in ({}, {'http_chunk_size': 1000}):
+            params['logger'] = FakeLogger()
+            downloader = HttpFD(YoutubeDL(params), params)
+            for ep in ('regular', 'no-content-length', 'no-range', 'no-range-no-content-length'):
+                stream = io.BytesIO(b'stale data')
+                self.assertTrue(downloader.real_download(stream, {
+                    'url': 'http://127.0.0.1:%d/%s' % (self.port, ep),
+                }), ep)
+                self.assertEqual(stream.getvalue(), b'#' * TEST_SIZE, ep)
+
+    def download_segmented(self, params, ep='partial'):
+        params = {'http_connections': 4, 'logger': FakeLogger(), **params}
+        downloader = HttpFD(YoutubeDL(params), params)
+        filename = 'testfile.mp4'
+        HTTPTestRequestHandler.requested_ranges = []
+        try:
+            with unittest.mock.patch.object(HttpFD, '_MIN_SEGMENT_SIZE', 1024):
+                self.assertTrue(downloader.real_download(filename, {
+                    'url': 'http://127.0.0.1:%d/%s' % (self.port, ep),
+                }), ep)
+            with open(filename, 'rb') as f:
+                self.assertEqual(f.read(), TEST_DATA, ep)
+            self.assertFalse(os.path.exists(filename + '.ytdl'))
+        finally:
+            try_rm(encodeFilename(filename))
+
+    def test_segmented(self):
+        self.download_segmented({})
+        # The probe, then one request for each segment
+        self.assertEqual(sorted(HTTPTestRequestHandler.requested_ranges), [0, 0, 2560, 5120, 7680])
+
+        self.download_segmented({'retries': 1}, 'partial-flaky')
+        self.assertEqual(sorted(HTTPTestRequestHandler.requested_ranges), [0, 0, 2560, 5120, 6120, 7680])
+
+        # Servers without range support are downloaded over a single connection
+        self.download_all({'http_connections': 4})
+
+    def test_segmented_resume(self):
+        with open('testfile.mp4.part', 'wb') as f:
+            f.write(TEST_DATA[:1000] + bytes(1560) + TEST_DATA[2560:5120] + bytes(TEST_SIZE - 5120))
+        with open('testfile.mp4.ytdl', 'w') as f:
+            json.dump({'downloader': {'http_segments': {
+                'size': TEST_SIZE,
+                'segments': [[0, 2560, 1000], [2560, 5120, 2560], [5120, 7680, 0], [7680, TEST_SIZE, 0]],
+            }}}, f)
+        self.download_segmented({})
+        self.assertEqual(sorted(HTTPTestRequestHandler.requested_ranges), [0, 1000, 5120, 7680])
+
+        # A partial file from a single connection download is continued in segments
+        with open('testfile.mp4.part', 'wb') as f:
+            f.write(TEST_DATA[:2048])
+        self.download_segmented({})
+        self.assertEqual(sorted(HTTPTestRequestHandler.requested_ranges), [0, 2048, 4096, 6144, 8192])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -370,6 +370,14 @@ def test_negative(self):
         self._test('function f(){return 2    -    + + - -2;}', 0)
         self._test('function f(){return 2    +    - + - -2;}', 0)
 
+    def test_compiled_once(self):
+        jsi = JSInterpreter('function f(a,b){var c=[a,"x"];c.push(a);b++;return [c.join(","),b>2?b:0]}')
+        self._test(jsi, ['1,x,1', 0], args=['1', 1])
+        compiled = len(jsi._compiled)
+        # Each call gets new objects, but reuses the compiled statements
+        self._test(jsi, ['5,x,5', 6], args=['5', 5])
+        self.assertEqual(len(jsi._compiled), compiled)
+
     @unittest.skip('Not implemented')
     def test_packed(self):
         jsi = JSInterpreter('''function f(p,a,c,k,e,d){while(c--)if(k[c])p=p.replace(new RegExp('\\b'+c.toString(a)+'\\b','g'),k[c]);return p}''')
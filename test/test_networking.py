@@ -8,6 +8,8 @@
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import asyncio
+import contextlib
 import gzip
 import http.client
 import http.cookiejar
@@ -15,11 +17,14 @@
 import io
 import pathlib
 import random
+import socket
 import ssl
 import tempfile
 import threading
 import time
 import urllib.error
+import urllib.parse
+import unittest.mock
 import urllib.request
 import warnings
 import zlib
@@ -28,7 +33,7 @@
 
 from test.helper import FakeYDL, http_server_port
 from yt_dlp.cookies import YoutubeDLCookieJar
-from yt_dlp.dependencies import brotli, requests, urllib3
+from yt_dlp.dependencies import brotli, h2, requests, urllib3
 from yt_dlp.networking import (
     HEADRequest,
     PUTRequest,
@@ -37,7 +42,9 @@
     RequestHandler,
     Response,
 )
-from yt_dlp.networking._urllib import UrllibRH
+from yt_dlp.networking._asynchttp import AsyncHTTPClient
+from yt_dlp.networking._helper import Resolver
+from yt_dlp.networking._urllib import HTTPConnectionPool, HTTPHandler, UrllibRH
 from yt_dlp.networking.exceptions import (
     CertificateVerifyError,
     HTTPError,
@@ -174,6 +181,11 @@ def do_GET(self):
             self.send_header('Location', self.path)
             self.send_header('Content-Length', '0')
             self.end_headers()
+        elif self.path.startswith('/redirect_to?'):
+            self.send_response(302)
+            self.send_header('Location', urllib.parse.unquote(self.path[len('/redirect_to?'):]))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
         elif self.path == '/redirect_dotsegments':
             self.send_response(301)
             # redirect to /headers but with dot segments before
@@ -543,6 +555,24 @@ def test_source_address(self, handler):
                 rh, Request(f'http://127.0.0.1:{self.http_port}/source_address')).read().decode()
             assert source_address == data
 
+    @pytest.mark.parametrize('handler', ['Urllib', 'Requests'], indirect=True)
+    def test_resolver(self, handler):
+        lookups = []
+
+        def getaddrinfo(host, port, *args):
+            lookups.append(host)
+            assert host == 'yt-dlp.test'
+            return socket.getaddrinfo('127.0.0.1', port, *args)
+
+        with handler(resolver=Resolver(cache_ttl=60, getaddrinfo=getaddrinfo)) as rh:
+            for _ in range(2):
+                # No connection is reused
+                res = validate_and_send(
+                    rh, Request(f'http://yt-dlp.test:{self.http_port}/headers', headers={'Connection': 'close'}))
+                assert res.status == 200
+                res.close()
+        assert lookups == ['yt-dlp.test']
+
     @pytest.mark.parametrize('handler', ['Urllib', 'Requests'], indirect=True)
     def test_gzip_trailing_garbage(self, handler):
         with handler() as rh:
@@ -609,6 +639,9 @@ def test_read(self, handler):
             assert res.readable()
             assert res.read(1) == b'H'
             assert res.read(3) == b'ost'
+            buffer = bytearray(4)
+            assert res.readinto(memoryview(buffer)[:2]) == 2
+            assert buffer == b': \x00\x00'
 
 
 class TestHTTPProxy(TestRequestHandlerBase):
@@ -778,6 +811,48 @@ def get_response():
 
         assert get_response().read() == b'<html></html>'
 
+    @pytest.mark.parametrize('handler', ['Urllib'], indirect=True)
+    def test_connection_reuse(self, handler):
+        with handler(verify=False) as rh:
+            for _ in range(3):
+                res = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/headers'))
+                assert b'Connection: close' not in res.read()
+            for _ in range(2):
+                res = validate_and_send(rh, Request(f'https://127.0.0.1:{self.https_port}/headers'))
+                res.read()
+                res.close()
+        assert rh._connection_stats['created'] == 2
+        assert rh._connection_stats['reused'] == 3
+
+        with handler() as rh:
+            # A response closed before its end cannot leave its connection to the next request
+            res = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/headers'))
+            res.read(1)
+            res.close()
+            res = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/headers'))
+            assert res.read().startswith(b'Host: ')
+        assert rh._connection_stats['created'] == 2
+        assert rh._connection_stats['reused'] == 0
+
+    @pytest.mark.parametrize('handler', ['Urllib'], indirect=True)
+    @pytest.mark.parametrize('detected', [True, False])
+    def test_connection_dropped(self, handler, detected):
+        url = f'http://127.0.0.1:{self.http_port}/headers'
+        with handler() as rh:
+            validate_and_send(rh, Request(url)).read()
+            opener = rh._get_instance(proxies=rh.proxies, cookiejar=rh.cookiejar)
+            pool = next(h._pool for h in opener.handlers if isinstance(h, HTTPHandler))
+            ((conn, _),) = next(iter(pool._idle.values()))
+            # Make the server close the idle connection
+            conn.sock.shutdown(socket.SHUT_WR)
+            time.sleep(0.1)
+            patch = (contextlib.nullcontext() if detected
+                     else unittest.mock.patch.object(HTTPConnectionPool, '_is_dropped', return_value=False))
+            with patch:
+                assert validate_and_send(rh, Request(url)).read().startswith(b'Host: ')
+        assert rh._connection_stats['created'] == 2
+        assert rh._connection_stats['dropped'] == 1
+
     @pytest.mark.parametrize('handler', ['Urllib'], indirect=True)
     def test_verify_cert_error_text(self, handler):
         # Check the output of the error message
@@ -817,6 +892,276 @@ def test_httplib_validation_errors(self, handler, req, match, version_check):
             assert not isinstance(exc_info.value, TransportError)
 
 
+class H2TestServer:
+    """HTTPS server speaking HTTP/2 only, serving each connection in a thread"""
+
+    def __init__(self):
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        self._h2 = h2
+        self.connections = 0
+        self._sslctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self._sslctx.load_cert_chain(os.path.join(TEST_DIR, 'testcert.pem'), None)
+        self._sslctx.set_alpn_protocols(['h2'])
+        self._sock = socket.create_server(('127.0.0.1', 0))
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def close(self):
+        self._sock.close()
+
+    @staticmethod
+    def _route(headers, body):
+        path, _, query = headers[':path'].partition('?')
+        echo = '\n'.join(f'{name}: {value}' for name, value in headers.items()).encode()
+        if path == '/headers':
+            return 200, {}, echo
+        elif path == '/method':
+            return 200, {}, echo + b'\n\n' + body
+        elif path == '/redirect_loop':
+            return 301, {'location': '/redirect_loop'}, b''
+        elif path == '/redirect_to':
+            return 302, {'location': urllib.parse.unquote(query)}, b''
+        elif path.startswith('/redirect_'):
+            return int(path[len('/redirect_'):]), {'location': '/method'}, b''
+        elif path == '/gzip':
+            return 200, {'content-encoding': 'gzip'}, gzip.compress(b'<html><video src="/vid.mp4" /></html>')
+        elif path == '/set_cookie':
+            return 200, {'set-cookie': 'test=ytdlp; path=/'}, b''
+        return 404, {}, b'<html></html>'
+
+    def _serve(self, sock):
+        h2 = self._h2
+        try:
+            sock = self._sslctx.wrap_socket(sock, server_side=True)
+        except (OSError, ssl.SSLError):
+            sock.close()
+            return
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+        conn.initiate_connection()
+        sock.sendall(conn.data_to_send())
+        requests = {}
+        with sock:
+            while True:
+                try:
+                    data = sock.recv(65536)
+                except OSError:
+                    return
+                if not data:
+                    return
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        requests[event.stream_id] = (dict(event.headers), [])
+                    elif isinstance(event, h2.events.DataReceived):
+                        requests[event.stream_id][1].append(event.data)
+                        conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded):
+                        headers, body = requests.pop(event.stream_id)
+                        status, response_headers, payload = self._route(headers, b''.join(body))
+                        conn.send_headers(event.stream_id, [
+                            (':status', str(status)), ('content-length', str(len(payload))),
+                            *response_headers.items()])
+                        for i in range(0, len(payload), conn.max_outbound_frame_size):
+                            conn.send_data(event.stream_id, payload[i:i + conn.max_outbound_frame_size])
+                        conn.end_stream(event.stream_id)
+                sock.sendall(conn.data_to_send())
+
+
+@pytest.mark.skipif(not h2, reason='h2 is not installed')
+class TestH2RequestHandler(TestRequestHandlerBase):
+    @classmethod
+    def setup_class(cls):
+        super().setup_class()
+        cls.h2_server = H2TestServer()
+
+    @classmethod
+    def teardown_class(cls):
+        cls.h2_server.close()
+
+    def url(self, path):
+        return f'https://127.0.0.1:{self.h2_server.port}{path}'
+
+    @pytest.mark.parametrize('handler', ['H2'], indirect=True)
+    def test_request(self, handler):
+        with handler(verify=False, headers={'Connection': 'close', 'X-Test': 'test'}) as rh:
+            res = validate_and_send(rh, Request(self.url('/headers')))
+            assert res.status == 200
+            headers = res.read().decode().split('\n')
+            assert ':method: GET' in headers
+            assert ':path: /headers' in headers
+            assert 'x-test: test' in headers
+            assert not any(header.startswith('connection:') for header in headers)
+
+            res = validate_and_send(rh, Request(self.url('/method'), data=b'test' * 10000))
+            headers, _, body = res.read().partition(b'\n\n')
+            assert b':method: POST' in headers
+            assert b'content-length: 40000' in headers
+            assert body == b'test' * 10000
+
+            res = validate_and_send(rh, Request(self.url('/gzip')))
+            assert res.headers.get('Content-Encoding') == 'gzip'
+            assert res.read() == b'<html><video src="/vid.mp4" /></html>'
+
+    @pytest.mark.parametrize('handler', ['H2'], indirect=True)
+    def test_multiplexing(self, handler):
+        connections = self.h2_server.connections
+        with handler(verify=False) as rh:
+            # The responses are all open at the same time on one connection
+            responses = [validate_and_send(rh, Request(self.url(f'/headers?{i}'))) for i in range(5)]
+            (conn, ) = rh._connections['127.0.0.1', self.h2_server.port, None]
+            assert len(conn._streams) == 5
+            for i, res in reversed(list(enumerate(responses))):
+                assert f':path: /headers?{i}'.encode() in res.read()
+
+            def request(i):
+                results[i] = validate_and_send(rh, Request(self.url(f'/headers?{i}'))).read()
+
+            results = [None] * 8
+            threads = [threading.Thread(target=request, args=(i, )) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert all(f':path: /headers?{i}'.encode() in result for i, result in enumerate(results))
+        assert self.h2_server.connections == connections + 1
+
+    @pytest.mark.parametrize('handler', ['H2'], indirect=True)
+    def test_redirect(self, handler):
+        with handler(verify=False) as rh:
+            res = validate_and_send(rh, Request(self.url('/redirect_302'), data=b'test'))
+            assert res.url == self.url('/method')
+            assert b':method: GET' in res.read()
+
+            res = validate_and_send(rh, Request(self.url('/redirect_307'), data=b'test'))
+            headers, _, body = res.read().partition(b'\n\n')
+            assert b':method: POST' in headers
+            assert body == b'test'
+
+            with pytest.raises(HTTPError) as exc_info:
+                validate_and_send(rh, Request(self.url('/redirect_loop')))
+            assert exc_info.value.redirect_loop
+
+    @pytest.mark.parametrize('handler', ['H2'], indirect=True)
+    def test_http_error(self, handler):
+        with handler(verify=False) as rh:
+            with pytest.raises(HTTPError) as exc_info:
+                validate_and_send(rh, Request(self.url('/gen_404')))
+            assert exc_info.value.status == 404
+            assert exc_info.value.response.read() == b'<html></html>'
+
+    @pytest.mark.parametrize('handler', ['H2'], indirect=True)
+    def test_cookies(self, handler):
+        cookiejar = YoutubeDLCookieJar()
+        with handler(verify=False, cookiejar=cookiejar) as rh:
+            validate_and_send(rh, Request(self.url('/set_cookie'))).read()
+            assert cookiejar.get_cookie_header(self.url('/')) == 'test=ytdlp'
+            assert b'cookie: test=ytdlp' in validate_and_send(rh, Request(self.url('/headers'))).read()
+
+    @pytest.mark.parametrize('handler', ['H2'], indirect=True)
+    def test_verify_cert(self, handler):
+        with handler() as rh:
+            with pytest.raises(CertificateVerifyError):
+                validate_and_send(rh, Request(self.url('/headers')))
+
+    @pytest.mark.parametrize('handler', ['H2'], indirect=True)
+    def test_http1_fallback(self, handler):
+        url = f'https://127.0.0.1:{self.https_port}/headers'
+        with handler(verify=False) as rh:
+            # The server does not negotiate HTTP/2, so the request is left to the other handlers
+            with pytest.raises(UnsupportedRequest):
+                validate_and_send(rh, Request(url))
+            with pytest.raises(UnsupportedRequest):
+                rh.validate(Request(url))
+
+        director = RequestDirector(logger=FakeLogger())
+        director.add_handler(handler(verify=False))
+        director.add_handler(UrllibRH(logger=FakeLogger(), verify=False))
+        director.preferences.add(lambda rh, _: 100 if rh.RH_KEY == 'H2' else 0)
+        with contextlib.closing(director):
+            assert b'Host: 127.0.0.1' in director.send(Request(url)).read()
+
+        # Redirects to http:// are left to the other handlers too
+        with handler(verify=False) as rh:
+            http_url = f'http://127.0.0.1:{self.http_port}/headers'
+            with pytest.raises(UnsupportedRequest):
+                validate_and_send(rh, Request(self.url(f'/redirect_to?{urllib.parse.quote(http_url)}')))
+
+        with handler(verify=False) as rh:
+            for req in (
+                Request('http://127.0.0.1/headers'),
+                Request(self.url('/headers'), proxies={'all': 'http://127.0.0.1'}),
+            ):
+                with pytest.raises(UnsupportedRequest):
+                    rh.validate(req)
+
+    @pytest.mark.parametrize('handler', ['H2'], indirect=True)
+    def test_stream_refused(self, handler):
+        from yt_dlp.networking._h2 import H2Connection
+
+        with handler(verify=False) as rh:
+            # e.g. the server sent GOAWAY right away, or allows no concurrent streams
+            with unittest.mock.patch.object(H2Connection, 'open_stream', return_value=None):
+                with pytest.raises(TransportError):
+                    validate_and_send(rh, Request(self.url('/headers')))
+            assert not rh._connections['127.0.0.1', self.h2_server.port, None]
+            assert validate_and_send(rh, Request(self.url('/headers'))).status == 200
+
+
+class TestAsyncHTTPClient(TestRequestHandlerBase):
+    def download(self, url, headers=None):
+        with FakeYDL() as ydl:
+            client = AsyncHTTPClient(ydl)
+            stream = io.BytesIO()
+
+            async def download():
+                try:
+                    return await client.download(url, headers or {}, stream)
+                finally:
+                    await client.close()
+
+            assert asyncio.run(download()) == len(stream.getvalue())
+            return stream.getvalue()
+
+    @pytest.mark.parametrize('headers', [
+        {'X-Test': 'test\r\nX-Injected: test'},
+        {'X-Test': 'test\nX-Injected: test'},
+        {'X-Test\r\nX-Injected': 'test'},
+        {'X-Test:': 'test'},
+        {' X-Test': 'test'},
+    ])
+    def test_header_injection(self, headers):
+        with pytest.raises(UnsupportedRequest):
+            self.download(f'http://127.0.0.1:{self.http_port}/headers', headers)
+
+    def test_url_injection(self):
+        with pytest.raises(UnsupportedRequest):
+            self.download(f'http://127.0.0.1:{self.http_port}/headers HTTP/1.1\r\nX-Injected: test\r\n')
+
+    def test_redirect(self):
+        headers = {'Authorization': 'Basic dGVzdDp0ZXN0', 'Cookie': 'test=ytdlp', 'X-Test': 'test'}
+        res = self.download(f'http://127.0.0.1:{self.http_port}/308-to-headers', headers).decode()
+        assert 'Authorization: Basic dGVzdDp0ZXN0' in res
+        assert 'Cookie: test=ytdlp' in res
+
+        # Credentials are not sent to another host
+        url = urllib.parse.quote(f'http://localhost:{self.http_port}/headers')
+        res = self.download(f'http://127.0.0.1:{self.http_port}/redirect_to?{url}', headers).decode()
+        assert 'X-Test: test' in res
+        assert 'Authorization' not in res
+        assert 'Cookie' not in res
+
+
 class TestRequestsRequestHandler(TestRequestHandlerBase):
     @pytest.mark.parametrize('raised,expected', [
         (lambda: requests.exceptions.ConnectTimeout(), TransportError),
@@ -886,6 +1231,31 @@ def mock_read(*args, **kwargs):
 
         assert exc_info.type is expected
 
+    @pytest.mark.parametrize('handler', ['Requests'], indirect=True)
+    def test_shared_connection_pool(self, handler):
+        from yt_dlp.networking._requests import SharedHTTPAdapters
+
+        def users(key):
+            # Handlers of other tests that were not closed may still use the same adapter
+            return SharedHTTPAdapters._adapters.get(key, (None, 0))[1]
+
+        with handler() as rh1, handler() as rh2, handler(verify=False) as rh3:
+            initial_users = users(rh1._adapter_key)
+            session = rh1._get_instance(cookiejar=rh1.cookiejar)
+            other_session = rh1._get_instance(cookiejar=YoutubeDLCookieJar())
+            assert session is not other_session
+            adapter = session.get_adapter('https://example.com')
+            assert other_session.get_adapter('https://example.com') is adapter
+            assert rh2._get_instance(cookiejar=rh2.cookiejar).get_adapter('https://example.com') is adapter
+            assert rh3._get_instance(cookiejar=rh3.cookiejar).get_adapter('https://example.com') is not adapter
+
+            assert users(rh1._adapter_key) == initial_users + 2
+
+            rh1.close()
+            # Still used by rh2
+            assert users(rh1._adapter_key) == initial_users + 1
+        assert users(rh1._adapter_key) == initial_users
+
 
 def run_validation(handler, error, req, **handler_kwargs):
     with handler(**handler_kwargs) as rh:
@@ -1155,6 +1525,21 @@ def _send(self, request: Request):
         with pytest.raises(NoSupportingHandlers):
             director.send(Request('any://'))
 
+    def test_unsupported_while_sending(self):
+        class UnsupportedRH(FakeRH):
+            def _send(self, request: Request):
+                raise UnsupportedRequest('found out while sending')
+
+        director = RequestDirector(logger=FakeLogger())
+        director.add_handler(UnsupportedRH(logger=FakeLogger()))
+        with pytest.raises(NoSupportingHandlers, match=r'found out while sending'):
+            director.send(Request('http://'))
+
+        # The next handler is tried
+        director.add_handler(FakeRH(logger=FakeLogger()))
+        director.preferences.add(lambda rh, _: 100 if isinstance(rh, UnsupportedRH) else 0)
+        assert isinstance(director.send(Request('http://')), FakeResponse)
+
     def test_unexpected_error(self):
         director = RequestDirector(logger=FakeLogger())
 
@@ -1564,6 +1949,15 @@ def test_get_header(self):
         assert res.get_header('set-Cookie') == 'cookie1'
         assert res.get_header('notexist', 'default') == 'default'
 
+    def test_readinto(self):
+        res = Response(io.BytesIO(b'test data'), url='test://', headers={})
+        buffer = bytearray(6)
+        assert res.readinto(buffer) == 6
+        assert buffer == b'test d'
+        assert res.readinto(buffer) == 3
+        assert buffer[:3] == b'ata'
+        assert res.readinto(buffer) == 0
+
     def test_compat(self):
         res = Response(io.BytesIO(b''), url='test://', status=404, headers={'test': 'test'})
         with warnings.catch_warnings():
@@ -12,7 +12,11 @@
 import io
 import platform
 import random
+import socket
 import ssl
+import threading
+import time
+import unittest.mock
 import urllib.error
 import warnings
 
@@ -21,7 +25,9 @@
 from yt_dlp.networking import Response
 from yt_dlp.networking._helper import (
     InstanceStoreMixin,
+    Resolver,
     add_accept_encoding_header,
+    create_connection,
     get_redirect_method,
     make_socks_proxy_opts,
     select_proxy,
@@ -172,6 +178,138 @@ def test_mixin(self):
         mixin._clear_instances()
         assert mixin._get_instance(t=1234) != m
 
+        # Lists and tuples are not equal
+        assert mixin._get_instance(e=[1, 2]) != mixin._get_instance(e=(1, 2))
+
+    def test_mixin_unhashable(self):
+        class Unhashable:
+            __hash__ = None
+
+            def __eq__(self, other):
+                return isinstance(other, Unhashable)
+
+        mixin = self.FakeInstanceStoreMixin()
+        m = mixin._get_instance(u=Unhashable())
+        assert mixin._get_instance(u=Unhashable()) == m
+        assert mixin._get_instance(u=Unhashable(), t=1) != m
+
+    def test_mixin_max_instances(self):
+        closed = []
+
+        class LimitedInstanceStoreMixin(self.FakeInstanceStoreMixin):
+            _MAX_INSTANCES = 2
+
+            def _close_instance(self, instance):
+                closed.append(instance)
+
+        mixin = LimitedInstanceStoreMixin()
+        m1, m2 = mixin._get_instance(t=1), mixin._get_instance(t=2)
+        assert mixin._get_instance(t=1) == m1
+        # The least recently used instance is closed
+        m3 = mixin._get_instance(t=3)
+        assert closed == [m2]
+        assert mixin._get_instance(t=1) == m1
+        assert mixin._get_instance(t=3) == m3
+        mixin._clear_instances()
+        assert sorted(closed) == sorted([m1, m2, m3])
+
+
+class TestResolver:
+    IPV4_ADDRS = [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (f'192.0.2.{i}', 80)) for i in range(2)]
+    IPV6_ADDRS = [(socket.AF_INET6, socket.SOCK_STREAM, 6, '', (f'2001:db8::{i}', 80, 0, 0)) for i in range(3)]
+
+    class FakeSocket:
+        def __init__(self, ip_addr):
+            self.ip_addr = ip_addr
+            self.closed = False
+
+        def close(self):
+            self.closed = True
+
+    def test_cache(self):
+        lookups = []
+
+        def getaddrinfo(host, port, *args):
+            lookups.append((host, port))
+            return self.IPV4_ADDRS
+
+        clock = [0]
+        resolver = Resolver(cache_ttl=10, getaddrinfo=getaddrinfo)
+        with unittest.mock.patch('time.monotonic', lambda: clock[0]):
+            assert resolver.resolve('example.com', 80) == self.IPV4_ADDRS
+            assert resolver.resolve('example.com', 80) == self.IPV4_ADDRS
+            resolver.resolve('example.com', 443)
+            assert lookups == [('example.com', 80), ('example.com', 443)]
+            clock[0] = 11
+            resolver.resolve('example.com', 80)
+            assert len(lookups) == 3
+
+        resolver = Resolver(getaddrinfo=getaddrinfo)
+        resolver.resolve('example.com', 80)
+        resolver.resolve('example.com', 80)
+        assert len(lookups) == 5
+
+    def test_invalidate_on_failure(self):
+        lookups = []
+
+        def getaddrinfo(host, port, *args):
+            lookups.append(host)
+            return self.IPV4_ADDRS
+
+        def create_socket(ip_addr, timeout, source_address):
+            raise ConnectionRefusedError(ip_addr[4][0])
+
+        resolver = Resolver(cache_ttl=60, getaddrinfo=getaddrinfo)
+        for _ in range(2):
+            with pytest.raises(ConnectionRefusedError, match='192.0.2.1'):
+                create_connection(('example.com', 80), resolver=resolver, _create_socket_func=create_socket)
+        assert lookups == ['example.com', 'example.com']
+
+    def test_interleave(self):
+        assert Resolver.interleave(self.IPV6_ADDRS + self.IPV4_ADDRS) == [
+            self.IPV6_ADDRS[0], self.IPV4_ADDRS[0], self.IPV6_ADDRS[1], self.IPV4_ADDRS[1], self.IPV6_ADDRS[2]]
+        assert Resolver.interleave(self.IPV4_ADDRS + self.IPV6_ADDRS[:1]) == [
+            self.IPV4_ADDRS[0], self.IPV6_ADDRS[0], self.IPV4_ADDRS[1]]
+
+    def test_happy_eyeballs(self):
+        attempts = []
+        unblock = threading.Event()
+
+        def create_socket(ip_addr, timeout, source_address):
+            attempts.append(ip_addr[4][0])
+            if ip_addr[4][0] == '2001:db8::0':
+                # Broken route; it only connects once the race is over
+                unblock.wait(5)
+                return sockets.setdefault(ip_addr[4][0], self.FakeSocket(ip_addr))
+            if ip_addr[4][0] == '192.0.2.0':
+                raise ConnectionRefusedError
+            return sockets.setdefault(ip_addr[4][0], self.FakeSocket(ip_addr))
+
+        sockets = {}
+        resolver = Resolver(happy_eyeballs_delay=0.1, getaddrinfo=lambda *_: self.IPV6_ADDRS + self.IPV4_ADDRS)
+        start = time.monotonic()
+        sock = create_connection(('example.com', 80), resolver=resolver, _create_socket_func=create_socket)
+        assert time.monotonic() - start < 2
+        # The failed IPv4 attempt starts the next one right away
+        assert attempts == ['2001:db8::0', '192.0.2.0', '2001:db8::1']
+        assert sock.ip_addr == self.IPV6_ADDRS[1]
+
+        unblock.set()
+        for _ in range(50):
+            if '2001:db8::0' in sockets and sockets['2001:db8::0'].closed:
+                break
+            time.sleep(0.05)
+        assert sockets['2001:db8::0'].closed
+        assert not sock.closed
+
+    def test_happy_eyeballs_failure(self):
+        def create_socket(ip_addr, timeout, source_address):
+            raise ConnectionRefusedError(ip_addr[4][0])
+
+        resolver = Resolver(happy_eyeballs_delay=0.1, getaddrinfo=lambda *_: self.IPV4_ADDRS)
+        with pytest.raises(ConnectionRefusedError):
+            create_connection(('example.com', 80), resolver=resolver, _create_socket_func=create_socket)
+
 
 class TestNetworkingExceptions:
 
@@ -10,7 +10,9 @@
 
 import contextlib
 import re
+import shutil
 import string
+import tempfile
 import urllib.request
 
 from test.helper import FakeYDL, is_download_test
@@ -190,6 +192,45 @@ def test_youtube_extract_player_info(self):
             self.assertEqual(player_id, expected_player_id)
 
 
+class TestNsigCache(unittest.TestCase):
+    PLAYER_URL = 'https://www.youtube.com/s/player/a1b2c3d4/player_ias.vflset/en_US/base.js'
+
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cachedir)
+
+    def make_ie(self):
+        ie = YoutubeIE(FakeYDL({'cachedir': self.cachedir}))
+        ie.extracted = 0
+
+        def extract_n_function_code(video_id, player_url):
+            ie.extracted += 1
+            return JSInterpreter(''), 'a1b2c3d4', (['a'], 'var b=a.split("");b.reverse();return b.join("")')
+
+        ie._extract_n_function_code = extract_n_function_code
+        return ie
+
+    def test_batch(self):
+        ie = self.make_ie()
+        self.assertEqual(
+            ie._decrypt_nsig_batch(['abc', 'def', 'abc'], 'id', self.PLAYER_URL), {'abc': 'cba', 'def': 'fed'})
+        self.assertEqual(ie._decrypt_nsig('ghi', 'id', self.PLAYER_URL), 'ihg')
+        self.assertEqual(ie._decrypt_nsig('abc', 'id', self.PLAYER_URL), 'cba')
+        self.assertEqual(ie.extracted, 2)
+
+    def test_persistent(self):
+        self.make_ie()._decrypt_nsig_batch(['abc', 'def'], 'id', self.PLAYER_URL)
+        ie = self.make_ie()
+        self.assertEqual(ie._decrypt_nsig_batch(['def', 'abc'], 'id', self.PLAYER_URL), {'def': 'fed', 'abc': 'cba'})
+        self.assertEqual(ie.extracted, 0)
+
+        ie._NSIG_RESULTS_CACHE_SIZE = 2
+        ie._decrypt_nsig('ghi', 'id', self.PLAYER_URL)
+        self.assertEqual(ie.cache.load('youtube-nsig-results', 'a1b2c3d4'), {'def': 'fed', 'ghi': 'ihg'})
+
+
 @is_download_test
 class TestSignature(unittest.TestCase):
     def setUp(self):
@@ -1,4 +1,5 @@
 import collections
+import concurrent.futures
 import contextlib
 import copy
 import datetime
@@ -18,11 +19,13 @@
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import tokenize
 import traceback
 import unicodedata
 
+from .archive import DownloadArchive, open_download_archive
 from .cache import Cache
 from .compat import functools, urllib  # isort: split
 from .compat import compat_os_name, compat_shlex_quote, urllib_req_to_req
@@ -30,10 +33,12 @@
 from .downloader import FFmpegFD, get_suitable_downloader, shorten_protocol_name
 from .downloader.rtmp import rtmpdump_version
 from .extractor import gen_extractor_classes, get_info_extractor
+from .extractor._urlindex import URLDispatchIndex
 from .extractor.common import UnsupportedURLIE
 from .extractor.openload import PhantomJSwrapper
 from .minicurses import format_text
 from .networking import HEADRequest, Request, RequestDirector
+from .networking._helper import Resolver
 from .networking.common import _REQUEST_HANDLERS, _RH_PREFERENCES
 from .networking.exceptions import (
     HTTPError,
@@ -125,7 +130,6 @@
     iri_to_uri,
     is_path_like,
     join_nonempty,
-    locked_file,
     make_archive_id,
     make_dir,
     number_of_digits,
@@ -265,6 +269,11 @@ class YoutubeDL:
     playlist_items:    Specific indices of playlist to download.
     playlistrandom:    Download playlist items in random order.
     lazy_playlist:     Process playlist entries as they are received.
+    concurrent_extractions: Number of playlist entries to extract at once, ahead of the
+                       entry being processed. The entries are still processed and
+                       downloaded one at a time, in order, but the messages
+                       of the extractions running ahead are interleaved with
+                       theirs. Default is 1
     matchtitle:        Download only matching titles.
     rejecttitle:       Reject downloads for matching titles.
     logger:            Log messages to a logging.Logger instance.
@@ -273,6 +282,10 @@ class YoutubeDL:
     writedescription:  Write the video description to a .description file
     writeinfojson:     Write the video description to a .info.json file
     clean_infojson:    Remove internal metadata from the infojson
+    json_lines:        Write the JSON of playlists (infojson and dump_single_json)
+                       as the playlist without its entries on the first line,
+                       followed by one line for each entry. dump_single_json
+                       then writes the entries as soon as they are processed
     getcomments:       Extract video comments. This will not be written to disk
                        unless writeinfojson is also given
     writeannotations:  Write the video annotations to a .annotations.xml file
@@ -298,6 +311,10 @@ class YoutubeDL:
     skip_download:     Skip the actual download of the video file
     cachedir:          Location of the cache files in the filesystem.
                        False to disable filesystem cache.
+    cache_max_size:    Maximum total size of the cache files in bytes.
+                       The least recently used files are removed when it is exceeded
+    cache_ttl:         A dictionary of the cache section (or "default") to the
+                       number of seconds after which its entries expire
     noplaylist:        Download single video instead of a playlist if in doubt.
     age_limit:         An integer representing the user's age in years.
                        Unsuitable videos for the given age are skipped.
@@ -310,8 +327,15 @@ class YoutubeDL:
                        downloaded.
                        Videos without view count information are always
                        downloaded. None for no limit.
-    download_archive:  A set, or the name of a file where all downloads are recorded.
+    download_archive:  A set, a yt_dlp.archive.DownloadArchive, or the name of a file where
+                       all downloads are recorded.
                        Videos already present in the file are not downloaded again.
+    download_archive_backend: How the download_archive file is stored. One of
+                       "text" (default; a list of IDs loaded into memory),
+                       "compact" (same as text, but kept in memory as hashes) or
+                       "sqlite" (an indexed database that is queried on demand)
+    import_download_archive: Name of a plain-text archive file whose IDs are
+                       added to the download_archive on startup
     break_on_existing: Stop the download process after attempting to download a
                        file that is in the archive.
     break_per_url:     Whether break_on_reject and break_on_existing
@@ -321,6 +345,8 @@ class YoutubeDL:
                        name/path from where cookies are loaded, the name of the keyring,
                        and the container name, e.g. ('chrome', ) or
                        ('vivaldi', 'default', 'BASICTEXT') or ('firefox', 'default', None, 'Meta')
+    cookiesfrombrowser_cache: Keep the cookies loaded from the browser in the cache
+                       directory until the browser's database is modified
     legacyserverconnect: Explicitly allow HTTPS connection to servers that do not
                        support RFC 5746 secure renegotiation
     nocheckcertificate:  Do not verify SSL certificates
@@ -403,6 +429,8 @@ class YoutubeDL:
                        - "detect_or_warn": check whether we can do anything
                                            about it, warn otherwise (default)
     source_address:    Client-side IP address to bind to.
+    dns_cache_ttl:     Seconds to cache the resolved addresses of hosts for
+    happy_eyeballs:    Race the connection attempts to the addresses of a host (RFC 8305)
     sleep_interval_requests: Number of seconds to sleep between requests
                        during extraction
     sleep_interval:    Number of seconds to sleep before each download when
@@ -476,8 +504,9 @@ class YoutubeDL:
     the downloader (see yt_dlp/downloader/common.py):
     nopart, updatetime, buffersize, ratelimit, throttledratelimit, min_filesize,
     max_filesize, test, noresizebuffer, retries, file_access_retries, fragment_retries,
-    continuedl, xattr_set_filesize, hls_use_mpegts, http_chunk_size,
-    external_downloader_args, concurrent_fragment_downloads.
+    continuedl, xattr_set_filesize, hls_use_mpegts, http_chunk_size, http_connections,
+    external_downloader_args, concurrent_fragment_downloads, max_concurrent_fragment_downloads,
+    fragment_memory_limit, fragment_engine.
 
     The following options are used by the post processors:
     ffmpeg_location:   Location of the ffmpeg/avconv binary; either the path
@@ -597,6 +626,7 @@ def __init__(self, params=None, auto_init=True):
         self.params = params
         self._ies = {}
         self._ies_instances = {}
+        self._ies_url_index = None
         self._pps = {k: [] for k in POSTPROCESS_WHEN}
         self._printed_messages = set()
         self._first_webpage_request = True
@@ -608,6 +638,11 @@ def __init__(self, params=None, auto_init=True):
         self._num_videos = 0
         self._playlist_level = 0
         self._playlist_urls = set()
+        # (url, ie_key) -> Future of the extraction started ahead by __prefetch_entries
+        self._prefetched_extractions = {}
+        # Format selectors and sorters are built once and reused for every video
+        self._format_selectors = {}
+        self._format_sorters = {}
         self.cache = Cache(self)
         self.__header_cookies = []
 
@@ -772,25 +807,20 @@ def check_deprecated(param, option, suggestion):
                 get_postprocessor(pp_def.pop('key'))(self, **pp_def),
                 when=when)
 
-        def preload_download_archive(fn):
-            """Preload the archive, if any is specified"""
-            archive = set()
+        def open_archive(fn):
+            """Open the archive, if any is specified"""
             if fn is None:
-                return archive
+                return set()
             elif not is_path_like(fn):
                 return fn
+            return open_download_archive(self, fn, self.params.get('download_archive_backend'))
 
-            self.write_debug(f'Loading archive file {fn!r}')
-            try:
-                with locked_file(fn, 'r', encoding='utf-8') as archive_file:
-                    for line in archive_file:
-                        archive.add(line.strip())
-            except OSError as ioe:
-                if ioe.errno != errno.ENOENT:
-                    raise
-            return archive
-
-        self.archive = preload_download_archive(self.params.get('download_archive'))
+        self.archive = open_archive(self.params.get('download_archive'))
+        if self.params.get('import_download_archive'):
+            if isinstance(self.archive, DownloadArchive):
+                self.archive.import_text(self.params['import_download_archive'])
+            else:
+                self.report_warning('Ignoring import_download_archive since download_archive is not a file')
 
     def warn_if_short_id(self, argv):
         # short YouTube ID starting with dash?
@@ -812,6 +842,7 @@ def add_info_extractor(self, ie):
         """Add an InfoExtractor object to the end of the list."""
         ie_key = ie.ie_key()
         self._ies[ie_key] = ie
+        self._ies_url_index = None
         if not isinstance(ie, type):
             self._ies_instances[ie_key] = ie
             ie.set_downloader(self)
@@ -897,6 +928,11 @@ def to_stdout(self, message, skip_eol=False, quiet=None):
                                      'Use "YoutubeDL.to_screen" instead')
         self._write_string(f'{self._bidi_workaround(message)}\n', self._out_files.out)
 
+    def _write_json_stdout(self, info_dict):
+        for chunk in self._iter_info_json(info_dict):
+            self._write_string(chunk, self._out_files.out)
+        self._write_string('\n', self._out_files.out)
+
     def to_screen(self, message, skip_eol=False, quiet=None, only_once=False):
         """Print message to screen if not in quiet mode"""
         if self.params.get('logger'):
@@ -958,6 +994,8 @@ def __exit__(self, *args):
     def close(self):
         self.save_cookies()
         self._request_director.close()
+        if isinstance(self.archive, DownloadArchive):
+            self.archive.close()
 
     def trouble(self, message=None, tb=None, is_error=True):
         """Determine action to take when a download problem appears.
@@ -1553,12 +1591,7 @@ def extract_info(self, url, download=True, ie_key=None, extra_info=None,
         if not ie_key and force_generic_extractor:
             ie_key = 'Generic'
 
-        if ie_key:
-            ies = {ie_key: self._ies[ie_key]} if ie_key in self._ies else {}
-        else:
-            ies = self._ies
-
-        for key, ie in ies.items():
+        for key, ie in self._candidate_ies(url, ie_key):
             if not ie.suitable(url):
                 continue
 
@@ -1579,6 +1612,15 @@ def extract_info(self, url, download=True, ie_key=None, extra_info=None,
             self.report_error(f'No suitable extractor{format_field(ie_key, None, " (%s)")} found for URL {url}',
                               tb=False if extractors_restricted else None)
 
+    def _candidate_ies(self, url, ie_key=None):
+        """@returns the (key, IE class) of the extractors that may be suitable for the URL, in order"""
+        if ie_key:
+            return [(ie_key, self._ies[ie_key])] if ie_key in self._ies else []
+        if self._ies_url_index is None:
+            self._ies_url_index = URLDispatchIndex(self._ies)
+        # Same order as self._ies, but skipping extractors that cannot match the URL
+        return self._ies_url_index.candidates(url)
+
     def _handle_extraction_exceptions(func):
         @functools.wraps(func)
         def wrapper(self, *args, **kwargs):
@@ -1718,8 +1760,9 @@ def _apply_header_cookies(self, url, cookies=None):
     def __extract_info(self, url, ie, download, extra_info, process):
         self._apply_header_cookies(url)
 
+        prefetched = self._prefetched_extractions.pop((url, ie.ie_key()), None)
         try:
-            ie_result = ie.extract(url)
+            ie_result = prefetched.result() if prefetched else ie.extract(url)
         except UserNotLive as e:
             if process:
                 if self.params.get('wait_for_video'):
@@ -1986,45 +2029,65 @@ def __process_playlist(self, ie_result, download):
         if keep_resolved_entries:
             self.write_debug('The information of all playlist entries will be held in memory')
 
+        workers = self.params.get('concurrent_extractions') or 1
+        extract_flat = self.params.get('extract_flat', False)
+        prefetch = workers > 1 and not (extract_flat is True or extract_flat == 'in_playlist')
+        if prefetch:
+            entries = self.__prefetch_entries(entries, workers)
+
+        # With json_lines, -J writes the entries of the outermost playlist as they are processed
+        stream_json = (self.params.get('dump_single_json') and self.params.get('json_lines')
+                       and self._playlist_level == 1)
+        if stream_json:
+            self._write_json_stdout(dict(ie_result, entries=None))
+
         failures = 0
         max_failures = self.params.get('skip_playlist_after_errors') or float('inf')
-        for i, (playlist_index, entry) in enumerate(entries):
-            if lazy:
-                resolved_entries.append((playlist_index, entry))
-            if not entry:
-                continue
+        try:
+            for i, (playlist_index, entry) in enumerate(entries):
+                if lazy:
+                    resolved_entries.append((playlist_index, entry))
+                if not entry:
+                    continue
 
-            entry['__x_forwarded_for_ip'] = ie_result.get('__x_forwarded_for_ip')
-            if not lazy and 'playlist-index' in self.params['compat_opts']:
-                playlist_index = ie_result['requested_entries'][i]
+                entry['__x_forwarded_for_ip'] = ie_result.get('__x_forwarded_for_ip')
+                if not lazy and 'playlist-index' in self.params['compat_opts']:
+                    playlist_index = ie_result['requested_entries'][i]
 
-            entry_copy = collections.ChainMap(entry, {
-                **common_info,
-                'n_entries': int_or_none(n_entries),
-                'playlist_index': playlist_index,
-                'playlist_autonumber': i + 1,
-            })
+                entry_copy = collections.ChainMap(entry, {
+                    **common_info,
+                    'n_entries': int_or_none(n_entries),
+                    'playlist_index': playlist_index,
+                    'playlist_autonumber': i + 1,
+                })
 
-            if self._match_entry(entry_copy, incomplete=True) is not None:
-                # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
-                resolved_entries[i] = (playlist_index, NO_DEFAULT)
-                continue
+                if self._match_entry(entry_copy, incomplete=True) is not None:
+                    # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
+                    resolved_entries[i] = (playlist_index, NO_DEFAULT)
+                    continue
 
-            self.to_screen('[download] Downloading item %s of %s' % (
-                self._format_screen(i + 1, self.Styles.ID), self._format_screen(n_entries, self.Styles.EMPHASIS)))
-
-            entry_result = self.__process_iterable_entry(entry, download, collections.ChainMap({
-                'playlist_index': playlist_index,
-                'playlist_autonumber': i + 1,
-            }, extra))
-            if not entry_result:
-                failures += 1
-            if failures >= max_failures:
-                self.report_error(
-                    f'Skipping the remaining entries in playlist "{title}" since {failures} items failed extraction')
-                break
-            if keep_resolved_entries:
-                resolved_entries[i] = (playlist_index, entry_result)
+                self.to_screen('[download] Downloading item %s of %s' % (
+                    self._format_screen(i + 1, self.Styles.ID), self._format_screen(n_entries, self.Styles.EMPHASIS)))
+
+                entry_result = self.__process_iterable_entry(entry, download, collections.ChainMap({
+                    'playlist_index': playlist_index,
+                    'playlist_autonumber': i + 1,
+                }, extra))
+                if not entry_result:
+                    failures += 1
+                if failures >= max_failures:
+                    self.report_error(
+                        f'Skipping the remaining entries in playlist "{title}" since {failures} items failed extraction')
+                    break
+                if keep_resolved_entries:
+                    resolved_entries[i] = (playlist_index, entry_result)
+                if stream_json and entry_result:
+                    self.post_extract(entry_result)
+                    self._write_json_stdout(entry_result)
+        finally:
+            if prefetch:
+                # Stops the extractions started ahead
+                entries.close()
 
         # Update with processed data
         ie_result['entries'] = [e for _, e in resolved_entries if e is not NO_DEFAULT]
@@ -2043,6 +2106,71 @@ def __process_playlist(self, ie_result, download):
         self.to_screen(f'[download] Finished downloading playlist: {title}')
         return ie_result
 
+    def __prefetch_entries(self, entries, workers):
+        """
+        Yield the playlist entries in order, while the URLs of the upcoming ones are extracted
+        by up to `workers` threads. __extract_info then uses the result (or exception) of the
+        extraction. Only the extractors run concurrently; processing the entries does not.
+        The messages of the extractors are written as they run, so they can be interleaved
+        with those of the entry being processed
+        """
+        limits = {}
+        started = []
+        pending = collections.deque()
+        entries = iter(entries)
+
+        def start(pool, entry):
+            if not isinstance(entry, dict) or entry.get('_type') not in ('url', 'url_transparent'):
+                return
+            url = sanitize_url(entry['url'], scheme='http' if self.params.get('prefer_insecure') else 'https')
+            key, ie = next(
+                ((key, ie) for key, ie in self._candidate_ies(url, entry.get('ie_key')) if ie.suitable(url)),
+                (None, None))
+            if ie is None or (url, key) in self._prefetched_extractions:
+                return
+            temp_id = ie.get_temp_id(url)
+            if temp_id is not None and self.in_download_archive({'id': temp_id, 'ie_key': key}):
+                return
+            if key not in limits:
+                limits[key] = threading.BoundedSemaphore(min(workers, ie._CONCURRENT_EXTRACTIONS or workers))
+            self._apply_header_cookies(url)
+            ie_instance = self.get_info_extractor(key)
+            # Log in once, here. Each extraction then runs on its own copy of the extractor,
+            # since extract() resets its printed messages and geo bypass IP
+            if not ie_instance._ready:
+                try:
+                    ie_instance.initialize()
+                except Exception:
+                    return  # The error is reported when the entry is extracted as usual
+            ie_instance = copy.copy(ie_instance)
+
+            def extract():
+                with limits[key]:
+                    return ie_instance.extract(url)
+
+            self._prefetched_extractions[(url, key)] = pool.submit(extract)
+            started.append((url, key))
+
+        pool = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='extract')
+        try:
+            while True:
+                # Extract ahead as many entries as there are threads
+                while len(pending) <= workers:
+                    item = next(entries, None)
+                    if item is None:
+                        break
+                    start(pool, item[1])
+                    pending.append(item)
+                if not pending:
+                    return
+                yield pending.popleft()
+        finally:
+            for key in started:
+                future = self._prefetched_extractions.pop(key, None)
+                if future:
+                    future.cancel()
+            pool.shutdown(wait=False)
+
     @_handle_extraction_exceptions
     def __process_iterable_entry(self, entry, download, extra_info):
         return self.process_ie_result(
@@ -2507,6 +2635,13 @@ def restore_last_token(self):
         parsed_selector = _parse_format_selection(iter(TokenIterator(tokens)))
         return _build_selector_function(parsed_selector)
 
+    def _get_format_selector(self, format_spec):
+        """Like build_format_selector, but reuses the selector that was built for the same format_spec"""
+        selector = self._format_selectors.get(format_spec)
+        if selector is None:
+            selector = self._format_selectors[format_spec] = self.build_format_selector(format_spec)
+        return selector
+
     def _calc_headers(self, info_dict, load_cookies=False):
         res = HTTPHeaderDict(self.params['http_headers'], info_dict.get('http_headers'))
         clean_headers(res)
@@ -2646,10 +2781,23 @@ def _raise_pending_errors(self, info):
         if err:
             self.report_error(err, tb=False)
 
+    def _get_format_sorter(self, field_preference):
+        key = (
+            tuple(field_preference), tuple(self.params.get('format_sort') or ()),
+            bool(self.params.get('prefer_free_formats')), bool(self.params.get('format_sort_force')))
+        sorter = self._format_sorters.get(key)
+        if sorter is None:
+            sorter = self._format_sorters[key] = FormatSorter(self, field_preference)
+        elif self.params.get('verbose'):
+            sorter.print_verbose_info(self.write_debug)
+        return sorter
+
     def sort_formats(self, info_dict):
         formats = self._get_formats(info_dict)
-        formats.sort(key=FormatSorter(
-            self, info_dict.get('_format_sort_fields') or []).calculate_preference)
+        sorter = self._get_format_sorter(info_dict.get('_format_sort_fields') or [])
+        formats.sort(key=sorter.calculate_preference)
+        if self.params.get('verbose') and self.params.get('listformats'):
+            sorter.print_sort_keys(self.write_debug, formats)
 
     def process_video_result(self, info_dict, download=True):
         assert info_dict.get('_type', 'video') == 'video'
@@ -2888,7 +3036,7 @@ def is_wellformed(f):
                                    + '(Press ENTER for default, or Ctrl+C to quit)'
                                    + self._format_screen(': ', self.Styles.EMPHASIS))
                 try:
-                    format_selector = self.build_format_selector(req_format) if req_format else None
+                    format_selector = self._get_format_selector(req_format) if req_format else None
                 except SyntaxError as err:
                     self.report_error(err, tb=False, is_error=False)
                     continue
@@ -2896,7 +3044,7 @@ def is_wellformed(f):
             if format_selector is None:
                 req_format = self._default_format_spec(info_dict, download=download)
                 self.write_debug(f'Default format spec: {req_format}')
-                format_selector = self.build_format_selector(req_format)
+                format_selector = self._get_format_selector(req_format)
 
             formats_to_download = list(format_selector({
                 'formats': formats,
@@ -3044,6 +3192,9 @@ def _forceprint(self, key, info_dict):
             info_copy['urls'] = '\n'.join(f['url'] + f.get('play_path', '') for f in info_dict['requested_formats'])
         elif info_dict.get('url'):
             info_copy['urls'] = info_dict['url'] + info_dict.get('play_path', '')
+        # Rendering the tables is expensive for videos with many formats
+        if not self.params['forceprint'].get(key) and not self.params['print_to_file'].get(key):
+            return info_copy
         info_copy['formats_table'] = self.render_formats_table(info_dict)
         info_copy['thumbnails_table'] = self.render_thumbnails_table(info_dict)
         info_copy['subtitles_table'] = self.render_subtitles_table(info_dict.get('id'), info_dict.get('subtitles'))
@@ -3523,8 +3674,11 @@ def wrapper(*args, **kwargs):
                 self._num_downloads = 0
             else:
                 if self.params.get('dump_single_json', False):
+                    if (self.params.get('json_lines') and isinstance(res, dict)
+                            and res.get('_type') in ('playlist', 'multi_video')):
+                        return  # Already written by __process_playlist
                     self.post_extract(res)
-                    self.to_stdout(json.dumps(self.sanitize_info(res)))
+                    self._write_json_stdout(res)
         return wrapper
 
     def download(self, url_list):
@@ -3548,8 +3702,15 @@ def download_with_info_file(self, info_filename):
                 [info_filename], mode='r',
                 openhook=fileinput.hook_encoded('utf-8'))) as f:
             # FileInput doesn't have a read method, we can't call json.load
-            infos = [self.sanitize_info(info, self.params.get('clean_infojson', True))
-                     for info in variadic(json.loads('\n'.join(f)))]
+            lines = list(f)
+        try:
+            infos = variadic(json.loads('\n'.join(lines)))
+        except json.JSONDecodeError:
+            # Written with json_lines: the playlist followed by its entries
+            infos = [json.loads(line) for line in lines if line.strip()]
+            if traverse_obj(infos, (0, '_type')) in ('playlist', 'multi_video') and infos[0].get('entries') is None:
+                infos = [{**infos[0], 'entries': infos[1:]}]
+        infos = [self.sanitize_info(info, self.params.get('clean_infojson', True)) for info in infos]
         for info in infos:
             try:
                 self.__download_wrapper(self.process_ie_result)(info, download=True)
@@ -3576,7 +3737,10 @@ def sanitize_info(info_dict, remove_private_keys=False):
             'release_git_head': RELEASE_GIT_HEAD,
             'repository': ORIGIN,
         })
+        return YoutubeDL._sanitize_obj(info_dict, remove_private_keys)
 
+    @staticmethod
+    def _sanitize_obj(obj, remove_private_keys=False):
         if remove_private_keys:
             reject = lambda k, v: v is None or k.startswith('__') or k in {
                 'requested_downloads', 'requested_formats', 'requested_subtitles', 'requested_entries',
@@ -3596,7 +3760,51 @@ def filter_fn(obj):
             else:
                 return repr(obj)
 
-        return filter_fn(info_dict)
+        return filter_fn(obj)
+
+    class _EntriesPlaceholder:
+        # Encoded in place of the entries, which are then written one at a time
+        def __repr__(self):
+            return '\0entries\0'
+
+    def _iter_info_json(self, info_dict, remove_private_keys=False, ensure_ascii=True, json_lines=False):
+        """
+        Encode the sanitized info_dict as JSON in chunks, like json.dumps(self.sanitize_info(info_dict)) does
+
+        The entries of playlists are sanitized and encoded one at a time, so that neither
+        the sanitized copy nor the JSON of the whole playlist needs to be held in memory
+
+        @param json_lines   Write the playlist without its entries on the first line,
+                            followed by one line for each entry (NDJSON)
+        """
+        encode = json.JSONEncoder(ensure_ascii=ensure_ascii).encode
+
+        def iter_json(obj, sanitize, json_lines=False):
+            entries = obj.get('entries') if isinstance(obj, dict) and not remove_private_keys else None
+            if not isinstance(entries, (list, tuple, LazyList)):
+                yield encode(sanitize(obj))
+                return
+            obj['entries'] = placeholder = self._EntriesPlaceholder()
+            try:
+                head, tail = encode(sanitize(obj)).split(encode(repr(placeholder)), 1)
+            finally:
+                obj['entries'] = entries
+            if json_lines:
+                yield f'{head}null{tail}'
+                for entry in entries:
+                    yield '\n'
+                    yield from iter_json(entry, sanitize_entry)
+                return
+            yield f'{head}['
+            for i, entry in enumerate(entries):
+                if i:
+                    yield ', '
+                yield from iter_json(entry, sanitize_entry)
+            yield f']{tail}'
+
+        sanitize_entry = functools.partial(self._sanitize_obj, remove_private_keys=remove_private_keys)
+        yield from iter_json(info_dict, functools.partial(
+            self.sanitize_info, remove_private_keys=remove_private_keys), json_lines)
 
     @staticmethod
     def filter_requested_info(info_dict, actually_filter=True):
@@ -3698,7 +3906,7 @@ def _make_archive_id(self, info_dict):
         return make_archive_id(extractor, video_id)
 
     def in_download_archive(self, info_dict):
-        if not self.archive:
+        if self.params.get('download_archive') is None:
             return False
 
         vid_ids = [self._make_archive_id(info_dict)]
@@ -3713,9 +3921,6 @@ def record_download_archive(self, info_dict):
         assert vid_id
 
         self.write_debug(f'Adding to archive: {vid_id}')
-        if is_path_like(fn):
-            with locked_file(fn, 'a', encoding='utf-8') as archive_file:
-                archive_file.write(vid_id + '\n')
         self.archive.add(vid_id)
 
     @staticmethod
@@ -4043,6 +4248,15 @@ def proxies(self):
 
         return proxies
 
+    @functools.cached_property
+    def _resolver(self):
+        """Resolver shared by all the connections, or None to use the system's resolver directly"""
+        if self.params.get('dns_cache_ttl') is None and not self.params.get('happy_eyeballs'):
+            return None
+        return Resolver(
+            cache_ttl=self.params.get('dns_cache_ttl'),
+            happy_eyeballs_delay=Resolver.DEFAULT_HAPPY_EYEBALLS_DELAY if self.params.get('happy_eyeballs') else None)
+
     @functools.cached_property
     def cookiejar(self):
         """Global cookiejar instance"""
@@ -4127,6 +4341,7 @@ def build_request_director(self, handlers, preferences=None):
                 headers=headers,
                 cookiejar=self.cookiejar,
                 proxies=proxies,
+                resolver=self._resolver,
                 prefer_system_certs='no-certifi' in self.params['compat_opts'],
                 verify=not self.params.get('nocheckcertificate'),
                 **traverse_obj(self.params, {
@@ -4180,7 +4395,9 @@ def _write_info_json(self, label, ie_result, infofn, overwrite=None):
 
         self.to_screen(f'[info] Writing {label} metadata as JSON to: {infofn}')
         try:
-            write_json_file(self.sanitize_info(ie_result, self.params.get('clean_infojson', True)), infofn)
+            write_json_file(ie_result, infofn, encoder=functools.partial(
+                self._iter_info_json, remove_private_keys=self.params.get('clean_infojson', True),
+                ensure_ascii=False, json_lines=self.params.get('json_lines')))
             return True
         except OSError:
             self.report_error(f'Cannot write {label} metadata to JSON file {infofn}')
@@ -14,8 +14,10 @@
 import re
 import traceback
 
+from .archive import ARCHIVE_BACKENDS
 from .compat import compat_shlex_quote
 from .cookies import SUPPORTED_BROWSERS, SUPPORTED_KEYRINGS
+from .dependencies import sqlite3
 from .downloader.external import get_external_downloader
 from .extractor import list_extractor_classes
 from .extractor.adobepass import MSO_INFO
@@ -201,6 +203,10 @@ def validate_minmax(min_val, max_val, min_name, max_name=None):
     validate_positive('autonumber start', opts.autonumber_start)
     validate_positive('autonumber size', opts.autonumber_size, True)
     validate_positive('concurrent fragments', opts.concurrent_fragment_downloads, True)
+    validate_positive('concurrent extractions', opts.concurrent_extractions, True)
+    validate_minmax(opts.concurrent_fragment_downloads, opts.max_concurrent_fragment_downloads, 'concurrent fragments')
+    validate_positive('http connections', opts.http_connections, True)
+    validate_positive('DNS cache TTL', opts.dns_cache_ttl)
     validate_positive('playlist start', opts.playliststart, True)
     if opts.playlistend != -1:
         validate_minmax(opts.playliststart, opts.playlistend, 'playlist start', 'playlist end')
@@ -281,6 +287,10 @@ def parse_sleep_func(expr):
         except AttributeError:
             raise ValueError(f'invalid {key} retry sleep expression {expr!r}')
 
+    for key, duration in opts.cache_ttl.items():
+        opts.cache_ttl[key] = parse_duration(duration)
+        validate(opts.cache_ttl[key] is not None, f'{key} cache TTL', duration)
+
     # Bytes
     def validate_bytes(name, value):
         if value is None:
@@ -295,6 +305,8 @@ def validate_bytes(name, value):
     opts.max_filesize = validate_bytes('max filesize', opts.max_filesize)
     opts.buffersize = validate_bytes('buffer size', opts.buffersize)
     opts.http_chunk_size = validate_bytes('http chunk size', opts.http_chunk_size)
+    opts.cache_max_size = validate_bytes('cache max size', opts.cache_max_size)
+    opts.fragment_memory_limit = validate_bytes('fragment memory limit', opts.fragment_memory_limit)
 
     # Output templates
     def validate_outtmpl(tmpl, msg):
@@ -437,6 +449,13 @@ def metadataparser_actions(f):
 
     if opts.download_archive is not None:
         opts.download_archive = expand_path(opts.download_archive)
+    validate_in('download archive backend', opts.download_archive_backend, ARCHIVE_BACKENDS)
+    validate(opts.download_archive_backend != 'sqlite' or sqlite3, 'download archive backend',
+             msg='The sqlite {name} requires sqlite3 support in the python interpreter')
+    if opts.import_download_archive is not None:
+        validate(opts.download_archive is not None, 'archive to import into',
+                 msg='--download-archive is required to use --import-download-archive')
+        opts.import_download_archive = expand_path(opts.import_download_archive)
 
     if opts.ffmpeg_location is not None:
         opts.ffmpeg_location = expand_path(opts.ffmpeg_location)
@@ -746,7 +765,7 @@ def parse_options(argv=None):
                                and opts.allow_playlist_files and opts.outtmpl.get('pl_infojson') != '')
     if not any((
         opts.extract_flat,
-        opts.dump_single_json,
+        opts.dump_single_json and not opts.json_lines,
         opts.forceprint.get('playlist'),
         opts.print_to_file.get('playlist'),
         write_playlist_infojson,
@@ -823,10 +842,14 @@ def parse_options(argv=None):
         'retry_sleep_functions': opts.retry_sleep,
         'skip_unavailable_fragments': opts.skip_unavailable_fragments,
         'keep_fragments': opts.keep_fragments,
+        'fragment_memory_limit': opts.fragment_memory_limit,
         'concurrent_fragment_downloads': opts.concurrent_fragment_downloads,
+        'max_concurrent_fragment_downloads': opts.max_concurrent_fragment_downloads,
+        'fragment_engine': opts.fragment_engine,
         'buffersize': opts.buffersize,
         'noresizebuffer': opts.noresizebuffer,
         'http_chunk_size': opts.http_chunk_size,
+        'http_connections': opts.http_connections,
         'continuedl': opts.continue_dl,
         'noprogress': opts.quiet if opts.noprogress is None else opts.noprogress,
         'progress_with_newline': opts.progress_with_newline,
@@ -836,6 +859,7 @@ def parse_options(argv=None):
         'playlistreverse': opts.playlist_reverse,
         'playlistrandom': opts.playlist_random,
         'lazy_playlist': opts.lazy_playlist,
+        'concurrent_extractions': opts.concurrent_extractions,
         'noplaylist': opts.noplaylist,
         'logtostderr': opts.outtmpl.get('default') == '-',
         'consoletitle': opts.consoletitle,
@@ -846,6 +870,7 @@ def parse_options(argv=None):
         'writeinfojson': opts.writeinfojson,
         'allow_playlist_files': opts.allow_playlist_files,
         'clean_infojson': opts.clean_infojson,
+        'json_lines': opts.json_lines,
         'getcomments': opts.getcomments,
         'writethumbnail': opts.writethumbnail is True,
         'write_all_thumbnails': opts.writethumbnail == 'all',
@@ -876,15 +901,20 @@ def parse_options(argv=None):
         'max_views': opts.max_views,
         'daterange': opts.date,
         'cachedir': opts.cachedir,
+        'cache_max_size': opts.cache_max_size,
+        'cache_ttl': opts.cache_ttl,
         'youtube_print_sig_code': opts.youtube_print_sig_code,
         'age_limit': opts.age_limit,
         'download_archive': opts.download_archive,
+        'download_archive_backend': opts.download_archive_backend,
+        'import_download_archive': opts.import_download_archive,
         'break_on_existing': opts.break_on_existing,
         'break_on_reject': opts.break_on_reject,
         'break_per_url': opts.break_per_url,
         'skip_playlist_after_errors': opts.skip_playlist_after_errors,
         'cookiefile': opts.cookiefile,
         'cookiesfrombrowser': opts.cookiesfrombrowser,
+        'cookiesfrombrowser_cache': opts.cookiesfrombrowser_cache,
         'legacyserverconnect': opts.legacy_server_connect,
         'nocheckcertificate': opts.no_check_certificate,
         'prefer_insecure': opts.prefer_insecure,
@@ -911,6 +941,8 @@ def parse_options(argv=None):
         'postprocessors': postprocessors,
         'fixup': opts.fixup,
         'source_address': opts.source_address,
+        'dns_cache_ttl': opts.dns_cache_ttl,
+        'happy_eyeballs': opts.happy_eyeballs,
         'call_home': opts.call_home,
         'sleep_interval_requests': opts.sleep_interval_requests,
         'sleep_interval': opts.sleep_interval,
@@ -1,4 +1,5 @@
 import base64
+import struct
 from math import ceil
 
 from .compat import compat_ord
@@ -17,7 +18,7 @@ def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
 else:
     def aes_cbc_decrypt_bytes(data, key, iv):
         """ Decrypt bytes with AES-CBC using native implementation since pycryptodome is unavailable """
-        return intlist_to_bytes(aes_cbc_decrypt(*map(bytes_to_intlist, (data, key, iv))))
+        return _aes_cbc_decrypt_words(data, key, iv)
 
     def aes_gcm_decrypt_and_verify_bytes(data, key, tag, nonce):
         """ Decrypt bytes with AES-GCM using native implementation since pycryptodome is unavailable """
@@ -162,21 +163,89 @@ def aes_cbc_decrypt(data, key, iv):
     @param {int[]} iv          16-Byte IV
     @returns {int[]}           decrypted data
     """
-    expanded_key = key_expansion(key)
-    block_count = int(ceil(float(len(data)) / BLOCK_SIZE_BYTES))
+    return bytes_to_intlist(_aes_cbc_decrypt_words(*map(intlist_to_bytes, (data, key, iv))))
 
-    decrypted_data = []
-    previous_cipher_block = iv
-    for i in range(block_count):
-        block = data[i * BLOCK_SIZE_BYTES: (i + 1) * BLOCK_SIZE_BYTES]
-        block += [0] * (BLOCK_SIZE_BYTES - len(block))
 
-        decrypted_block = aes_decrypt(block, expanded_key)
-        decrypted_data += xor(decrypted_block, previous_cipher_block)
-        previous_cipher_block = block
-    decrypted_data = decrypted_data[:len(data)]
+def _aes_cbc_decrypt_words(data, key, iv):
+    """
+    Decrypt with aes in CBC mode, operating on 32-bit words using the lookup tables
 
-    return decrypted_data
+    @param {bytes} data        cipher
+    @param {bytes} key         16/24/32-Byte cipher key
+    @param {bytes} iv          16-Byte IV
+    @returns {bytes}           decrypted data
+    """
+    data_length = len(data)
+    if data_length % BLOCK_SIZE_BYTES:
+        data = bytes(data) + bytes(BLOCK_SIZE_BYTES - data_length % BLOCK_SIZE_BYTES)
+    word_count = len(data) // 4
+    words = struct.unpack(f'>{word_count}I', data)
+    decryption_key = _decryption_key_words(key)
+    f0, f1, f2, f3 = decryption_key[-4:]
+    round_keys = [decryption_key[i:i + 4] for i in range(4, len(decryption_key) - 4, 4)]
+    td0, td1, td2, td3, sbox_inv = TD0, TD1, TD2, TD3, SBOX_INV
+    k0, k1, k2, k3 = decryption_key[:4]
+
+    decrypted = [0] * word_count
+    p0, p1, p2, p3 = struct.unpack('>4I', iv)
+    for i in range(0, word_count, 4):
+        c0, c1, c2, c3 = words[i:i + 4]
+        s0, s1, s2, s3 = c0 ^ k0, c1 ^ k1, c2 ^ k2, c3 ^ k3
+        for r0, r1, r2, r3 in round_keys:
+            t0 = td0[s0 >> 24] ^ td1[s3 >> 16 & 0xFF] ^ td2[s2 >> 8 & 0xFF] ^ td3[s1 & 0xFF] ^ r0
+            t1 = td0[s1 >> 24] ^ td1[s0 >> 16 & 0xFF] ^ td2[s3 >> 8 & 0xFF] ^ td3[s2 & 0xFF] ^ r1
+            t2 = td0[s2 >> 24] ^ td1[s1 >> 16 & 0xFF] ^ td2[s0 >> 8 & 0xFF] ^ td3[s3 & 0xFF] ^ r2
+            s3 = td0[s3 >> 24] ^ td1[s2 >> 16 & 0xFF] ^ td2[s1 >> 8 & 0xFF] ^ td3[s0 & 0xFF] ^ r3
+            s0 = t0
+            s1 = t1
+            s2 = t2
+        decrypted[i:i + 4] = (
+            (sbox_inv[s0 >> 24] << 24 | sbox_inv[s3 >> 16 & 0xFF] << 16
+             | sbox_inv[s2 >> 8 & 0xFF] << 8 | sbox_inv[s1 & 0xFF]) ^ f0 ^ p0,
+            (sbox_inv[s1 >> 24] << 24 | sbox_inv[s0 >> 16 & 0xFF] << 16
+             | sbox_inv[s3 >> 8 & 0xFF] << 8 | sbox_inv[s2 & 0xFF]) ^ f1 ^ p1,
+            (sbox_inv[s2 >> 24] << 24 | sbox_inv[s1 >> 16 & 0xFF] << 16
+             | sbox_inv[s0 >> 8 & 0xFF] << 8 | sbox_inv[s3 & 0xFF]) ^ f2 ^ p2,
+            (sbox_inv[s3 >> 24] << 24 | sbox_inv[s2 >> 16 & 0xFF] << 16
+             | sbox_inv[s1 >> 8 & 0xFF] << 8 | sbox_inv[s0 & 0xFF]) ^ f3 ^ p3)
+        p0, p1, p2, p3 = c0, c1, c2, c3
+
+    return struct.pack(f'>{word_count}I', *decrypted)[:data_length]
+
+
+class AESCBCStreamDecrypter:
+    """
+    Incremental AES-CBC decryption of PKCS#7 padded data
+
+    The data can be fed in chunks of any size. The last decrypted block is held back
+    until finish(), since it is the one the padding is removed from
+
+    @param {bytes} key         16/24/32-Byte cipher key
+    @param {bytes} iv          16-Byte IV
+    """
+
+    def __init__(self, key, iv):
+        self._key, self._iv = key, iv
+        # Data of the incomplete block at the end, and the decrypted last block
+        self._pending = self._last_block = b''
+
+    def update(self, data):
+        """@returns the plaintext decrypted so far, excluding the last block"""
+        data = self._pending + bytes(data)
+        end = len(data) - len(data) % BLOCK_SIZE_BYTES
+        self._pending = data[end:]
+        if not end:
+            return b''
+        decrypted = aes_cbc_decrypt_bytes(data[:end], self._key, self._iv)
+        self._iv = data[end - BLOCK_SIZE_BYTES:end]
+        decrypted, self._last_block = self._last_block + decrypted[:-BLOCK_SIZE_BYTES], decrypted[-BLOCK_SIZE_BYTES:]
+        return decrypted
+
+    def finish(self):
+        """@returns the unpadded last block"""
+        if self._pending:
+            raise ValueError('Data must be padded to %d byte boundary in CBC mode' % BLOCK_SIZE_BYTES)
+        return self._last_block and unpad_pkcs7(self._last_block)
 
 
 def aes_cbc_encrypt(data, key, iv, *, padding_mode='pkcs7'):
@@ -398,6 +467,41 @@ def aes_decrypt_text(data, password, key_size_bytes):
                       0x67, 0x4a, 0xed, 0xde, 0xc5, 0x31, 0xfe, 0x18, 0x0d, 0x63, 0x8c, 0x80, 0xc0, 0xf7, 0x70, 0x07)
 
 
+def _gf_multiply(a, b):
+    return 0 if a == 0 or b == 0 else RIJNDAEL_EXP_TABLE[(RIJNDAEL_LOG_TABLE[a] + RIJNDAEL_LOG_TABLE[b]) % 0xFF]
+
+
+def _rotate_word(word, bits):
+    return (word >> bits | word << (32 - bits)) & 0xFFFFFFFF
+
+
+# Each entry combines InvSubBytes and InvMixColumns for one byte of a column;
+# TD1-3 are the same table rotated for the other rows
+TD0 = tuple(
+    _gf_multiply(x, 0xE) << 24 | _gf_multiply(x, 0x9) << 16 | _gf_multiply(x, 0xD) << 8 | _gf_multiply(x, 0xB)
+    for x in SBOX_INV)
+TD1, TD2, TD3 = (tuple(_rotate_word(word, bits) for word in TD0) for bits in (8, 16, 24))
+
+
+def _decryption_key_words(key):
+    """
+    Generate the key schedule of the equivalent inverse cipher (FIPS 197, 5.3.5)
+
+    @param {bytes} key   16/24/32-Byte cipher key
+    @returns {int[]}     44/52/60 32-bit words; the round keys in reverse order,
+                         with InvMixColumns applied to all but the first and last
+    """
+    expanded_key = intlist_to_bytes(key_expansion(bytes_to_intlist(key)))
+    words = struct.unpack(f'>{len(expanded_key) // 4}I', expanded_key)
+    round_keys = [words[i:i + 4] for i in range(0, len(words), 4)][::-1]
+    return [
+        *round_keys[0],
+        *(TD0[SBOX[word >> 24]] ^ TD1[SBOX[word >> 16 & 0xFF]] ^ TD2[SBOX[word >> 8 & 0xFF]] ^ TD3[SBOX[word & 0xFF]]
+          for round_key in round_keys[1:-1] for word in round_key),
+        *round_keys[-1],
+    ]
+
+
 def key_expansion(data):
     """
     Generate key schedule
@@ -545,6 +649,7 @@ def ghash(subkey, data):
 
 
 __all__ = [
+    'AESCBCStreamDecrypter',
     'aes_cbc_decrypt',
     'aes_cbc_decrypt_bytes',
     'aes_ctr_decrypt',
@@ -0,0 +1,209 @@
+import array
+import bisect
+import contextlib
+import errno
+import hashlib
+import os
+import sys
+import threading
+
+from .dependencies import sqlite3
+from .utils import locked_file
+
+
+class DownloadArchive:
+    """
+    Base class for download archives
+
+    An archive is a persistent set of the IDs made by make_archive_id.
+    Subclasses must implement __contains__ and add_many
+    """
+
+    def __init__(self, ydl, fn):
+        self._ydl = ydl
+        self.filename = fn
+
+    def __contains__(self, vid_id):
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+    def add(self, vid_id):
+        self.add_many((vid_id, ))
+
+    def add_many(self, vid_ids):
+        """Record all the IDs in a single write"""
+        raise NotImplementedError('This method must be implemented by subclasses')
+
+    def import_text(self, fn):
+        """Add all the IDs from a plain-text archive file"""
+        self._ydl.write_debug(f'Importing archive file {fn!r}')
+        with locked_file(fn, 'r', encoding='utf-8') as archive_file:
+            self.add_many(filter(None, map(str.strip, archive_file)))
+
+    def close(self):
+        pass
+
+
+class TextDownloadArchive(DownloadArchive):
+    """The plain-text archive file with one ID per line, preloaded into memory"""
+
+    def __init__(self, ydl, fn):
+        super().__init__(ydl, fn)
+        self._ydl.write_debug(f'Loading archive file {fn!r}')
+        self._ids = self._load()
+
+    def _load(self):
+        ids = set()
+        try:
+            with locked_file(self.filename, 'r', encoding='utf-8') as archive_file:
+                for line in archive_file:
+                    ids.add(line.strip())
+        except OSError as ioe:
+            if ioe.errno != errno.ENOENT:
+                raise
+        return ids
+
+    def __contains__(self, vid_id):
+        return vid_id in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add_many(self, vid_ids):
+        vid_ids = [vid_id for vid_id in vid_ids if vid_id not in self._ids]
+        if not vid_ids:
+            return
+        with locked_file(self.filename, 'a', encoding='utf-8') as archive_file:
+            archive_file.write(''.join(f'{vid_id}\n' for vid_id in vid_ids))
+        self._ids.update(vid_ids)
+
+
+def _hash_id(vid_id):
+    return int.from_bytes(hashlib.blake2b(vid_id.encode(), digest_size=8).digest(), 'little', signed=True)
+
+
+class CompactTextDownloadArchive(TextDownloadArchive):
+    """
+    The plain-text archive file, kept in memory as 64-bit hashes of the IDs
+
+    The hashes are kept in arrays, using ~8 bytes per ID instead of a set of strings.
+    Each array is only sorted when it is first looked up, to keep the startup fast.
+    There is a negligible chance (~ n / 2**64) of an ID being falsely reported as present
+    """
+
+    _BUCKETS = 256
+    # The hashes need only be consistent within the process; builtin hash is much faster
+    _hash = staticmethod(hash if sys.hash_info.width >= 64 else _hash_id)
+
+    def _load(self):
+        buckets = [array.array('q') for _ in range(self._BUCKETS)]
+        appends, mask = [bucket.append for bucket in buckets], self._BUCKETS - 1
+        try:
+            with locked_file(self.filename, 'r', encoding='utf-8') as archive_file:
+                for h in map(self._hash, map(str.strip, archive_file)):
+                    appends[h & mask](h)
+        except OSError as ioe:
+            if ioe.errno != errno.ENOENT:
+                raise
+        self._unsorted = set(range(self._BUCKETS))
+        return buckets
+
+    def _bucket(self, h):
+        key = h & (self._BUCKETS - 1)
+        if key in self._unsorted:
+            self._ids[key] = array.array('q', sorted(set(self._ids[key])))
+            self._unsorted.discard(key)
+        return self._ids[key]
+
+    def _find(self, vid_id):
+        h = self._hash(vid_id)
+        bucket = self._bucket(h)
+        idx = bisect.bisect_left(bucket, h)
+        return bucket, idx, h, idx < len(bucket) and bucket[idx] == h
+
+    def __contains__(self, vid_id):
+        return self._find(vid_id)[-1]
+
+    def __len__(self):
+        return sum(len(self._bucket(key)) for key in range(self._BUCKETS))
+
+    def add_many(self, vid_ids):
+        vid_ids = list(dict.fromkeys(vid_id for vid_id in vid_ids if vid_id not in self))
+        if not vid_ids:
+            return
+        with locked_file(self.filename, 'a', encoding='utf-8') as archive_file:
+            archive_file.write(''.join(f'{vid_id}\n' for vid_id in vid_ids))
+        for vid_id in vid_ids:
+            bucket, idx, h, _ = self._find(vid_id)
+            bucket.insert(idx, h)
+
+
+class SQLiteDownloadArchive(DownloadArchive):
+    """
+    Archive stored as an indexed SQLite database
+
+    Lookups are done on disk, so the archive is never loaded into memory.
+    Multiple processes can share the same file; writes are serialized by SQLite
+    """
+
+    _TIMEOUT = 60
+
+    def __init__(self, ydl, fn):
+        super().__init__(ydl, fn)
+        if not sqlite3:
+            raise ImportError('sqlite3 is required for the SQLite download archive, but is not available')
+        self._ydl.write_debug(f'Opening SQLite archive {fn!r}')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            fn, timeout=self._TIMEOUT, isolation_level=None, check_same_thread=False)
+        try:
+            self._conn.execute('PRAGMA busy_timeout = %d' % (self._TIMEOUT * 1000))
+            self._conn.execute('PRAGMA journal_mode = WAL')
+            self._conn.execute('PRAGMA synchronous = NORMAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS archive (id TEXT PRIMARY KEY) WITHOUT ROWID')
+        except sqlite3.DatabaseError as e:
+            self._conn.close()
+            raise OSError(f'{fn!r} is not a SQLite download archive: {e}. '
+                          'Plain-text archives must be imported using --import-download-archive') from e
+
+    def __contains__(self, vid_id):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT 1 FROM archive WHERE id = ?', (vid_id, )).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM archive').fetchone()[0]
+
+    def add_many(self, vid_ids):
+        with self._lock, self._transaction():
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO archive (id) VALUES (?)', ((vid_id, ) for vid_id in vid_ids))
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock upfront so that concurrent writers wait for
+        # each other (upto busy_timeout) instead of failing on lock upgrade
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+ARCHIVE_BACKENDS = {
+    'text': TextDownloadArchive,
+    'compact': CompactTextDownloadArchive,
+    'sqlite': SQLiteDownloadArchive,
+}
+
+
+def open_download_archive(ydl, fn, backend=None):
+    """Open the archive file fn using the given backend (default: text)"""
+    fn = os.fspath(fn)
+    return ARCHIVE_BACKENDS[backend or 'text'](ydl, fn)
@@ -1,8 +1,11 @@
+import collections
 import contextlib
 import json
 import os
 import re
 import shutil
+import threading
+import time
 import traceback
 import urllib.parse
 
@@ -11,8 +14,21 @@
 
 
 class Cache:
+    """
+    Cache of JSON data in the filesystem, with the recently used entries also kept in memory
+
+    Each file records when it was stored, which the per-section TTLs (cache_ttl) are checked against.
+    The file's mtime is updated when the file is loaded, and the least recently used
+    files are removed when the total size exceeds cache_max_size
+    """
+
+    # Maximum number of entries kept in memory
+    _MEMORY_ENTRIES = 256
+
     def __init__(self, ydl):
         self._ydl = ydl
+        self._memory = collections.OrderedDict()
+        self._memory_lock = threading.Lock()
 
     def _get_root_dir(self):
         res = self._ydl.params.get('cachedir')
@@ -30,28 +46,65 @@ def _get_cache_fn(self, section, key, dtype):
     def enabled(self):
         return self._ydl.params.get('cachedir') is not False
 
-    def store(self, section, key, data, dtype='json'):
+    def _remember(self, fn, text):
+        with self._memory_lock:
+            self._memory[fn] = text
+            self._memory.move_to_end(fn)
+            while len(self._memory) > self._MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+    def _recall(self, fn):
+        with self._memory_lock:
+            text = self._memory.get(fn)
+            if text is not None:
+                self._memory.move_to_end(fn)
+            return text
+
+    def _forget(self, fn=None):
+        with self._memory_lock:
+            if fn is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(fn, None)
+
+    def store(self, section, key, data, dtype='json', *, private=False):
+        """@param private    Whether the file should only be readable by the current user"""
         assert dtype in ('json',)
 
         if not self.enabled:
             return
 
         fn = self._get_cache_fn(section, key, dtype)
+        entry = {'yt-dlp_version': __version__, 'timestamp': int(time.time()), 'data': data}
+        self._remember(fn, json.dumps(entry, ensure_ascii=False))
         try:
             os.makedirs(os.path.dirname(fn), exist_ok=True)
             self._ydl.write_debug(f'Saving {section}.{key} to cache')
-            write_json_file({'yt-dlp_version': __version__, 'data': data}, fn)
+            # The file is written to a temporary file and renamed, so concurrent processes never see partial data
+            write_json_file(entry, fn, 0o600 if private else 0o666)
         except Exception:
             tb = traceback.format_exc()
             self._ydl.report_warning(f'Writing cache to {fn!r} failed: {tb}')
+            return
+        self._prune()
+
+    def _get_ttl(self, section):
+        ttls = self._ydl.params.get('cache_ttl') or {}
+        return ttls.get(section, ttls.get('default'))
 
-    def _validate(self, data, min_ver):
+    def _validate(self, data, min_ver, ttl=None):
         version = traverse_obj(data, 'yt-dlp_version')
         if not version:  # Backward compatibility
             data, version = {'data': data}, '2022.08.19'
-        if not min_ver or version_tuple(version) >= version_tuple(min_ver):
-            return data['data']
-        self._ydl.write_debug(f'Discarding old cache from version {version} (needs {min_ver})')
+        if min_ver and version_tuple(version) < version_tuple(min_ver):
+            self._ydl.write_debug(f'Discarding old cache from version {version} (needs {min_ver})')
+            return None, False
+        # Entries from before timestamps were saved never expire
+        timestamp = data.get('timestamp')
+        if ttl is not None and timestamp is not None and timestamp + ttl < time.time():
+            self._ydl.write_debug('Discarding expired cache')
+            return None, False
+        return data['data'], True
 
     def load(self, section, key, dtype='json', default=None, *, min_ver=None):
         assert dtype in ('json',)
@@ -60,20 +113,75 @@ def load(self, section, key, dtype='json', default=None, *, min_ver=None):
             return default
 
         cache_fn = self._get_cache_fn(section, key, dtype)
+        ttl = self._get_ttl(section)
+        text = self._recall(cache_fn)
+        if text is not None:
+            data, valid = self._validate(json.loads(text), min_ver, ttl)
+            if not valid and ttl is not None:
+                self._remove_file(cache_fn)
+            return data if valid else default
+
         with contextlib.suppress(OSError):
             try:
                 with open(cache_fn, encoding='utf-8') as cachef:
                     self._ydl.write_debug(f'Loading {section}.{key} from cache')
-                    return self._validate(json.load(cachef), min_ver)
+                    text = cachef.read()
+                data, valid = self._validate(json.loads(text), min_ver, ttl)
             except (ValueError, KeyError):
                 try:
                     file_size = os.path.getsize(cache_fn)
                 except OSError as oe:
                     file_size = str(oe)
                 self._ydl.report_warning(f'Cache retrieval from {cache_fn} failed ({file_size})')
+                return default
+            if not valid:
+                if ttl is not None:
+                    self._remove_file(cache_fn)
+                return default
+            self._remember(cache_fn, text)
+            # The mtime records the last use, for _prune
+            with contextlib.suppress(OSError):
+                os.utime(cache_fn)
+            return data
 
         return default
 
+    def _remove_file(self, fn):
+        self._forget(fn)
+        # Another process may have removed it already
+        with contextlib.suppress(OSError):
+            os.remove(fn)
+
+    def _prune(self):
+        """Remove the least recently used files until the cache is within cache_max_size"""
+        max_size = self._ydl.params.get('cache_max_size')
+        if max_size is None:
+            return
+
+        files, total = [], 0
+        with contextlib.suppress(OSError), os.scandir(self._get_root_dir()) as sections:
+            for section in sections:
+                if not section.is_dir():
+                    continue
+                with contextlib.suppress(OSError), os.scandir(section.path) as entries:
+                    for entry in entries:
+                        # Temporary files are still being written by write_json_file
+                        if entry.name.endswith('.tmp') or not entry.is_file():
+                            continue
+                        with contextlib.suppress(OSError):
+                            stat = entry.stat()
+                            files.append((stat.st_mtime, stat.st_size, entry.path))
+                            total += stat.st_size
+
+        if total <= max_size:
+            return
+        self._ydl.write_debug(f'Pruning cache of {total} bytes to {max_size} bytes')
+        for _, size, fn in sorted(files):
+            if total <= max_size:
+                break
+            self._remove_file(fn)
+            total -= size
+
     def remove(self):
         if not self.enabled:
             self._ydl.to_screen('Cache is disabled (Did you combine --no-cache-dir and --rm-cache-dir?)')
@@ -83,6 +191,7 @@ def remove(self):
         if not any((term in cachedir) for term in ('cache', 'tmp')):
             raise Exception('Not removing directory %s - this does not look like a cache dir' % cachedir)
 
+        self._forget()
         self._ydl.to_screen(
             'Removing cache dir %s .' % cachedir, skip_eol=True)
         if os.path.exists(cachedir):
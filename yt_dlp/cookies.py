@@ -3,8 +3,9 @@
 import contextlib
 import http.cookiejar
 import http.cookies
-import io
+import itertools
 import json
+import math
 import os
 import re
 import shutil
@@ -13,10 +14,11 @@
 import sys
 import tempfile
 import time
+import urllib.parse
 import urllib.request
 from datetime import datetime, timedelta, timezone
 from enum import Enum, auto
-from hashlib import pbkdf2_hmac
+from hashlib import pbkdf2_hmac, sha256
 
 from .aes import (
     aes_cbc_decrypt_bytes,
@@ -87,8 +89,9 @@ def load_cookies(cookie_file, browser_specification, ydl):
     cookie_jars = []
     if browser_specification is not None:
         browser_name, profile, keyring, container = _parse_browser_specification(*browser_specification)
-        cookie_jars.append(
-            extract_cookies_from_browser(browser_name, profile, YDLLogger(ydl), keyring=keyring, container=container))
+        cache = ydl.cache if ydl and ydl.params.get('cookiesfrombrowser_cache') else None
+        cookie_jars.append(extract_cookies_from_browser(
+            browser_name, profile, YDLLogger(ydl), keyring=keyring, container=container, cache=cache))
 
     if cookie_file is not None:
         is_filename = is_path_like(cookie_file)
@@ -103,18 +106,80 @@ def load_cookies(cookie_file, browser_specification, ydl):
     return _merge_cookie_jars(cookie_jars)
 
 
-def extract_cookies_from_browser(browser_name, profile=None, logger=YDLLogger(), *, keyring=None, container=None):
+def extract_cookies_from_browser(browser_name, profile=None, logger=YDLLogger(), *, keyring=None, container=None,
+                                 cache=None, hosts=None):
+    """
+    @param cache    A yt_dlp.cache.Cache in which the extracted cookies are kept
+                    until the browser's database is modified (Firefox and Chromium based browsers)
+    @param hosts    Only extract the cookies that can be sent to these hosts (Firefox and Chromium based browsers)
+    """
     if browser_name == 'firefox':
-        return _extract_firefox_cookies(profile, container, logger)
+        return _extract_firefox_cookies(profile, container, logger, cache=cache, hosts=hosts)
     elif browser_name == 'safari':
         return _extract_safari_cookies(profile, logger)
     elif browser_name in CHROMIUM_BASED_BROWSERS:
-        return _extract_chrome_cookies(browser_name, profile, keyring, logger)
+        return _extract_chrome_cookies(browser_name, profile, keyring, logger, cache=cache, hosts=hosts)
     else:
         raise ValueError(f'unknown browser: {browser_name}')
 
 
-def _extract_firefox_cookies(profile, container, logger):
+def _create_cookie(host, name, value, path, expires, is_secure):
+    return http.cookiejar.Cookie(
+        version=0, name=name, value=value, port=None, port_specified=False,
+        domain=host, domain_specified=bool(host), domain_initial_dot=host.startswith('.'),
+        path=path, path_specified=bool(path), secure=is_secure, expires=expires, discard=False,
+        comment=None, comment_url=None, rest={})
+
+
+def _host_condition(column, hosts):
+    """@returns an SQL condition (and its parameters) matching the cookie domains that apply to any of the hosts"""
+    domains = set()
+    for host in hosts:
+        labels = host.lower().strip('.').split('.')
+        for i in range(len(labels)):
+            domain = '.'.join(labels[i:])
+            domains.update((domain, f'.{domain}'))
+    return f'{column} IN ({", ".join("?" * len(domains))})', sorted(domains)
+
+
+class _BrowserCookieCache:
+    """
+    Cookies extracted from a browser's database, kept in the yt-dlp cache
+
+    The cookies are reused as long as the database is not modified. When it is,
+    the values of the encrypted cookies that did not change are still taken
+    from the cache, so that only the new cookies have to be decrypted.
+    The cache files are only readable by the current user
+    """
+
+    _SECTION = 'browser-cookies'
+
+    def __init__(self, cache, database_path, *key):
+        self._cache = cache
+        self._key = sha256(json.dumps([database_path, *key]).encode()).hexdigest()
+        stat = os.stat(database_path)
+        self._signature = [stat.st_mtime_ns, stat.st_size]
+        data = cache.load(self._SECTION, self._key) if cache else None
+        self._data = data if isinstance(data, dict) else {}
+
+    def get_cookies(self):
+        """@returns the cached rows, or None if the database was modified since they were stored"""
+        if self._data.get('signature') == self._signature:
+            return self._data.get('cookies')
+
+    def get_decrypted_values(self):
+        """@returns {digest of the encrypted value: value} of the cached cookies"""
+        return {row[6]: row[2] for row in self._data.get('cookies') or [] if len(row) > 6 and row[6]}
+
+    def store(self, cookies):
+        if self._cache:
+            self._cache.store(self._SECTION, self._key, {
+                'signature': self._signature,
+                'cookies': cookies,
+            }, private=True)
+
+
+def _extract_firefox_cookies(profile, container, logger, *, cache=None, hosts=None):
     logger.info('Extracting cookies from firefox')
     if not sqlite3:
         logger.warning('Cannot extract cookies from firefox without sqlite3 support. '
@@ -147,35 +212,47 @@ def _extract_firefox_cookies(profile, container, logger):
         if not isinstance(container_id, int):
             raise ValueError(f'could not find firefox container "{container}" in containers.json')
 
+    hosts = sorted(hosts) if hosts else None
+    cookie_cache = _BrowserCookieCache(cache, cookie_database_path, 'firefox', container_id, container, hosts)
+    cached_cookies = cookie_cache.get_cookies()
+    if cached_cookies is not None:
+        jar = YoutubeDLCookieJar()
+        for row in cached_cookies:
+            jar.set_cookie(_create_cookie(*row))
+        logger.info(f'Extracted {len(jar)} cookies from firefox (cached)')
+        return jar
+
+    conditions, parameters = [], []
+    if isinstance(container_id, int):
+        logger.debug(
+            f'Only loading cookies from firefox container "{container}", ID {container_id}')
+        conditions.append('(originAttributes LIKE ? OR originAttributes LIKE ?)')
+        parameters.extend((f'%userContextId={container_id}', f'%userContextId={container_id}&%'))
+    elif container == 'none':
+        logger.debug('Only loading cookies not belonging to any container')
+        conditions.append('NOT INSTR(originAttributes,"userContextId=")')
+    if hosts:
+        condition, domains = _host_condition('host', hosts)
+        conditions.append(condition)
+        parameters.extend(domains)
+    query = 'SELECT host, name, value, path, expiry, isSecure FROM moz_cookies'
+    if conditions:
+        query += f' WHERE {" AND ".join(conditions)}'
+
     with tempfile.TemporaryDirectory(prefix='yt_dlp') as tmpdir:
         cursor = None
         try:
             cursor = _open_database_copy(cookie_database_path, tmpdir)
-            if isinstance(container_id, int):
-                logger.debug(
-                    f'Only loading cookies from firefox container "{container}", ID {container_id}')
-                cursor.execute(
-                    'SELECT host, name, value, path, expiry, isSecure FROM moz_cookies WHERE originAttributes LIKE ? OR originAttributes LIKE ?',
-                    (f'%userContextId={container_id}', f'%userContextId={container_id}&%'))
-            elif container == 'none':
-                logger.debug('Only loading cookies not belonging to any container')
-                cursor.execute(
-                    'SELECT host, name, value, path, expiry, isSecure FROM moz_cookies WHERE NOT INSTR(originAttributes,"userContextId=")')
-            else:
-                cursor.execute('SELECT host, name, value, path, expiry, isSecure FROM moz_cookies')
+            cursor.execute(query, parameters)
             jar = YoutubeDLCookieJar()
             with _create_progress_bar(logger) as progress_bar:
                 table = cursor.fetchall()
                 total_cookie_count = len(table)
-                for i, (host, name, value, path, expiry, is_secure) in enumerate(table):
+                for i, row in enumerate(table):
                     progress_bar.print(f'Loading cookie {i: 6d}/{total_cookie_count: 6d}')
-                    cookie = http.cookiejar.Cookie(
-                        version=0, name=name, value=value, port=None, port_specified=False,
-                        domain=host, domain_specified=bool(host), domain_initial_dot=host.startswith('.'),
-                        path=path, path_specified=bool(path), secure=is_secure, expires=expiry, discard=False,
-                        comment=None, comment_url=None, rest={})
-                    jar.set_cookie(cookie)
+                    jar.set_cookie(_create_cookie(*row))
             logger.info(f'Extracted {len(jar)} cookies from firefox')
+            cookie_cache.store(table)
             return jar
         finally:
             if cursor is not None:
@@ -246,7 +323,7 @@ def _get_chromium_based_browser_settings(browser_name):
     }
 
 
-def _extract_chrome_cookies(browser_name, profile, keyring, logger):
+def _extract_chrome_cookies(browser_name, profile, keyring, logger, *, cache=None, hosts=None):
     logger.info(f'Extracting cookies from {browser_name}')
 
     if not sqlite3:
@@ -273,7 +350,20 @@ def _extract_chrome_cookies(browser_name, profile, keyring, logger):
         raise FileNotFoundError(f'could not find {browser_name} cookies database in "{search_root}"')
     logger.debug(f'Extracting cookies from: "{cookie_database_path}"')
 
-    decryptor = get_cookie_decryptor(config['browser_dir'], config['keyring_name'], logger, keyring=keyring)
+    hosts = sorted(hosts) if hosts else None
+    cookie_cache = _BrowserCookieCache(cache, cookie_database_path, browser_name, hosts)
+    cached_cookies = cookie_cache.get_cookies()
+    if cached_cookies is not None:
+        jar = YoutubeDLCookieJar()
+        for row in cached_cookies:
+            jar.set_cookie(_create_cookie(*row[:6]))
+        logger.info(f'Extracted {len(jar)} cookies from {browser_name} (cached)')
+        return jar
+
+    # The keyring is only accessed if a cookie that is not in the cache has to be decrypted
+    decryptor = _CachedCookieDecryptor(
+        lambda: get_cookie_decryptor(config['browser_dir'], config['keyring_name'], logger, keyring=keyring),
+        cookie_cache.get_decrypted_values())
 
     with tempfile.TemporaryDirectory(prefix='yt_dlp') as tmpdir:
         cursor = None
@@ -282,10 +372,16 @@ def _extract_chrome_cookies(browser_name, profile, keyring, logger):
             cursor.connection.text_factory = bytes
             column_names = _get_column_names(cursor, 'cookies')
             secure_column = 'is_secure' if 'is_secure' in column_names else 'secure'
-            cursor.execute(f'SELECT host_key, name, value, encrypted_value, path, expires_utc, {secure_column} FROM cookies')
+            query = f'SELECT host_key, name, value, encrypted_value, path, expires_utc, {secure_column} FROM cookies'
+            parameters = []
+            if hosts:
+                condition, parameters = _host_condition('host_key', hosts)
+                query += f' WHERE {condition}'
+            cursor.execute(query, parameters)
             jar = YoutubeDLCookieJar()
             failed_cookies = 0
             unencrypted_cookies = 0
+            cached_rows = []
             with _create_progress_bar(logger) as progress_bar:
                 table = cursor.fetchall()
                 total_cookie_count = len(table)
@@ -298,6 +394,12 @@ def _extract_chrome_cookies(browser_name, profile, keyring, logger):
                     elif not is_encrypted:
                         unencrypted_cookies += 1
                     jar.set_cookie(cookie)
+                    if cached_rows is not None and isinstance(cookie.value, str):
+                        cached_rows.append((
+                            cookie.domain, cookie.name, cookie.value, cookie.path, cookie.expires, cookie.secure,
+                            _CachedCookieDecryptor.digest(line[3]) if is_encrypted else None))
+                    else:
+                        cached_rows = None
             if failed_cookies > 0:
                 failed_message = f' ({failed_cookies} could not be decrypted)'
             else:
@@ -306,6 +408,9 @@ def _extract_chrome_cookies(browser_name, profile, keyring, logger):
             counts = decryptor._cookie_counts.copy()
             counts['unencrypted'] = unencrypted_cookies
             logger.debug(f'cookie version breakdown: {counts}')
+            # Cookies that could not be decrypted are not cached, so that they are tried again
+            if cached_rows is not None and not failed_cookies:
+                cookie_cache.store(cached_rows)
             return jar
         finally:
             if cursor is not None:
@@ -324,11 +429,7 @@ def _process_chrome_cookie(decryptor, host_key, name, value, encrypted_value, pa
         if value is None:
             return is_encrypted, None
 
-    return is_encrypted, http.cookiejar.Cookie(
-        version=0, name=name, value=value, port=None, port_specified=False,
-        domain=host_key, domain_specified=bool(host_key), domain_initial_dot=host_key.startswith('.'),
-        path=path, path_specified=bool(path), secure=is_secure, expires=expires_utc, discard=False,
-        comment=None, comment_url=None, rest={})
+    return is_encrypted, _create_cookie(host_key, name, value, path, expires_utc, is_secure)
 
 
 class ChromeCookieDecryptor:
@@ -365,6 +466,37 @@ def decrypt(self, encrypted_value):
         raise NotImplementedError('Must be implemented by sub classes')
 
 
+class _CachedCookieDecryptor(ChromeCookieDecryptor):
+    """
+    Decrypts the cookies with the values of an earlier extraction where possible.
+    The actual decryptor is only created when a new cookie has to be decrypted
+    """
+
+    def __init__(self, create_decryptor, decrypted_values):
+        self._create_decryptor = create_decryptor
+        self._decrypted_values = decrypted_values
+
+    @staticmethod
+    def digest(encrypted_value):
+        return sha256(encrypted_value).hexdigest()
+
+    @functools.cached_property
+    def _decryptor(self):
+        return self._create_decryptor()
+
+    @property
+    def _cookie_counts(self):
+        if '_decryptor' not in self.__dict__:
+            return {}
+        return self._decryptor._cookie_counts
+
+    def decrypt(self, encrypted_value):
+        value = self._decrypted_values.get(self.digest(encrypted_value))
+        if value is None:
+            value = self._decryptor.decrypt(encrypted_value)
+        return value
+
+
 def get_cookie_decryptor(browser_root, browser_keyring_name, logger, *, keyring=None):
     if sys.platform == 'darwin':
         return MacChromeCookieDecryptor(browser_keyring_name, logger)
@@ -1181,10 +1313,16 @@ class YoutubeDLCookieJar(http.cookiejar.MozillaCookieJar):
     """
     See [1] for cookie file format.
 
+    Only the domains that can match the host of a request are checked for cookies,
+    instead of every domain in the jar, and the Cookie headers generated by
+    get_cookie_header are kept until the jar is modified or one of their cookies expires
+
     1. https://curl.haxx.se/docs/http-cookies.html
     """
     _HTTPONLY_PREFIX = '#HttpOnly_'
+    _MAGIC_RE = re.compile(r'#( Netscape)? HTTP Cookie File')
     _ENTRY_LEN = 7
+    _HEADER_CACHE_SIZE = 1024
     _HEADER = '''# Netscape HTTP Cookie File
 # This file is generated by yt-dlp.  Do not edit.
 
@@ -1198,6 +1336,50 @@ def __init__(self, filename=None, *args, **kwargs):
         if is_path_like(filename):
             filename = os.fspath(filename)
         self.filename = filename
+        # Insertion order of the domains, so that cookies are returned in the same order as CookieJar does
+        self._domain_order = {}
+        self._domain_counter = itertools.count()
+        # (scheme, netloc, path) -> (header, time until which it is valid)
+        self._header_cache = {}
+        # Earliest expiry time of the cookies; None if unknown
+        self._next_expiry = math.inf
+
+    def _invalidate(self):
+        """Must be called after the cookies are modified in place"""
+        self._header_cache.clear()
+        self._next_expiry = None
+
+    def set_cookie(self, cookie):
+        with self._cookies_lock:
+            if cookie.domain not in self._cookies:
+                self._domain_order[cookie.domain] = next(self._domain_counter)
+            super().set_cookie(cookie)
+            if self._header_cache:
+                self._header_cache.clear()
+            if self._next_expiry is not None and cookie.expires is not None:
+                self._next_expiry = min(self._next_expiry, cookie.expires)
+
+    def clear_expired_cookies(self):
+        with self._cookies_lock:
+            super().clear_expired_cookies()
+            self._next_expiry = min((cookie.expires for cookie in self if cookie.expires is not None), default=math.inf)
+
+    def _cookies_for_request(self, request):
+        # The candidates are only known for the domain matching of DefaultCookiePolicy
+        if type(self._policy).domain_return_ok is not http.cookiejar.DefaultCookiePolicy.domain_return_ok:
+            return super()._cookies_for_request(request)
+        # DefaultCookiePolicy.domain_return_ok accepts the domains whose dotted form
+        # is a suffix of the dotted request host
+        candidates = {''}
+        for host in http.cookiejar.eff_request_host(request):
+            if not host.startswith('.'):
+                host = f'.{host}'
+            candidates.update(host[i:] for i in range(len(host)))
+        cookies = []
+        domains = [domain for domain in candidates if domain in self._cookies]
+        for domain in sorted(domains, key=lambda d: self._domain_order.get(d, -1)):
+            cookies.extend(self._cookies_for_domain(domain, request))
+        return cookies
 
     @staticmethod
     def _true_or_false(cndn):
@@ -1250,6 +1432,7 @@ def save(self, filename=None, ignore_discard=True, ignore_expires=True):
         for cookie in self:
             if cookie.expires is None:
                 cookie.expires = 0
+        self._invalidate()
 
         with self.open(filename, write=True) as f:
             f.write(self._HEADER)
@@ -1268,20 +1451,24 @@ def prepare_line(line):
                 line = line[len(self._HTTPONLY_PREFIX):]
             # comments and empty lines are fine
             if line.startswith('#') or not line.strip():
-                return line
+                return line, None
             cookie_list = line.split('\t')
             if len(cookie_list) != self._ENTRY_LEN:
                 raise http.cookiejar.LoadError('invalid length %d' % len(cookie_list))
             cookie = self._CookieFileEntry(*cookie_list)
             if cookie.expires_at and not cookie.expires_at.isdigit():
                 raise http.cookiejar.LoadError('invalid expires at %s' % cookie.expires_at)
-            return line
+            return line, cookie
 
-        cf = io.StringIO()
+        # The entries are parsed here once, instead of being validated and then parsed
+        # again by MozillaCookieJar._really_load, whose behaviour is kept
+        now = time.time()
+        magic_checked = False
+        cookies = []
         with self.open(filename) as f:
             for line in f:
                 try:
-                    cf.write(prepare_line(line))
+                    line, entry = prepare_line(line)
                 except http.cookiejar.LoadError as e:
                     if f'{line.strip()} '[0] in '[{"':
                         raise http.cookiejar.LoadError(
@@ -1289,28 +1476,83 @@ def prepare_line(line):
                             'https://github.com/yt-dlp/yt-dlp/wiki/FAQ#how-do-i-pass-cookies-to-yt-dlp')
                     write_string(f'WARNING: skipping cookie file entry due to {e}: {line!r}\n')
                     continue
-        cf.seek(0)
-        self._really_load(cf, filename, ignore_discard, ignore_expires)
-        # Session cookies are denoted by either `expires` field set to
-        # an empty string or 0. MozillaCookieJar only recognizes the former
-        # (see [1]). So we need force the latter to be recognized as session
-        # cookies on our own.
-        # Session cookies may be important for cookies-based authentication,
-        # e.g. usually, when user does not check 'Remember me' check box while
-        # logging in on a site, some important cookies are stored as session
-        # cookies so that not recognizing them will result in failed login.
-        # 1. https://bugs.python.org/issue17164
-        for cookie in self:
-            # Treat `expires=0` cookies as session cookies
-            if cookie.expires == 0:
-                cookie.expires = None
-                cookie.discard = True
+                if not magic_checked:
+                    if not self._MAGIC_RE.match(line):
+                        raise http.cookiejar.LoadError(f'{filename!r} does not look like a Netscape format cookies file')
+                    magic_checked = True
+                    continue
+                if entry is None or line.strip().startswith(('#', '$')):
+                    continue
+
+                name, value = entry.name, entry.value.rstrip('\n')
+                if name == '':
+                    # cookies.txt regards 'Set-Cookie: foo' as a cookie
+                    # with no name, whereas http.cookiejar regards it as a
+                    # cookie with no value.
+                    name, value = value, None
+                domain_specified = entry.include_subdomains == 'TRUE'
+                initial_dot = entry.domain_name.startswith('.')
+                if domain_specified != initial_dot:
+                    raise http.cookiejar.LoadError(f'invalid Netscape format cookies file {filename!r}: {line!r}')
+                cookie = http.cookiejar.Cookie(
+                    0, name, value, None, False, entry.domain_name, domain_specified, initial_dot,
+                    entry.path, False, entry.https_only == 'TRUE', entry.expires_at or None,
+                    not entry.expires_at, None, None, {})
+                if not ignore_discard and cookie.discard:
+                    continue
+                if not ignore_expires and cookie.is_expired(now):
+                    continue
+                cookies.append(cookie)
+        if not magic_checked:
+            raise http.cookiejar.LoadError(f'{filename!r} does not look like a Netscape format cookies file')
+
+        with self._cookies_lock:
+            # Only the loaded cookies need to be checked below, unless the jar already had some
+            had_cookies = bool(self._cookies)
+            for cookie in cookies:
+                cookies_by_path = self._cookies.get(cookie.domain)
+                if cookies_by_path is None:
+                    self._domain_order[cookie.domain] = next(self._domain_counter)
+                    cookies_by_path = self._cookies[cookie.domain] = {}
+                cookies_by_path.setdefault(cookie.path, {})[cookie.name] = cookie
+            # Session cookies are denoted by either `expires` field set to
+            # an empty string or 0. MozillaCookieJar only recognizes the former
+            # (see [1]). So we need force the latter to be recognized as session
+            # cookies on our own.
+            # Session cookies may be important for cookies-based authentication,
+            # e.g. usually, when user does not check 'Remember me' check box while
+            # logging in on a site, some important cookies are stored as session
+            # cookies so that not recognizing them will result in failed login.
+            # 1. https://bugs.python.org/issue17164
+            for cookie in (self if had_cookies else cookies):
+                # Treat `expires=0` cookies as session cookies
+                if cookie.expires == 0:
+                    cookie.expires = None
+                    cookie.discard = True
+            self._invalidate()
 
     def get_cookie_header(self, url):
         """Generate a Cookie HTTP header for a given url"""
-        cookie_req = urllib.request.Request(normalize_url(sanitize_url(url)))
-        self.add_cookie_header(cookie_req)
-        return cookie_req.get_header('Cookie')
+        url = normalize_url(sanitize_url(url))
+        # The query does not affect which cookies are sent
+        key = urllib.parse.urlsplit(url)[:3]
+        with self._cookies_lock:
+            now = int(time.time())
+            # Like add_cookie_header, but only when some cookie has actually expired
+            if self._next_expiry is None or self._next_expiry <= now:
+                self.clear_expired_cookies()
+            cached = self._header_cache.get(key)
+            if cached and now < cached[1]:
+                return cached[0]
+
+            self._policy._now = self._now = now
+            cookies = self._cookies_for_request(urllib.request.Request(url))
+            header = '; '.join(self._cookie_attrs(cookies)) or None
+            if len(self._header_cache) >= self._HEADER_CACHE_SIZE:
+                self._header_cache.clear()
+            self._header_cache[key] = header, min(
+                (cookie.expires for cookie in cookies if cookie.expires is not None), default=math.inf)
+            return header
 
     def get_cookies_for_url(self, url):
         """Generate a list of Cookie objects for a given url"""
@@ -1319,6 +1561,10 @@ def get_cookies_for_url(self, url):
         self._policy._now = self._now = int(time.time())
         return self._cookies_for_request(urllib.request.Request(normalize_url(sanitize_url(url))))
 
-    def clear(self, *args, **kwargs):
-        with contextlib.suppress(KeyError):
-            return super().clear(*args, **kwargs)
+    def clear(self, domain=None, path=None, name=None):
+        with self._cookies_lock, contextlib.suppress(KeyError):
+            self._header_cache.clear()
+            if domain is None and path is None and name is None:
+                self._domain_order.clear()
+                self._next_expiry = math.inf
+            return super().clear(domain, path, name)
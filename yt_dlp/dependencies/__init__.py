@@ -68,6 +68,11 @@
 except ImportError:
     requests = None
 
+try:
+    import h2
+except ImportError:
+    h2 = None
+
 try:
     import xattr  # xattr or pyxattr
 except ImportError:
@@ -176,9 +176,9 @@ def filesize_or_none(unencoded_filename):
         return 0
 
     @staticmethod
-    def best_block_size(elapsed_time, bytes):
+    def best_block_size(elapsed_time, bytes, max_size=4194304):
         new_min = max(bytes / 2.0, 1.0)
-        new_max = min(max(bytes * 2.0, 1.0), 4194304)  # Do not surpass 4 MB
+        new_max = min(max(bytes * 2.0, 1.0), max_size)  # Do not surpass 4 MB by default
         if elapsed_time < 0.001:
             return int(new_max)
         rate = bytes / elapsed_time
@@ -395,14 +395,18 @@ def report_resuming_byte(self, resume_len):
         """Report attempt to resume at given byte."""
         self.to_screen('[download] Resuming download at byte %s' % resume_len)
 
-    def report_retry(self, err, count, retries, frag_index=NO_DEFAULT, fatal=True):
-        """Report retry"""
+    def report_retry(self, err, count, retries, frag_index=NO_DEFAULT, fatal=True, sleep_func=NO_DEFAULT):
+        """Report retry
+        @param sleep_func   Overrides the retry_sleep_functions param. None = don't sleep
+        """
         is_frag = False if frag_index is NO_DEFAULT else 'fragment'
+        if sleep_func is NO_DEFAULT:
+            sleep_func = self.params.get('retry_sleep_functions', {}).get(is_frag or 'http')
         RetryManager.report_retry(
             err, count, retries, info=self.__to_screen,
             warn=lambda msg: self.__to_screen(f'[download] Got error: {msg}'),
             error=IDENTITY if not fatal else lambda e: self.report_error(f'\r[download] Got error: {e}'),
-            sleep_func=self.params.get('retry_sleep_functions', {}).get(is_frag or 'http'),
+            sleep_func=sleep_func,
             suffix=f'fragment{"s" if frag_index is None else f" {frag_index}"}' if is_frag else None)
 
     def report_unable_to_resume(self):
@@ -419,12 +423,12 @@ def download(self, filename, info_dict, subtitle=False):
         """Download to a filename using the info from info_dict
         Return True on success and False otherwise
         """
-        nooverwrites_and_exists = (
-            not self.params.get('overwrites', True)
-            and os.path.exists(encodeFilename(filename))
-        )
-
         if not hasattr(filename, 'write'):
+            nooverwrites_and_exists = (
+                not self.params.get('overwrites', True)
+                and os.path.exists(encodeFilename(filename))
+            )
+
             continuedl_and_exists = (
                 self.params.get('continuedl', True)
                 and os.path.isfile(encodeFilename(filename))
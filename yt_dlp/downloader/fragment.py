@@ -1,27 +1,245 @@
+import asyncio
+import collections
 import concurrent.futures
 import contextlib
+import io
 import json
 import math
 import os
 import struct
+import threading
 import time
+import urllib.parse
 
 from .common import FileDownloader
-from .http import HttpFD
-from ..aes import aes_cbc_decrypt_bytes, unpad_pkcs7
+from .http import HttpQuietDownloader
+from ..aes import AESCBCStreamDecrypter, aes_cbc_decrypt_bytes, unpad_pkcs7
 from ..compat import compat_os_name
 from ..networking import Request
-from ..networking.exceptions import HTTPError, IncompleteRead
-from ..utils import DownloadError, RetryManager, encodeFilename, traverse_obj
-from ..utils.networking import HTTPHeaderDict
+from ..networking._asynchttp import AsyncHTTPClient
+from ..networking._helper import select_proxy
+from ..networking.exceptions import HTTPError, IncompleteRead, TransportError
+from ..utils import (
+    DownloadError,
+    RetryManager,
+    encodeFilename,
+    float_or_none,
+    format_bytes,
+    traverse_obj,
+)
+from ..utils.networking import HTTPHeaderDict, clean_proxies
 from ..utils.progress import ProgressCalculator
 
 
-class HttpQuietDownloader(HttpFD):
-    def to_screen(self, *args, **kargs):
-        pass
+class PositionalFragmentWriter:
+    """
+    Writes fragments of known sizes at their offsets in the output file, in any order
+
+    @param filename     The output file, which must already exist
+    @param fragments    All the fragments to be written, in order
+    @param offset       Offset of the first fragment in the file
+    @param prev_index   frag_index of the fragment before the first one
+    @param completed    Bitmap (by frag_index) of the fragments that were already written
+    """
+
+    def __init__(self, filename, fragments, offset, prev_index, completed=b''):
+        self.lock = threading.Lock()
+        self._order, self._offsets, self._sizes = [], {}, {}
+        for fragment in fragments:
+            frag_index = fragment['frag_index']
+            self._order.append(frag_index)
+            self._offsets[frag_index] = offset
+            self._sizes[frag_index] = fragment['byte_range']['end'] - fragment['byte_range']['start']
+            offset += self._sizes[frag_index]
+        self._completed = bytearray(completed)
+        self._completed.extend(bytes(max(0, -(-max(self._order, default=0) // 8) - len(self._completed))))
+        self._skipped = set()
+        # All fragments upto prefix_index are complete, and the next one is to be written at prefix_offset
+        self._next, self.prefix_index = 0, prev_index
+        self.prefix_offset = self._offsets[self._order[0]] if self._order else offset
+        self._advance_prefix()
+
+        self._file = open(encodeFilename(filename), 'r+b')
+        self._file.truncate(offset)
+
+    @classmethod
+    def fragment_sizes_known(cls, fragments):
+        # Decryption removes padding, so the size of encrypted fragments is not known beforehand
+        return all(traverse_obj(fragment, ('byte_range', 'end')) is not None
+                   and traverse_obj(fragment, ('decrypt_info', 'METHOD')) != 'AES-128' for fragment in fragments)
+
+    def is_completed(self, frag_index):
+        return bool(self._completed[(frag_index - 1) // 8] & 1 << (frag_index - 1) % 8)
+
+    def _advance_prefix(self):
+        while self._next < len(self._order) and self.is_completed(self._order[self._next]):
+            self.prefix_index = self._order[self._next]
+            self.prefix_offset = self._offsets[self.prefix_index] + self._sizes[self.prefix_index]
+            self._next += 1
+
+    def _write_at(self, offset, data):
+        if hasattr(os, 'pwrite'):
+            view = memoryview(data)
+            while view:
+                written = os.pwrite(self._file.fileno(), view, offset)
+                view, offset = view[written:], offset + written
+        else:
+            with self.lock:
+                self._file.seek(offset)
+                self._file.write(data)
+
+    def fragment_size(self, frag_index):
+        return self._sizes[frag_index]
+
+    def write(self, frag_index, frag_content):
+        assert len(frag_content) == self._sizes[frag_index]
+        self._write_at(self._offsets[frag_index], frag_content)
+        with self.lock:
+            self._completed[(frag_index - 1) // 8] |= 1 << (frag_index - 1) % 8
+            self._advance_prefix()
+
+    def skip(self, frag_index):
+        with self.lock:
+            self._skipped.add(frag_index)
+
+    def ytdl_state(self):
+        """@returns the ctx fields to save in the .ytdl file; must be called with the lock held"""
+        return {
+            'fragment_index': self.prefix_index,
+            'positional': {'offset': self.prefix_offset, 'completed': bytes(self._completed)},
+        }
+
+    def remove_gaps(self):
+        """Move the fragments back over the gaps left by skipped fragments, once all fragments are done"""
+        if not self._skipped:
+            return
+        offset = self._offsets[self._order[0]]
+        for frag_index in self._order:
+            if frag_index in self._skipped:
+                continue
+            if offset != self._offsets[frag_index]:
+                self._file.seek(self._offsets[frag_index])
+                data = self._file.read(self._sizes[frag_index])
+                self._file.seek(offset)
+                self._file.write(data)
+            offset += self._sizes[frag_index]
+        self._file.truncate(offset)
+
+    def close(self):
+        self._file.close()
+
+
+class DecryptingStream:
+    """A writable stream for HttpFD that decrypts the data into another stream as it is downloaded"""
+
+    def __init__(self, stream, decrypter_factory):
+        self._stream, self._new_decrypter = stream, decrypter_factory
+        self._decrypter = decrypter_factory()
+
+    def write(self, data):
+        self._stream.write(self._decrypter.update(data))
+        return len(data)
 
-    to_console_title = to_screen
+    def seek(self, pos):
+        # The download can only be restarted from the beginning
+        assert pos == 0
+        self._decrypter = self._new_decrypter()
+        self._stream.seek(0)
+
+    def truncate(self):
+        self._stream.truncate()
+
+    def tell(self):
+        return self._stream.tell()
+
+    def finish(self):
+        self._stream.write(self._decrypter.finish())
+
+
+class FragmentConcurrencyController:
+    """
+    Adjusts the number of concurrent fragment downloads between the given bounds
+
+    After every round of (atleast) as many fragments as the current limit, the limit is increased
+    if the download speed improved. It is decreased if an increase did not help, if fragments
+    start taking much longer, or on errors; and is halved when the server throttles requests
+
+    @param get_downloaded   Function returning the total downloaded bytes, e.g. of a ProgressCalculator
+    @param log              Function to report the changes to
+    """
+
+    # Minimum duration of a round (seconds), so that the speed can be measured reliably
+    _MIN_ROUND_TIME = 0.5
+    # Minimum relative increase in speed for an increase in the limit to be kept
+    _MIN_GAIN = 1.05
+    # Number of rounds to wait before increasing the limit again, after an increase did not help
+    _HOLD_ROUNDS = 4
+    _THROTTLE_STATUSES = (429, 503)
+
+    def __init__(self, minimum, maximum, get_downloaded, log=None):
+        self.minimum, self.maximum = minimum, maximum
+        self.limit = minimum
+        self._get_downloaded, self._log = get_downloaded, log
+        self._cond = threading.Condition()
+        self._active = 0
+        self._last_step, self._last_speed, self._best_latency, self._hold = 0, None, None, 0
+        self._reset_round()
+
+    def _reset_round(self):
+        self._done, self._total_latency, self._errors, self._throttled = 0, 0, 0, False
+        self._round_start, self._round_downloaded = time.monotonic(), self._get_downloaded()
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Context manager to wrap each fragment download in"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._cond:
+                now = time.monotonic()
+                self._active -= 1
+                self._done += 1
+                self._total_latency += now - start
+                if self._done >= self.limit and now - self._round_start >= self._MIN_ROUND_TIME:
+                    self._adjust(now)
+                self._cond.notify_all()
+
+    def report_error(self, err):
+        with self._cond:
+            if isinstance(err, HTTPError) and err.status in self._THROTTLE_STATUSES:
+                self._throttled = True
+            else:
+                self._errors += 1
+
+    def _adjust(self, now):
+        speed = (self._get_downloaded() - self._round_downloaded) / max(now - self._round_start, 1e-3)
+        latency = self._total_latency / self._done
+        improved = self._last_speed is not None and speed >= self._last_speed * self._MIN_GAIN
+        limit, reason = self.limit, None
+        if self._throttled:
+            limit, reason = self.limit // 2, 'throttled by server'
+        elif self._errors:
+            limit, reason = self.limit - 1, f'{self._errors} errors'
+        elif self._last_step > 0 and not improved:
+            limit, reason, self._hold = self.limit - 1, 'no speed gain', self._HOLD_ROUNDS
+        elif self._best_latency and latency > 2 * self._best_latency and not improved:
+            limit, reason = self.limit - 1, 'fragments are slower'
+        elif self._hold:
+            self._hold -= 1
+        else:
+            limit, reason = self.limit + 1, 'probing'
+        limit = min(max(limit, self.minimum), self.maximum)
+
+        if limit != self.limit and self._log:
+            self._log(f'Downloading {limit} fragments concurrently ({reason}; '
+                      f'{format_bytes(speed)}/s, {latency:.2f}s per fragment)')
+        self._last_step, self._last_speed, self.limit = limit - self.limit, speed, limit
+        self._best_latency = min(latency, self._best_latency or latency)
+        self._reset_round()
 
 
 class FragmentFD(FileDownloader):
@@ -37,6 +255,16 @@ class FragmentFD(FileDownloader):
     keep_fragments:     Keep downloaded fragments on disk after downloading is
                         finished
     concurrent_fragment_downloads:  The number of threads to use for native hls and dash downloads
+    max_concurrent_fragment_downloads:  If greater than concurrent_fragment_downloads, the number
+                        of threads is adjusted between the two based on the download speed
+    fragment_memory_limit:  Maximum number of bytes of downloaded fragments to hold
+                        in memory until they are appended to the output file.
+                        Fragments exceeding this are downloaded to disk.
+                        0 = always download fragments to disk. Default is 64MiB
+    fragment_engine:    How the fragments are downloaded concurrently. "threads" (default)
+                        uses a thread per fragment being downloaded. "asyncio" downloads
+                        all of them from one thread, which allows many more concurrent
+                        fragments. Falls back to "threads" when it is not supported
     _no_ytdl_file:      Don't use .ytdl file
 
     For each incomplete fragment download yt-dlp keeps on disk a special
@@ -56,10 +284,25 @@ class FragmentFD(FileDownloader):
                 index:  0-based index of current fragment among all fragments
             fragment_count:
                 Total count of fragments
+            positional:
+                Dictionary with the state of a download whose fragments are written
+                out of order, at their offsets in the file:
+                offset:     Byte offset of the current fragment
+                completed:  Hex-encoded bitmap of the fragments after the current one
+                            that are already complete. Bit N (LSB first) is for the fragment
+                            with 0-based index N
 
     This feature is experimental and file format may change in future.
     """
 
+    _DEFAULT_FRAGMENT_MEMORY_LIMIT = 64 * 1024 * 1024
+
+    def __init__(self, ydl, params):
+        super().__init__(ydl, params)
+        # Total size of the fragments currently held in memory
+        self._fragment_memory = 0
+        self._fragment_memory_lock = threading.Lock()
+
     def report_retry_fragment(self, err, frag_index, count, retries):
         self.deprecation_warning('yt_dlp.downloader.FragmentFD.report_retry_fragment is deprecated. '
                                  'Use yt_dlp.downloader.FileDownloader.report_retry instead')
@@ -88,6 +331,12 @@ def _read_ytdl_file(self, ctx):
             ctx['fragment_index'] = ytdl_data['downloader']['current_fragment']['index']
             if 'extra_state' in ytdl_data['downloader']:
                 ctx['extra_state'] = ytdl_data['downloader']['extra_state']
+            if 'positional' in ytdl_data['downloader']:
+                positional = ytdl_data['downloader']['positional']
+                ctx['positional'] = {
+                    'offset': int(positional['offset']),
+                    'completed': bytes.fromhex(positional['completed']),
+                }
         except Exception:
             ctx['ytdl_corrupt'] = True
         finally:
@@ -103,13 +352,23 @@ def _write_ytdl_file(self, ctx):
             }
             if 'extra_state' in ctx:
                 downloader['extra_state'] = ctx['extra_state']
+            if 'positional' in ctx:
+                downloader['positional'] = {
+                    'offset': ctx['positional']['offset'],
+                    'completed': ctx['positional']['completed'].hex(),
+                }
             if ctx.get('fragment_count') is not None:
                 downloader['fragment_count'] = ctx['fragment_count']
             frag_index_stream.write(json.dumps({'downloader': downloader}))
         finally:
             frag_index_stream.close()
 
-    def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_data=None):
+    def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_data=None, decrypter_factory=None):
+        """
+        @param decrypter_factory    Returns a new AESCBCStreamDecrypter for the fragment. If the fragment is
+                                    downloaded into memory, it is decrypted while being downloaded, and
+                                    ctx['fragment_decrypted'] is set
+        """
         fragment_filename = '%s-Frag%d' % (ctx['tmpfilename'], ctx['fragment_index'])
         fragment_info_dict = {
             'url': frag_url,
@@ -122,17 +381,55 @@ def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_dat
             frag_resume_len = self.filesize_or_none(self.temp_name(fragment_filename))
         fragment_info_dict['frag_resume_len'] = ctx['frag_resume_len'] = frag_resume_len
 
-        success, _ = ctx['dl'].download(fragment_filename, fragment_info_dict)
+        # The previous fragment may not have been appended, e.g. when retrying
+        self._release_fragment_buffer(ctx)
+        ctx.pop('fragment_decrypted', None)
+        # A partially downloaded fragment is resumed on disk
+        fragment_buffer = None if frag_resume_len else self._new_fragment_buffer()
+        target = fragment_filename if fragment_buffer is None else fragment_buffer
+        if fragment_buffer is not None and decrypter_factory:
+            # Only the decrypted data is kept in memory
+            target = DecryptingStream(fragment_buffer, decrypter_factory)
+
+        success, _ = ctx['dl'].download(target, fragment_info_dict)
         if not success:
             return False
+        if isinstance(target, DecryptingStream):
+            target.finish()
+            ctx['fragment_decrypted'] = True
         if fragment_info_dict.get('filetime'):
             ctx['fragment_filetime'] = fragment_info_dict.get('filetime')
         ctx['fragment_filename_sanitized'] = fragment_filename
+        if fragment_buffer is not None:
+            ctx['fragment_buffer'] = fragment_buffer
+            with self._fragment_memory_lock:
+                self._fragment_memory += fragment_buffer.tell()
         return True
 
+    def _new_fragment_buffer(self):
+        """@returns a buffer to download the fragment into, or None if it must be downloaded to disk"""
+        if self.params.get('keep_fragments', False):
+            return None
+        limit = self.params.get('fragment_memory_limit')
+        if limit is None:
+            limit = self._DEFAULT_FRAGMENT_MEMORY_LIMIT
+        with self._fragment_memory_lock:
+            if self._fragment_memory >= limit:
+                return None
+        return io.BytesIO()
+
+    def _release_fragment_buffer(self, ctx):
+        fragment_buffer = ctx.pop('fragment_buffer', None)
+        if fragment_buffer is not None:
+            with self._fragment_memory_lock:
+                self._fragment_memory -= fragment_buffer.tell()
+
     def _read_fragment(self, ctx):
         if not ctx.get('fragment_filename_sanitized'):
             return None
+        if ctx.get('fragment_buffer') is not None:
+            # getvalue does not copy the data, as long as the buffer is not written to again
+            return ctx['fragment_buffer'].getvalue()
         try:
             down, frag_sanitized = self.sanitize_open(ctx['fragment_filename_sanitized'], 'rb')
         except FileNotFoundError:
@@ -151,9 +448,25 @@ def _append_fragment(self, ctx, frag_content):
         finally:
             if self.__do_ytdl_file(ctx):
                 self._write_ytdl_file(ctx)
-            if not self.params.get('keep_fragments', False):
-                self.try_remove(encodeFilename(ctx['fragment_filename_sanitized']))
-            del ctx['fragment_filename_sanitized']
+            self._remove_fragment(ctx)
+
+    def _write_fragment_at(self, ctx, writer, frag_content):
+        """Like _append_fragment, but writes the fragment at its offset using a PositionalFragmentWriter"""
+        try:
+            writer.write(ctx['fragment_index'], frag_content)
+        finally:
+            if self.__do_ytdl_file(ctx):
+                with writer.lock:
+                    self._write_ytdl_file({**ctx, **writer.ytdl_state()})
+            self._remove_fragment(ctx)
+
+    def _remove_fragment(self, ctx):
+        ctx.pop('fragment_decrypted', None)
+        if ctx.get('fragment_buffer') is not None:
+            self._release_fragment_buffer(ctx)
+        elif not self.params.get('keep_fragments', False):
+            self.try_remove(encodeFilename(ctx['fragment_filename_sanitized']))
+        del ctx['fragment_filename_sanitized']
 
     def _prepare_frag_download(self, ctx):
         if not ctx.setdefault('live', False):
@@ -169,6 +482,7 @@ def _prepare_frag_download(self, ctx):
             **self.params,
             'noprogress': True,
             'test': False,
+            'http_connections': 1,
             'sleep_interval': 0,
             'max_sleep_interval': 0,
             'sleep_interval_subtitles': 0,
@@ -193,7 +507,8 @@ def _prepare_frag_download(self, ctx):
             if continuedl and ytdl_file_exists:
                 self._read_ytdl_file(ctx)
                 is_corrupt = ctx.get('ytdl_corrupt') is True
-                is_inconsistent = ctx['fragment_index'] > 0 and resume_len == 0
+                is_inconsistent = (ctx['fragment_index'] > 0 and resume_len == 0
+                                   or traverse_obj(ctx, ('positional', 'offset'), default=0) > resume_len)
                 if is_corrupt or is_inconsistent:
                     message = (
                         '.ytdl file is corrupt' if is_corrupt else
@@ -201,6 +516,7 @@ def _prepare_frag_download(self, ctx):
                     self.report_warning(
                         '%s. Restarting from the beginning ...' % message)
                     ctx['fragment_index'] = resume_len = 0
+                    ctx.pop('positional', None)
                     if 'ytdl_corrupt' in ctx:
                         del ctx['ytdl_corrupt']
                     self._write_ytdl_file(ctx)
@@ -210,10 +526,14 @@ def _prepare_frag_download(self, ctx):
                     if ytdl_file_exists:
                         self._read_ytdl_file(ctx)
                     ctx['fragment_index'] = resume_len = 0
+                    ctx.pop('positional', None)
                 self._write_ytdl_file(ctx)
                 assert ctx['fragment_index'] == 0
 
         dest_stream, tmpfilename = self.sanitize_open(tmpfilename, open_mode)
+        if 'positional' in ctx:
+            # The file was pre-allocated, so only the fragments before the current one are known to be complete
+            resume_len = ctx['positional']['offset']
 
         ctx.update({
             'dl': dl,
@@ -238,7 +558,7 @@ def _start_frag_download(self, ctx, info_dict):
         }
 
         ctx['started'] = time.time()
-        progress = ProgressCalculator(resume_len)
+        progress = ctx['progress'] = ProgressCalculator(resume_len)
 
         def frag_progress_hook(s):
             if s['status'] not in ('downloading', 'finished'):
@@ -263,15 +583,15 @@ def frag_progress_hook(s):
                     (ctx['complete_frags_downloaded_bytes'] + frag_total_bytes)
                     / (state['fragment_index'] + 1) * total_frags)
                 progress.total = estimated_size
-                progress.update(s.get('downloaded_bytes'))
+                progress.update(s.get('downloaded_bytes'), s.get('_progress_key'))
                 state['total_bytes_estimate'] = progress.total
             else:
-                progress.update(s.get('downloaded_bytes'))
+                progress.update(s.get('downloaded_bytes'), s.get('_progress_key'))
 
             if s['status'] == 'finished':
                 state['fragment_index'] += 1
                 ctx['fragment_index'] = state['fragment_index']
-                progress.thread_reset()
+                progress.thread_reset(s.get('_progress_key'))
 
             state['downloaded_bytes'] = ctx['complete_frags_downloaded_bytes'] = progress.downloaded
             state['speed'] = ctx['speed'] = progress.speed.smooth
@@ -340,6 +660,15 @@ def _prepare_external_frag_download(self, ctx):
         })
 
     def decrypter(self, info_dict):
+        return self._decrypters(info_dict)[0]
+
+    def _decrypters(self, info_dict):
+        """
+        @returns (decrypt_fragment, get_decrypter_factory)
+            decrypt_fragment(fragment, frag_content) returns the decrypted content
+            get_decrypter_factory(fragment) returns a function that makes AESCBCStreamDecrypters
+                for the fragment, or None if it does not need decryption
+        """
         _key_cache = {}
 
         def _get_key(url):
@@ -347,12 +676,10 @@ def _get_key(url):
                 _key_cache[url] = self.ydl.urlopen(self._prepare_url(info_dict, url)).read()
             return _key_cache[url]
 
-        def decrypt_fragment(fragment, frag_content):
-            if frag_content is None:
-                return
+        def _get_key_and_iv(fragment):
             decrypt_info = fragment.get('decrypt_info')
             if not decrypt_info or decrypt_info['METHOD'] != 'AES-128':
-                return frag_content
+                return None
             iv = decrypt_info.get('IV') or struct.pack('>8xq', fragment['media_sequence'])
             decrypt_info['KEY'] = (decrypt_info.get('KEY')
                                    or _get_key(traverse_obj(info_dict, ('hls_aes', 'uri')) or decrypt_info['URI']))
@@ -360,10 +687,170 @@ def decrypt_fragment(fragment, frag_content):
             # size (see https://github.com/ytdl-org/youtube-dl/pull/27660). Tests only care that the correct data downloaded,
             # not what it decrypts to.
             if self.params.get('test', False):
+                return None
+            return decrypt_info['KEY'], iv
+
+        def decrypt_fragment(fragment, frag_content):
+            if frag_content is None:
+                return
+            key_and_iv = _get_key_and_iv(fragment)
+            if not key_and_iv:
                 return frag_content
-            return unpad_pkcs7(aes_cbc_decrypt_bytes(frag_content, decrypt_info['KEY'], iv))
+            return unpad_pkcs7(aes_cbc_decrypt_bytes(frag_content, *key_and_iv))
+
+        def get_decrypter_factory(fragment):
+            key_and_iv = _get_key_and_iv(fragment)
+            if key_and_iv:
+                return lambda: AESCBCStreamDecrypter(*key_and_iv)
+
+        return decrypt_fragment, get_decrypter_factory
+
+    def _asyncio_unsupported(self, ctx, fragments, info_dict):
+        """@returns why the asyncio engine cannot download the fragments, or None if it can"""
+        if ctx['live']:
+            return 'the stream is live'
+        elif self.params.get('ratelimit') or self.params.get('throttledratelimit'):
+            return 'the download speed is limited'
+        elif self.params.get('keep_fragments') or self.params.get('fragment_memory_limit') == 0:
+            return 'the fragments are downloaded to disk'
+        elif self.params.get('test'):
+            return 'only the start of each fragment is downloaded in tests'
+        elif info_dict.get('request_data'):
+            return 'the fragments are requested with data'
+        with contextlib.suppress(RuntimeError):
+            asyncio.get_running_loop()
+            return 'an event loop is already running in this thread'
+
+        headers = HTTPHeaderDict(info_dict.get('http_headers'))
+        if 'Ytdl-socks-proxy' in headers:
+            return 'a proxy is used'
+        proxies = self.ydl.proxies.copy()
+        clean_proxies(proxies, headers)
+        checked = set()
+        for fragment in fragments:
+            parsed = urllib.parse.urlparse(fragment['url'])
+            if (parsed.scheme, parsed.netloc) in checked:
+                continue
+            if parsed.scheme not in ('http', 'https'):
+                return f'{parsed.scheme or "relative"} URLs are not supported'
+            elif select_proxy(fragment['url'], proxies):
+                return 'a proxy is used'
+            checked.add((parsed.scheme, parsed.netloc))
+
+    def _download_fragments_asyncio(
+            self, ctx, fragments, info_dict, max_workers, *, is_fatal,
+            get_decrypter_factory, read_fragment, append_fragment, interrupt_trigger):
+        """
+        Download the fragments from an asyncio event loop in the current thread, and append them in order
+
+        Up to max_workers fragments are downloaded at once, and upto twice as many are held
+        in memory ahead of the fragment being appended. Retries, skipped fragments and
+        progress are reported the same way as with threads
+        """
+        client = AsyncHTTPClient(self.ydl)
+        sleep_func = self.params.get('retry_sleep_functions', {}).get('fragment')
+
+        async def download_fragment(fragment, semaphore):
+            frag_index = fragment['frag_index']
+            headers = HTTPHeaderDict(info_dict.get('http_headers'))
+            byte_range = fragment.get('byte_range')
+            if byte_range:
+                headers['Range'] = 'bytes=%d-%d' % (byte_range['start'], byte_range['end'] - 1)
+            fatal = is_fatal(fragment.get('index') or (frag_index - 1))
+            decrypter_factory = get_decrypter_factory(fragment)
+            delay = [None]
+
+            def error_callback(err, count, retries):
+                if fatal and count > retries:
+                    ctx['dest_stream'].close()
+                # Sleeping would block the event loop
+                self.report_retry(err, count, retries, frag_index, fatal, sleep_func=None)
+                if count <= retries:
+                    delay[0] = float_or_none(sleep_func(n=count - 1)) if callable(sleep_func) else sleep_func
+
+            def report_progress(downloaded_bytes, total_bytes, status='downloading'):
+                ctx['dl']._hook_progress({
+                    'status': status,
+                    'downloaded_bytes': downloaded_bytes,
+                    'total_bytes': total_bytes,
+                    'ctx_id': ctx.get('ctx_id'),
+                    '_progress_key': frag_index,
+                }, {'url': fragment['url'], 'http_headers': headers, 'ctx_id': ctx.get('ctx_id')})
+
+            async with semaphore:
+                for retry in RetryManager(self.params.get('fragment_retries'), error_callback):
+                    if delay[0]:
+                        self.to_screen(f'Sleeping {delay[0]:.2f} seconds ...')
+                        await asyncio.sleep(delay[0])
+                        delay[0] = None
+                    frag_buffer = io.BytesIO()
+                    stream = DecryptingStream(frag_buffer, decrypter_factory) if decrypter_factory else frag_buffer
+                    try:
+                        size = await client.download(fragment['url'], headers, stream, report_progress)
+                    except (HTTPError, IncompleteRead, TransportError) as err:
+                        retry.error = err
+                        continue
+                    if decrypter_factory:
+                        stream.finish()
+                    with self._fragment_memory_lock:
+                        self._fragment_memory += frag_buffer.tell()
+                    report_progress(size, size, 'finished')
+                    return frag_buffer, bool(decrypter_factory)
+            return None, None
+
+        def release(task):
+            frag_buffer = task.result()[0] if task.done() and not task.cancelled() and not task.exception() else None
+            if frag_buffer is not None:
+                with self._fragment_memory_lock:
+                    self._fragment_memory -= frag_buffer.tell()
+
+        async def download_fragments():
+            semaphore = asyncio.Semaphore(max_workers)
+            fragments_iter = iter(fragments)
+            # The fragments being downloaded or waiting to be appended, in order
+            pending = collections.deque()
+
+            def schedule():
+                fragment = next(fragments_iter, None)
+                if fragment is not None and interrupt_trigger[0]:
+                    pending.append((fragment, asyncio.ensure_future(download_fragment(fragment, semaphore))))
 
-        return decrypt_fragment
+            try:
+                for _ in range(2 * max_workers):
+                    schedule()
+                while pending:
+                    fragment, task = pending[0]
+                    frag_buffer, decrypted = await task
+                    pending.popleft()
+                    schedule()
+                    frag_index = fragment['frag_index']
+                    ctx.update({
+                        'fragment_filename_sanitized': (
+                            '%s-Frag%d' % (ctx['tmpfilename'], frag_index) if frag_buffer is not None else None),
+                        'fragment_index': frag_index,
+                        'fragment_count': fragment.get('fragment_count'),
+                        'fragment_buffer': frag_buffer,
+                        'fragment_decrypted': decrypted,
+                    })
+                    if not append_fragment(read_fragment(fragment, ctx), frag_index, ctx):
+                        return False
+                return True
+            finally:
+                for _, task in pending:
+                    task.cancel()
+                await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+                for _, task in pending:
+                    release(task)
+                await client.close()
+                self.write_debug(
+                    f'[{self.FD_NAME}] asyncio: {client.stats["connections"]} connections opened, '
+                    f'{client.stats["requests"]} requests sent')
+
+        try:
+            return asyncio.run(download_fragments())
+        except KeyboardInterrupt:
+            self._finish_multiline_status()
+            raise
 
     def download_and_append_fragments_multiple(self, *args, **kwargs):
         '''
@@ -374,7 +861,8 @@ def download_and_append_fragments_multiple(self, *args, **kwargs):
         max_progress = len(args)
         if max_progress == 1:
             return self.download_and_append_fragments(*args[0], **kwargs)
-        max_workers = self.params.get('concurrent_fragment_downloads', 1)
+        max_workers = max(self.params.get('concurrent_fragment_downloads', 1),
+                          self.params.get('max_concurrent_fragment_downloads') or 0)
         if max_progress > 1:
             self._prepare_multiline_status(max_progress)
         is_live = any(traverse_obj(args, (..., 2, 'is_live')))
@@ -431,16 +919,30 @@ def interrupt_trigger_iter(fg):
 
     def download_and_append_fragments(
             self, ctx, fragments, info_dict, *, is_fatal=(lambda idx: False),
-            pack_func=(lambda content, idx: content), finish_func=None,
+            pack_func=None, finish_func=None,
             tpe=None, interrupt_trigger=(True, )):
 
         if not self.params.get('skip_unavailable_fragments', True):
             is_fatal = lambda _: True
 
+        max_workers = math.ceil(
+            self.params.get('concurrent_fragment_downloads', 1) / ctx.get('max_progress', 1))
+        concurrency = None
+        max_concurrency = math.ceil(
+            (self.params.get('max_concurrent_fragment_downloads') or 0) / ctx.get('max_progress', 1))
+        if max_concurrency > max_workers and not ctx['live']:
+            concurrency = FragmentConcurrencyController(
+                max_workers, max_concurrency, lambda: ctx['progress'].downloaded,
+                lambda msg: self.write_debug(f'[{self.FD_NAME}] {msg}'))
+            max_workers = max_concurrency
+
         def download_fragment(fragment, ctx):
             if not interrupt_trigger[0]:
                 return
+            with concurrency.slot() if concurrency else contextlib.nullcontext():
+                return _download_fragment_with_retries(fragment, ctx)
 
+        def _download_fragment_with_retries(fragment, ctx):
             frag_index = ctx['fragment_index'] = fragment['frag_index']
             ctx['last_error'] = None
             headers = HTTPHeaderDict(info_dict.get('http_headers'))
@@ -454,6 +956,8 @@ def download_fragment(fragment, ctx):
             def error_callback(err, count, retries):
                 if fatal and count > retries:
                     ctx['dest_stream'].close()
+                if concurrency:
+                    concurrency.report_error(err)
                 self.report_retry(err, count, retries, frag_index, fatal)
                 ctx['last_error'] = err
 
@@ -461,7 +965,8 @@ def error_callback(err, count, retries):
                 try:
                     ctx['fragment_count'] = fragment.get('fragment_count')
                     if not self._download_fragment(
-                            ctx, fragment['url'], info_dict, headers, info_dict.get('request_data')):
+                            ctx, fragment['url'], info_dict, headers, info_dict.get('request_data'),
+                            get_decrypter_factory(fragment)):
                         return
                 except (HTTPError, IncompleteRead) as err:
                     retry.error = err
@@ -472,7 +977,7 @@ def error_callback(err, count, retries):
 
         def append_fragment(frag_content, frag_index, ctx):
             if frag_content:
-                self._append_fragment(ctx, pack_func(frag_content, frag_index))
+                self._append_fragment(ctx, pack_func(frag_content, frag_index) if pack_func else frag_content)
             elif not is_fatal(frag_index - 1):
                 self.report_skip_fragment(frag_index, 'fragment not found')
             else:
@@ -481,39 +986,132 @@ def append_fragment(frag_content, frag_index, ctx):
                 return False
             return True
 
-        decrypt_fragment = self.decrypter(info_dict)
+        decrypt_fragment, get_decrypter_factory = self._decrypters(info_dict)
 
-        max_workers = math.ceil(
-            self.params.get('concurrent_fragment_downloads', 1) / ctx.get('max_progress', 1))
-        if max_workers > 1:
+        def read_fragment(fragment, ctx):
+            frag_content = self._read_fragment(ctx)
+            if ctx.get('fragment_decrypted'):
+                return frag_content
+            return decrypt_fragment(fragment, frag_content)
+
+        use_asyncio = False
+        if self.params.get('fragment_engine') == 'asyncio':
+            if not ctx['live']:
+                fragments = list(fragments)
+            reason = self._asyncio_unsupported(ctx, fragments, info_dict)
+            if reason:
+                self.write_debug(f'[{self.FD_NAME}] Downloading the fragments with threads since {reason}')
+            use_asyncio = not reason
+
+        # When the sizes of all fragments are known, they can be written to the file as soon as
+        # they are downloaded, instead of waiting for the preceding fragments
+        positional_writer = None
+        if (max_workers > 1 or 'positional' in ctx) and not ctx['live'] and ctx['tmpfilename'] != '-' \
+                and pack_func is None and finish_func is None and not use_asyncio:
+            fragments = list(fragments)
+            if fragments and PositionalFragmentWriter.fragment_sizes_known(fragments):
+                ctx['dest_stream'].flush()
+                positional_writer = PositionalFragmentWriter(
+                    ctx['tmpfilename'], fragments, ctx['complete_frags_downloaded_bytes'],
+                    ctx['fragment_index'], traverse_obj(ctx, ('positional', 'completed')) or b'')
+        if 'positional' in ctx and not positional_writer:
+            # The fragments written out of order by the previous run are downloaded again
+            ctx['dest_stream'].truncate(ctx.pop('positional')['offset'])
+
+        if positional_writer:
             def _download_fragment(fragment):
-                ctx_copy = ctx.copy()
+                ctx_copy = {**ctx, 'fragment_buffer': None}
                 download_fragment(fragment, ctx_copy)
-                return fragment, fragment['frag_index'], ctx_copy.get('fragment_filename_sanitized')
+                frag_content = read_fragment(fragment, ctx_copy)
+                frag_index = fragment['frag_index']
+                if not frag_content:
+                    positional_writer.skip(frag_index)
+                    return append_fragment(frag_content, frag_index, ctx_copy)
+                elif len(frag_content) != positional_writer.fragment_size(frag_index):
+                    self._remove_fragment(ctx_copy)
+                    self.report_error(f'fragment {frag_index} does not match its byte range, unable to continue')
+                    return False
+                self._write_fragment_at(ctx_copy, positional_writer, frag_content)
+                return True
 
-            with tpe or concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
-                try:
-                    for fragment, frag_index, frag_filename in pool.map(_download_fragment, fragments):
-                        ctx.update({
-                            'fragment_filename_sanitized': frag_filename,
-                            'fragment_index': frag_index,
-                        })
-                        if not append_fragment(decrypt_fragment(fragment, self._read_fragment(ctx)), frag_index, ctx):
-                            return False
-                except KeyboardInterrupt:
-                    self._finish_multiline_status()
-                    self.report_error(
-                        'Interrupted by user. Waiting for all threads to shutdown...', is_error=False, tb=False)
-                    pool.shutdown(wait=False)
-                    raise
+            try:
+                with tpe or concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+                    futures = [pool.submit(_download_fragment, fragment) for fragment in fragments
+                               if not positional_writer.is_completed(fragment['frag_index'])]
+                    try:
+                        for future in concurrent.futures.as_completed(futures):
+                            if not future.result():
+                                return False
+                    except KeyboardInterrupt:
+                        self._finish_multiline_status()
+                        self.report_error(
+                            'Interrupted by user. Waiting for all threads to shutdown...', is_error=False, tb=False)
+                        pool.shutdown(wait=False)
+                        raise
+                    finally:
+                        for future in futures:
+                            future.cancel()
+                positional_writer.remove_gaps()
+            finally:
+                positional_writer.close()
+        elif use_asyncio:
+            if not self._download_fragments_asyncio(
+                    ctx, fragments, info_dict, max_workers, is_fatal=is_fatal,
+                    get_decrypter_factory=get_decrypter_factory, read_fragment=read_fragment,
+                    append_fragment=append_fragment, interrupt_trigger=interrupt_trigger):
+                return False
+        elif max_workers > 1:
+            def _download_fragment(fragment):
+                # The buffer being appended by the main thread belongs to it
+                ctx_copy = {**ctx, 'fragment_buffer': None}
+                download_fragment(fragment, ctx_copy)
+                return (fragment, fragment['frag_index'], ctx_copy.get('fragment_filename_sanitized'),
+                        ctx_copy.get('fragment_buffer'), ctx_copy.get('fragment_decrypted'))
+
+            futures, appended = [], 0
+            try:
+                with tpe or concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+                    futures = [pool.submit(_download_fragment, fragment) for fragment in fragments]
+                    try:
+                        for future in futures:
+                            fragment, frag_index, frag_filename, frag_buffer, decrypted = future.result()
+                            appended += 1
+                            ctx.update({
+                                'fragment_filename_sanitized': frag_filename,
+                                'fragment_index': frag_index,
+                                'fragment_buffer': frag_buffer,
+                                'fragment_decrypted': decrypted,
+                            })
+                            if not append_fragment(read_fragment(fragment, ctx), frag_index, ctx):
+                                return False
+                    except KeyboardInterrupt:
+                        self._finish_multiline_status()
+                        self.report_error(
+                            'Interrupted by user. Waiting for all threads to shutdown...', is_error=False, tb=False)
+                        pool.shutdown(wait=False)
+                        raise
+                    finally:
+                        for future in futures[appended:]:
+                            future.cancel()
+            finally:
+                # The buffers of the fragments that were downloaded but not appended
+                # must not stay charged to the memory limit of this downloader
+                # Fragments still being downloaded are released when they finish, since
+                # the pool of download_and_append_fragments_multiple does not wait for them
+                def release_unappended(future):
+                    if not future.cancelled() and future.exception() is None:
+                        self._release_fragment_buffer({'fragment_buffer': future.result()[3]})
+
+                self._release_fragment_buffer(ctx)
+                for future in futures[appended:]:
+                    future.add_done_callback(release_unappended)
         else:
             for fragment in fragments:
                 if not interrupt_trigger[0]:
                     break
                 try:
                     download_fragment(fragment, ctx)
-                    result = append_fragment(
-                        decrypt_fragment(fragment, self._read_fragment(ctx)), fragment['frag_index'], ctx)
+                    result = append_fragment(read_fragment(fragment, ctx), fragment['frag_index'], ctx)
                 except KeyboardInterrupt:
                     if info_dict.get('is_live'):
                         break
@@ -1,5 +1,9 @@
+import concurrent.futures
+import contextlib
+import json
 import os
 import random
+import threading
 import time
 
 from .common import FileDownloader
@@ -11,6 +15,7 @@
 )
 from ..utils import (
     ContentTooShortError,
+    DownloadCancelled,
     RetryManager,
     ThrottledDownload,
     XAttrMetadataError,
@@ -18,14 +23,73 @@
     encodeFilename,
     int_or_none,
     parse_http_range,
+    timeconvert,
     try_call,
     write_xattr,
 )
 from ..utils.networking import HTTPHeaderDict
+from ..utils.progress import ProgressCalculator
+
+
+class SegmentStream:
+    """A writable stream for HttpFD that writes a segment into the shared output file, at the given offset"""
+
+    def __init__(self, file, lock, offset, size):
+        self._file, self._lock = file, lock
+        self.offset, self.size = offset, size
+        # Bytes of the segment written so far, and when the current request started
+        self.written = self.base = 0
+        self.cancelled = False
+
+    def write(self, data):
+        if self.cancelled:
+            raise DownloadCancelled('Segmented download was interrupted')
+        if self.written + len(data) > self.size:
+            raise OSError(f'Got more data than the {self.size} bytes requested')
+        if hasattr(os, 'pwrite'):
+            view, offset = memoryview(data), self.offset + self.written
+            while view:
+                count = os.pwrite(self._file.fileno(), view, offset)
+                view, offset = view[count:], offset + count
+        else:
+            with self._lock:
+                self._file.seek(self.offset + self.written)
+                self._file.write(data)
+        self.written += len(data)
+        return len(data)
+
+    def seek(self, pos):
+        self.written = self.base + pos
+
+    def truncate(self):
+        pass
+
+    def tell(self):
+        return self.written - self.base
 
 
 class HttpFD(FileDownloader):
+    """
+    Available options:
+
+    http_connections:   Number of connections to download the file with, each
+                        downloading a segment of it using range requests
+                        (default is 1). The progress is saved in a .ytdl file
+    """
+
+    # Minimum size of each segment for a segmented download
+    _MIN_SEGMENT_SIZE = 1024 * 1024
+    # Time between saving the progress of a segmented download (seconds)
+    _SEGMENT_STATE_INTERVAL = 1
+    # Upper bound of the adaptive read size
+    _MAX_BLOCK_SIZE = 16 * 1024 * 1024
+
     def real_download(self, filename, info_dict):
+        connections = self.params.get('http_connections') or 1
+        if connections > 1 and filename != '-' and not hasattr(filename, 'write') and not self.params.get('test'):
+            result = self._download_segmented(filename, info_dict, connections)
+            if result is not None:
+                return result
         url = info_dict['url']
         request_data = info_dict.get('request_data', None)
 
@@ -36,7 +100,9 @@ class DownloadContext(dict):
 
         ctx = DownloadContext()
         ctx.filename = filename
-        ctx.tmpfilename = self.temp_name(filename)
+        # filename may be a writable object, which the data is written into directly
+        ctx.to_stream = hasattr(filename, 'write')
+        ctx.tmpfilename = filename if ctx.to_stream else self.temp_name(filename)
         ctx.stream = None
 
         # Disable compression
@@ -56,7 +122,7 @@ class DownloadContext(dict):
         # parse given Range
         req_start, req_end, _ = parse_http_range(headers.get('Range'))
 
-        if self.params.get('continuedl', True):
+        if self.params.get('continuedl', True) and not ctx.to_stream:
             # Establish possible resume length
             if os.path.isfile(encodeFilename(ctx.tmpfilename)):
                 ctx.resume_len = os.path.getsize(
@@ -194,7 +260,7 @@ def establish_connection():
 
         def close_stream():
             if ctx.stream is not None:
-                if not ctx.tmpfilename == '-':
+                if not ctx.tmpfilename == '-' and not ctx.to_stream:
                     ctx.stream.close()
                 ctx.stream = None
 
@@ -229,6 +295,9 @@ def download():
 
             byte_counter = 0 + ctx.resume_len
             block_size = ctx.block_size
+            # The blocks are read into a reused buffer, which is only reallocated when the block size grows.
+            # So the data written to ctx.stream is a memoryview that is only valid until the next read
+            buffer = bytearray(block_size)
             start = time.time()
 
             # measure time over whole while-loop, so slow_down() and best_block_size() work together properly
@@ -237,14 +306,17 @@ def download():
 
             def retry(e):
                 close_stream()
-                ctx.resume_len = (byte_counter if ctx.tmpfilename == '-'
+                ctx.resume_len = (byte_counter if ctx.tmpfilename == '-' or ctx.to_stream
                                   else os.path.getsize(encodeFilename(ctx.tmpfilename)))
                 raise RetryDownload(e)
 
             while True:
+                if block_size > len(buffer):
+                    buffer = bytearray(block_size)
+                view = memoryview(buffer)[:block_size if not is_test else min(block_size, data_len - byte_counter)]
                 try:
                     # Download and write
-                    data_block = ctx.data.read(block_size if not is_test else min(block_size, data_len - byte_counter))
+                    data_block = view[:ctx.data.readinto(view)]
                 except TransportError as err:
                     retry(err)
 
@@ -255,7 +327,12 @@ def retry(e):
                     break
 
                 # Open destination file just in time
-                if ctx.stream is None:
+                if ctx.stream is None and ctx.to_stream:
+                    ctx.stream = ctx.tmpfilename
+                    if ctx.open_mode == 'wb':
+                        ctx.stream.seek(0)
+                        ctx.stream.truncate()
+                elif ctx.stream is None:
                     try:
                         ctx.stream, ctx.tmpfilename = self.sanitize_open(
                             ctx.tmpfilename, ctx.open_mode)
@@ -288,7 +365,7 @@ def retry(e):
 
                 # Adjust block size
                 if not self.params.get('noresizebuffer', False):
-                    block_size = self.best_block_size(after - before, len(data_block))
+                    block_size = self.best_block_size(after - before, len(data_block), self._MAX_BLOCK_SIZE)
 
                 before = after
 
@@ -320,8 +397,7 @@ def retry(e):
                     if ctx.throttle_start is None:
                         ctx.throttle_start = now
                     elif now - ctx.throttle_start > 3:
-                        if ctx.stream is not None and ctx.tmpfilename != '-':
-                            ctx.stream.close()
+                        close_stream()
                         raise ThrottledDownload()
                 elif speed:
                     ctx.throttle_start = None
@@ -335,18 +411,23 @@ def retry(e):
                 ctx.resume_len = byte_counter
                 raise NextFragment()
 
-            if ctx.tmpfilename != '-':
+            if ctx.tmpfilename != '-' and not ctx.to_stream:
                 ctx.stream.close()
 
             if data_len is not None and byte_counter != data_len:
                 err = ContentTooShortError(byte_counter, int(data_len))
                 retry(err)
 
-            self.try_rename(ctx.tmpfilename, ctx.filename)
+            if ctx.to_stream:
+                # There is no file to update, but the caller may apply the time to its own file
+                last_modified = ctx.data.headers.get('last-modified')
+                info_dict['filetime'] = last_modified and timeconvert(last_modified) or None
+            else:
+                self.try_rename(ctx.tmpfilename, ctx.filename)
 
-            # Update file modification time
-            if self.params.get('updatetime', True):
-                info_dict['filetime'] = self.try_utime(ctx.filename, ctx.data.headers.get('last-modified', None))
+                # Update file modification time
+                if self.params.get('updatetime', True):
+                    info_dict['filetime'] = self.try_utime(ctx.filename, ctx.data.headers.get('last-modified', None))
 
             self._hook_progress({
                 'downloaded_bytes': byte_counter,
@@ -376,3 +457,179 @@ def retry(e):
                 close_stream()
                 raise
         return False
+
+    def _probe_segments(self, info_dict):
+        """@returns (total size, response headers) if the file can be downloaded in segments, else None"""
+        headers = HTTPHeaderDict({'Accept-Encoding': 'identity'}, info_dict.get('http_headers'))
+        if info_dict.get('request_data') is not None or 'Range' in headers:
+            return None
+        headers['Range'] = 'bytes=0-0'
+        try:
+            response = self.ydl.urlopen(Request(info_dict['url'], None, headers))
+        except (HTTPError, TransportError) as err:
+            self.write_debug(f'Unable to probe for a segmented download: {err}')
+            return None
+        with contextlib.closing(response):
+            start, end, total = parse_http_range(response.headers.get('Content-Range'))
+            if response.status != 206 or start != 0 or not total or response.headers.get('Content-Encoding'):
+                return None
+            return total, response.headers
+
+    def _read_segment_state(self, ytdl_filename, total):
+        try:
+            with open(encodeFilename(ytdl_filename), encoding='utf-8') as f:
+                state = json.load(f)['downloader']['http_segments']
+            if state['size'] == total:
+                return [(int(start), int(end), int(done)) for start, end, done in state['segments']]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _write_segment_state(self, ytdl_filename, total, streams):
+        with open(encodeFilename(ytdl_filename), 'w', encoding='utf-8') as f:
+            json.dump({'downloader': {'http_segments': {
+                'size': total,
+                'segments': [(s.offset, s.offset + s.size, s.written) for s in streams],
+            }}}, f)
+
+    def _download_segmented(self, filename, info_dict, connections):
+        """
+        Download the file in segments over multiple connections
+        @returns None if this is not possible, otherwise whether the download was successful
+        """
+        tmpfilename = self.temp_name(filename)
+        ytdl_filename = self.ytdl_filename(filename)
+        has_state = os.path.isfile(encodeFilename(ytdl_filename))
+
+        probe = self._probe_segments(info_dict)
+        segments = probe and self.params.get('continuedl', True) and os.path.isfile(encodeFilename(tmpfilename)) \
+            and self._read_segment_state(ytdl_filename, probe[0])
+        if not segments and probe:
+            total = probe[0]
+            # A partial file without state was downloaded over a single connection
+            resume_len = 0
+            if self.params.get('continuedl', True) and not has_state:
+                resume_len = min(self.filesize_or_none(tmpfilename), total)
+            count = min(connections, (total - resume_len) // self._MIN_SEGMENT_SIZE)
+            if count > 1:
+                bounds = [resume_len + (total - resume_len) * i // count for i in range(count + 1)]
+                segments = [(0, resume_len, resume_len)] if resume_len else []
+                segments.extend((start, end, 0) for start, end in zip(bounds, bounds[1:]))
+        if not segments:
+            if has_state:
+                # The .part file of a segmented download cannot be resumed over a single connection
+                self.report_warning('Unable to resume the segmented download; restarting from the beginning')
+                self.try_remove(tmpfilename)
+                self.try_remove(ytdl_filename)
+            return None
+
+        total, response_headers = probe
+        min_size, max_size = self.params.get('min_filesize'), self.params.get('max_filesize')
+        if min_size is not None and total < min_size:
+            self.to_screen(f'\r[download] File is smaller than min-filesize ({total} bytes < {min_size} bytes). Aborting.')
+            return False
+        if max_size is not None and total > max_size:
+            self.to_screen(f'\r[download] File is larger than max-filesize ({total} bytes > {max_size} bytes). Aborting.')
+            return False
+
+        self.to_screen(f'[download] Downloading in {sum(done < end - start for start, end, done in segments)} segments')
+        self.report_destination(filename)
+        mode = 'r+b' if os.path.isfile(encodeFilename(tmpfilename)) else 'w+b'
+        lock = threading.Lock()
+        with open(encodeFilename(tmpfilename), mode) as file:
+            file.truncate(total)
+            streams = []
+            for start, end, done in segments:
+                streams.append(SegmentStream(file, lock, start, end - start))
+                streams[-1].written = done
+            return self._download_segments(filename, tmpfilename, ytdl_filename, info_dict, streams, response_headers)
+
+    def _download_segments(self, filename, tmpfilename, ytdl_filename, info_dict, streams, response_headers):
+        total = sum(stream.size for stream in streams)
+        connections = max(sum(stream.written < stream.size for stream in streams), 1)
+        ratelimit = self.params.get('ratelimit')
+        throttledratelimit = self.params.get('throttledratelimit')
+        dl = HttpQuietDownloader(self.ydl, {
+            **self.params,
+            'noprogress': True,
+            'http_connections': 1,
+            'min_filesize': None,
+            'max_filesize': None,
+            'ratelimit': ratelimit and ratelimit / connections,
+            'throttledratelimit': throttledratelimit and throttledratelimit / connections,
+        })
+        progress = ProgressCalculator(sum(stream.written for stream in streams))
+        progress.total = total
+
+        def progress_hook(status):
+            if status['status'] not in ('downloading', 'finished'):
+                return
+            progress.update(status.get('downloaded_bytes'))
+            if status['status'] == 'finished':
+                progress.thread_reset()
+            self._hook_progress({
+                'status': 'downloading',
+                'downloaded_bytes': progress.downloaded,
+                'total_bytes': total,
+                'filename': filename,
+                'tmpfilename': tmpfilename,
+                'speed': progress.speed.smooth,
+                'eta': progress.eta.smooth,
+                'elapsed': progress.elapsed,
+                'ctx_id': info_dict.get('ctx_id'),
+            }, info_dict)
+
+        dl.add_progress_hook(progress_hook)
+
+        def download_segment(stream):
+            progress.thread_reset()
+            headers = HTTPHeaderDict(info_dict.get('http_headers'))
+            headers['Range'] = f'bytes={stream.offset + stream.written}-{stream.offset + stream.size - 1}'
+            stream.base = stream.written
+            if not dl.real_download(stream, {**info_dict, 'http_headers': headers}):
+                return False
+            if stream.written != stream.size:
+                raise ContentTooShortError(stream.written, stream.size)
+            return True
+
+        with concurrent.futures.ThreadPoolExecutor(connections) as pool:
+            futures = [pool.submit(download_segment, stream) for stream in streams if stream.written < stream.size]
+            try:
+                not_done = futures
+                while not_done:
+                    done, not_done = concurrent.futures.wait(
+                        not_done, self._SEGMENT_STATE_INTERVAL, concurrent.futures.FIRST_EXCEPTION)
+                    self._write_segment_state(ytdl_filename, total, streams)
+                    for future in done:
+                        future.result()
+                success = all(future.result() for future in futures)
+            finally:
+                # Let the other segments stop early if one of them failed or the user interrupted
+                for future in futures:
+                    future.cancel()
+                for stream in streams:
+                    stream.cancelled = True
+        self._write_segment_state(ytdl_filename, total, streams)
+        if not success:
+            return False
+
+        self.try_remove(ytdl_filename)
+        self.try_rename(tmpfilename, filename)
+        if self.params.get('updatetime', True):
+            info_dict['filetime'] = self.try_utime(filename, response_headers.get('last-modified'))
+        self._hook_progress({
+            'downloaded_bytes': total,
+            'total_bytes': total,
+            'filename': filename,
+            'status': 'finished',
+            'elapsed': progress.elapsed,
+            'ctx_id': info_dict.get('ctx_id'),
+        }, info_dict)
+        return True
+
+
+class HttpQuietDownloader(HttpFD):
+    def to_screen(self, *args, **kargs):
+        pass
+
+    to_console_title = to_screen
@@ -0,0 +1,177 @@
+"""Prefilter for extractors' _EMBED_REGEX
+
+Each _EMBED_REGEX is statically analysed for literal "anchors" (host names, paths etc),
+at least one of which must be present in the webpage for the regex to match.
+Anchors are looked for with plain substring searches which are much cheaper than
+running every _EMBED_REGEX over the whole webpage
+"""
+
+import collections
+import functools
+import re
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Shortest anchor that is considered useful
+_MIN_ANCHOR_LENGTH = 4
+# Maximum number of alternatives a regex is expanded into before branches are summarized
+_MAX_ALTERNATIVES = 16
+# Anchors contained in these are present in most webpages
+_COMMON_HTML = (
+    '<iframe', '<script', '<video', '<source', '<embed', '<object', '<param', '<meta', '<link',
+    '<div', 'src=', 'href=', 'data-', 'https://', 'http://', 'www.', '.com', 'embed', 'player',
+    'video', 'content=', 'property=', 'class=', 'name=', 'type=', 'value=')
+# Non-ASCII characters that match an ASCII letter in case-insensitive regexes
+_CASEFOLD_FIXES = str.maketrans({'İ': 'i', 'ı': 'i', 'ſ': 's', 'K': 'k'})
+# Maps (lowercased) bytes that are not ASCII alphanumeric to a space, for tokenizing
+_TOKENIZE_TABLE = bytes(c if chr(c) in 'abcdefghijklmnopqrstuvwxyz0123456789' else 32 for c in range(256))
+
+_REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+_REPEATS.add(getattr(sre_parse, 'POSSESSIVE_REPEAT', sre_parse.MAX_REPEAT))
+
+# Atoms of a flattened regex:
+#   (char, ignorecase) - a literal ASCII character
+#   _Opaque(req)       - anything else, with the anchors required by it (if any)
+_Opaque = collections.namedtuple('_Opaque', ('req',))
+_UNKNOWN = _Opaque(None)
+
+
+def _literal(char, icase):
+    char = chr(char)
+    if not char.isascii():
+        return _UNKNOWN
+    return (char.lower(), True) if icase and char.isalpha() else (char, False)
+
+
+def _in_atom(items, icase):
+    chars = set()
+    for op, av in items:
+        if op != sre_parse.LITERAL:
+            return _UNKNOWN
+        chars.add(chr(av))
+    if len(chars) == 1:
+        return _literal(ord(chars.pop()), icase)
+    lowered = {char.lower() for char in chars}
+    if len(lowered) == 1 and all(char.isascii() and char.isalpha() for char in chars):
+        return (lowered.pop(), True)  # eg: [Ii]frame
+    return _UNKNOWN
+
+
+def _flatten(pattern, icase):
+    """Expand a parsed (sub)pattern into a list of alternative atom sequences"""
+    alternatives = [[]]
+    for op, av in pattern:
+        if op == sre_parse.LITERAL:
+            options = [[_literal(av, icase)]]
+        elif op == sre_parse.IN:
+            options = [[_in_atom(av, icase)]]
+        elif op == sre_parse.SUBPATTERN:
+            _, add_flags, del_flags, p = av
+            options = _flatten(p, (icase or bool(add_flags & sre_parse.SRE_FLAG_IGNORECASE))
+                               and not del_flags & sre_parse.SRE_FLAG_IGNORECASE)
+        elif op == getattr(sre_parse, 'ATOMIC_GROUP', None):
+            options = _flatten(av, icase)
+        elif op == sre_parse.BRANCH:
+            options = [alt for branch in av[1] for alt in _flatten(branch, icase)]
+        elif op in _REPEATS:
+            low, high, body = av
+            options = _flatten(body, icase)
+            if (low, high) != (1, 1):
+                # Optional parts are not expanded, since anchors spanning them are less selective
+                options = [[_Opaque(_requirement(options) if low else None)]]
+        else:
+            options = [[_UNKNOWN]]
+
+        if len(options) > 1 and len(alternatives) * len(options) > _MAX_ALTERNATIVES:
+            options = [[_Opaque(_requirement(options))]]
+        alternatives = [alt + option for alt in alternatives for option in options]
+    return alternatives
+
+
+def _requirement_score(req):
+    return (any(any(anchor in common for common in _COMMON_HTML) for anchor, _ in req),
+            -min(len(anchor) for anchor, _ in req), len(req))
+
+
+def _requirement(alternatives):
+    """@returns a set of (anchor, ignorecase), at least one of which must be present in every match, or None"""
+    result = set()
+    for atoms in alternatives:
+        candidates = [atom.req for atom in atoms if atom.__class__ is _Opaque and atom.req]
+        run = []
+        for atom in (*atoms, _UNKNOWN):
+            if atom.__class__ is tuple:
+                run.append(atom)
+                continue
+            elif len(run) >= _MIN_ANCHOR_LENGTH:
+                icase = any(i for _, i in run)
+                anchor = ''.join(char.lower() if icase else char for char, _ in run)
+                candidates.append({(anchor, icase)})
+            run = []
+        if not candidates:
+            return None
+        result.update(min(candidates, key=_requirement_score))
+    return result
+
+
+def embed_regex_anchors(regexes):
+    """
+    Get the anchors required for any of the given regexes to be found in a webpage
+    @returns a sorted tuple of (anchor, ignorecase), one of which is guaranteed to be
+             present in the webpage for any regex to match; or None if this cannot be determined
+    """
+    anchors = set()
+    for regex in regexes:
+        try:
+            parsed = sre_parse.parse(regex)
+        except Exception:
+            return None
+        req = _requirement(_flatten(parsed, bool(parsed.state.flags & sre_parse.SRE_FLAG_IGNORECASE)))
+        if not req:
+            return None
+        anchors.update(req)
+    return tuple(sorted(anchors))
+
+
+@functools.lru_cache(maxsize=None)
+def _anchor_tokens(anchor):
+    """Alphanumeric runs (as bytes) of the anchor that are delimited on both sides within it"""
+    return frozenset(re.findall(rb'(?<=[^a-z0-9])[a-z0-9]+(?=[^a-z0-9])', anchor.lower().encode()))
+
+
+class EmbedScanner:
+    """
+    Checks whether the anchors from embed_regex_anchors are present in a webpage
+
+    The webpage is tokenized once, so that most anchors can be ruled out by a set lookup.
+    Each remaining distinct anchor is only searched for once per webpage
+    """
+
+    def __init__(self, webpage):
+        self._webpage = webpage
+        self._lowered = self._tokens = None
+        self._found = {}
+
+    def _contains(self, anchor, icase):
+        if self._lowered is None:
+            self._lowered = (self._webpage if self._webpage.isascii()
+                             else self._webpage.translate(_CASEFOLD_FIXES)).lower()
+            self._tokens = set(self._lowered.encode().translate(_TOKENIZE_TABLE).split())
+        if not _anchor_tokens(anchor) <= self._tokens:
+            return False
+        return anchor in (self._lowered if icase else self._webpage)
+
+    def may_match(self, anchors):
+        """Whether a regex with the given anchors can match the webpage. None = unknown anchors"""
+        if anchors is None:
+            return True
+        for anchor in anchors:
+            found = self._found.get(anchor)
+            if found is None:
+                found = self._found[anchor] = self._contains(*anchor)
+            if found:
+                return True
+        return False
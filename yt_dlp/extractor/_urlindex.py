@@ -0,0 +1,217 @@
+"""URL dispatch index for extractors
+
+Each extractor's _VALID_URL is statically analysed for the "tokens" that any matching
+URL must contain. A token is a maximal run of ASCII alphanumeric characters, so these
+can be looked up against the tokens of a URL using a plain dictionary.
+The index never changes the result of the linear suitable() scan -
+it only skips extractors that cannot possibly match
+"""
+
+import collections
+import re
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from ..utils import variadic
+
+_TOKEN_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
+_SPLIT_RE = re.compile(r'[^a-z0-9]+')
+# Tokens that are present in a large number of URLs and are hence useless for dispatch
+_COMMON_TOKENS = frozenset((
+    'http', 'https', 'www', 'com', 'net', 'org', 'tv', 'co', 'uk', 'de', 'fr', 'ru', 'jp',
+    'm', 'v', 'embed', 'video', 'videos', 'watch', 'player', 'html', 'php', 'api'))
+# Maximum number of alternatives a regex is expanded into before branches are summarized
+_MAX_ALTERNATIVES = 32
+
+_REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+_REPEATS.add(getattr(sre_parse, 'POSSESSIVE_REPEAT', sre_parse.MAX_REPEAT))
+_INLINE_GROUPS = {sre_parse.SUBPATTERN}
+_INLINE_GROUPS.add(getattr(sre_parse, 'ATOMIC_GROUP', sre_parse.SUBPATTERN))
+_BOUNDARY_AT = {sre_parse.AT_BEGINNING, sre_parse.AT_BEGINNING_STRING, sre_parse.AT_END,
+                sre_parse.AT_END_STRING, sre_parse.AT_BOUNDARY}
+
+
+# Atoms of a flattened regex:
+#   str          - a known token character
+#   _SEP         - any single character that is not a token character
+#   _EDGE        - zero-width position that is a token boundary (^, $, \b)
+#   _Opaque(...) - anything else
+_SEP, _EDGE = object(), object()
+_Opaque = collections.namedtuple('_Opaque', ('nullable', 'starts_sep', 'ends_sep', 'req'))
+_UNKNOWN = _Opaque(False, False, False, None)
+_UNKNOWN_NULLABLE = _Opaque(True, False, False, None)
+
+
+def _char_atom(char):
+    char = chr(char)
+    if not char.isascii():
+        return _UNKNOWN
+    char = char.lower()
+    return char if char in _TOKEN_CHARS else _SEP
+
+
+def _in_atom(items):
+    chars = []
+    for op, av in items:
+        if op == sre_parse.LITERAL:
+            chars.append(av)
+        elif op == sre_parse.RANGE and av[1] - av[0] < 128:
+            chars.extend(range(av[0], av[1] + 1))
+        else:
+            return _UNKNOWN
+    atoms = set(map(_char_atom, chars))
+    if len(atoms) == 1:
+        return atoms.pop()
+    return _SEP if atoms == {_SEP} else _UNKNOWN
+
+
+def _summarize(alternatives):
+    """Collapse a list of alternatives into a single _Opaque atom"""
+    nullable = any(all(atom is _EDGE or atom.__class__ is _Opaque and atom.nullable for atom in alt)
+                   for alt in alternatives)
+    return _Opaque(
+        nullable,
+        all(_is_boundary(alt, True, 1) for alt in alternatives),
+        all(_is_boundary(reversed(alt), True, 2) for alt in alternatives),
+        _requirement(alternatives, False, False))
+
+
+def _flatten(pattern):
+    """Expand a parsed (sub)pattern into a list of alternative atom sequences"""
+    alternatives = [[]]
+    for op, av in pattern:
+        if op == sre_parse.LITERAL:
+            options = [[_char_atom(av)]]
+        elif op == sre_parse.IN:
+            options = [[_in_atom(av)]]
+        elif op == sre_parse.AT:
+            options = [[_EDGE if av in _BOUNDARY_AT else _UNKNOWN_NULLABLE]]
+        elif op in _INLINE_GROUPS:
+            options = _flatten(av[-1])
+        elif op == sre_parse.BRANCH:
+            options = [alt for branch in av[1] for alt in _flatten(branch)]
+        elif op in _REPEATS:
+            low, high, body = av
+            options = _flatten(body)
+            if (low, high) == (0, 1):
+                options = [[], *options]
+            elif (low, high) != (1, 1):
+                summary = _summarize(options)
+                options = [[summary._replace(nullable=summary.nullable or not low,
+                                             req=summary.req if low else None)]]
+        else:  # NOT_LITERAL, ANY, CATEGORY, GROUPREF, assertions, etc
+            options = [[_UNKNOWN_NULLABLE if op in (
+                sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS,
+                sre_parse.ASSERT, sre_parse.ASSERT_NOT) else _UNKNOWN]]
+
+        if len(options) > 1 and len(alternatives) * len(options) > _MAX_ALTERNATIVES:
+            options = [[_summarize(options)]]
+        alternatives = [alt + option for alt in alternatives for option in options]
+    return alternatives
+
+
+def _is_boundary(atoms, outer, sep_attr):
+    for atom in atoms:
+        if atom is _SEP or atom is _EDGE:
+            return True
+        elif atom.__class__ is str:
+            return False
+        elif not atom[sep_attr]:
+            return False
+        elif not atom.nullable:
+            return True
+    return outer
+
+
+def _requirement_score(req):
+    return (any(t in _COMMON_TOKENS or t.isdecimal() for t in req),
+            len(req), -min(map(len, req)))
+
+
+def _requirement(alternatives, left, right):
+    """@returns a set of tokens, at least one of which must be present in every match, or None"""
+    result = set()
+    for atoms in alternatives:
+        candidates = [atom.req for atom in atoms if atom.__class__ is _Opaque and atom.req]
+        start = None
+        for idx, atom in enumerate((*atoms, None)):
+            if atom.__class__ is str:
+                if start is None:
+                    start = idx
+            elif start is not None:
+                if (_is_boundary(reversed(atoms[:start]), left, 2)
+                        and _is_boundary(atoms[idx:], right, 1)):
+                    candidates.append({''.join(atoms[start:idx])})
+                start = None
+        if not candidates:
+            return None
+        result.update(min(candidates, key=_requirement_score))
+    return result
+
+
+def url_regex_tokens(regex):
+    """
+    Get the tokens required for a URL to match the given regex using re.match
+    @returns a sorted tuple of tokens, one of which is guaranteed to be
+             present in any matching URL; or None if this cannot be determined
+    """
+    try:
+        parsed = sre_parse.parse(regex)
+    except Exception:
+        return None
+    req = _requirement(_flatten(parsed), True, False)
+    return tuple(sorted(req)) if req else None
+
+
+def url_tokens(url):
+    """@returns the set of tokens in the URL, or None if the URL cannot be tokenized"""
+    if not isinstance(url, str) or not url.isascii():
+        return None
+    return set(_SPLIT_RE.split(url.lower()))
+
+
+def valid_url_tokens(regexes):
+    """Combine url_regex_tokens for a _VALID_URL (which may be a sequence of regexes)"""
+    if regexes is False:
+        return ()
+    elif not regexes:
+        return None
+    tokens = set()
+    for regex in variadic(regexes):
+        regex_tokens = url_regex_tokens(regex)
+        if regex_tokens is None:
+            return None
+        tokens.update(regex_tokens)
+    return tuple(sorted(tokens))
+
+
+class URLDispatchIndex:
+    """
+    Index of extractors by the tokens their _VALID_URL requires
+
+    candidates() yields the same (key, ie) pairs as the given mapping, in the same order,
+    except those that cannot be suitable for the URL
+    """
+
+    def __init__(self, ies):
+        self._entries = list(ies.items())
+        self._always = []
+        self._buckets = collections.defaultdict(list)
+        for idx, (_, ie) in enumerate(self._entries):
+            tokens = getattr(ie, '_URL_TOKENS', None)
+            if tokens is None:
+                self._always.append(idx)
+            for token in tokens or ():
+                self._buckets[token].append(idx)
+
+    def candidates(self, url):
+        tokens = url_tokens(url)
+        if tokens is None:
+            return iter(self._entries)
+        idxs = set(self._always)
+        for token in tokens & self._buckets.keys():
+            idxs.update(self._buckets[token])
+        return map(self._entries.__getitem__, sorted(idxs))
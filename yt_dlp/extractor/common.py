@@ -532,6 +532,10 @@ class InfoExtractor:
 
     The _WORKING attribute should be set to False for broken IEs
     in order to warn the users and skip the tests.
+
+    The _CONCURRENT_EXTRACTIONS attribute limits how many URLs of the IE are
+    extracted at once when the entries of a playlist are extracted concurrently
+    (see concurrent_extractions in YoutubeDL). None means no further limit.
     """
 
     _ready = False
@@ -543,6 +547,7 @@ class InfoExtractor:
     _WORKING = True
     _ENABLED = True
     _NETRC_MACHINE = None
+    _CONCURRENT_EXTRACTIONS = None
     IE_DESC = None
     SEARCH_KEY = None
     _VALID_URL = None
@@ -586,6 +591,15 @@ def suitable(cls, url):
         # so that lazy_extractors works correctly
         return cls._match_valid_url(url) is not None
 
+    @classproperty(cache=True)
+    def _URL_TOKENS(cls):
+        """Tokens, one of which must be present in any suitable URL (None = unknown). Used for URL dispatch"""
+        if (cls.suitable.__func__ is not InfoExtractor.suitable.__func__
+                or cls._match_valid_url.__func__ is not InfoExtractor._match_valid_url.__func__):
+            return None
+        from ._urlindex import valid_url_tokens
+        return valid_url_tokens(cls._VALID_URL)
+
     @classmethod
     def _match_id(cls, url):
         return cls._match_valid_url(url).group('id')
@@ -3809,6 +3823,15 @@ def _extract_embed_urls(cls, url, webpage):
                 if cls._VALID_URL is False or cls.suitable(embed_url):
                     yield embed_url
 
+    @classproperty(cache=True)
+    def _EMBED_ANCHORS(cls):
+        """Substrings, one of which must be in a webpage for extract_from_webpage to find anything (None = unknown)"""
+        if any(getattr(getattr(cls, name), '__func__', None) is not getattr(InfoExtractor, name).__func__
+               for name in ('extract_from_webpage', '_extract_from_webpage', '_extract_embed_urls')):
+            return None
+        from ._embedindex import embed_regex_anchors
+        return embed_regex_anchors(cls._EMBED_REGEX)
+
     class StopExtraction(Exception):
         pass
 
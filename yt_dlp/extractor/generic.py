@@ -5,6 +5,7 @@
 import xml.etree.ElementTree
 
 from .common import InfoExtractor  # isort: split
+from ._embedindex import EmbedScanner
 from .commonprotocols import RtmpIE
 from .youtube import YoutubeIE
 from ..compat import compat_etree_fromstring
@@ -2545,9 +2546,12 @@ def _extract_embeds(self, url, webpage, *, urlh=None, info_dict={}):
         # webpage = urllib.parse.unquote(webpage)
 
         embeds = []
+        scanner = EmbedScanner(webpage)
         for ie in self._downloader._ies.values():
             if ie.ie_key() in smuggled_data.get('block_ies', []):
                 continue
+            elif not scanner.may_match(ie._EMBED_ANCHORS):
+                continue  # None of the _EMBED_REGEX can match
             gen = ie.extract_from_webpage(self._downloader, url, webpage)
             current_embeds = []
             try:
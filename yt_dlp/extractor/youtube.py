@@ -64,6 +64,7 @@
     urljoin,
     variadic,
 )
+from ..version import __version__
 
 STREAMING_DATA_CLIENT_NAME = '__yt_dlp_client'
 # any clients starting with _ cannot be explicitly requested by the user
@@ -1168,6 +1169,8 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
         r'/(?P<id>[a-zA-Z0-9_-]{8,})/player(?:_ias\.vflset(?:/[a-zA-Z]{2,3}_[a-zA-Z]{2,3})?|-plasma-ias-(?:phone|tablet)-[a-z]{2}_[A-Z]{2}\.vflset)/base\.js$',
         r'\b(?P<id>vfl[a-zA-Z0-9_-]+)\b.*?\.js$',
     )
+    # Maximum number of decrypted n values cached per player
+    _NSIG_RESULTS_CACHE_SIZE = 1000
     _formats = {
         '5': {'ext': 'flv', 'width': 400, 'height': 240, 'acodec': 'mp3', 'abr': 64, 'vcodec': 'h263'},
         '6': {'ext': 'flv', 'width': 450, 'height': 270, 'acodec': 'mp3', 'abr': 64, 'vcodec': 'h263'},
@@ -2772,6 +2775,7 @@ def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._code_cache = {}
         self._player_cache = {}
+        self._nsig_results = {}
 
     def _prepare_live_from_start_formats(self, formats, video_id, live_start_time, url, webpage_url, smuggled_data, is_live):
         lock = threading.Lock()
@@ -3084,10 +3088,29 @@ def _decrypt_signature(self, s, video_id, player_url):
 
     def _decrypt_nsig(self, s, video_id, player_url):
         """Turn the encrypted n field into a working signature"""
+        return self._decrypt_nsig_batch([s], video_id, player_url)[s]
+
+    def _decrypt_nsig_batch(self, nsigs, video_id, player_url):
+        """
+        Decrypt all the n values, running the nsig function only for those not found in the cache
+        @returns    dict of n => decrypted n
+        """
         if player_url is None:
             raise ExtractorError('Cannot decrypt nsig without player_url')
         player_url = urljoin('https://www.youtube.com', player_url)
+        player_id = self._extract_player_info(player_url)
+
+        results = self._load_nsig_results(player_id)
+        missing = [s for s in dict.fromkeys(nsigs) if s not in results]
+        if missing:
+            results.update(self._run_nsig_function(missing, video_id, player_url))
+            self._store_nsig_results(player_id)
+
+        for s in missing:
+            self.write_debug(f'Decrypted nsig {s} => {results[s]}')
+        return {s: results[s] for s in nsigs}
 
+    def _run_nsig_function(self, nsigs, video_id, player_url):
         try:
             jsi, player_id, func_code = self._extract_n_function_code(video_id, player_url)
         except ExtractorError as e:
@@ -3097,7 +3120,8 @@ def _decrypt_nsig(self, s, video_id, player_url):
 
         try:
             extract_nsig = self._cached(self._extract_n_function_from_code, 'nsig func', player_url)
-            ret = extract_nsig(jsi, func_code)(s)
+            func = extract_nsig(jsi, func_code)
+            return {s: func(s) for s in nsigs}
         except JSInterpreter.Exception as e:
             try:
                 jsi = PhantomJSwrapper(self, timeout=5000)
@@ -3105,16 +3129,29 @@ def _decrypt_nsig(self, s, video_id, player_url):
                 raise e
             self.report_warning(
                 f'Native nsig extraction failed: Trying with PhantomJS\n'
-                f'         n = {s} ; player = {player_url}', video_id)
+                f'         n = {", ".join(nsigs)} ; player = {player_url}', video_id)
             self.write_debug(e, only_once=True)
 
             args, func_body = func_code
             ret = jsi.execute(
-                f'console.log(function({", ".join(args)}) {{ {func_body} }}({s!r}));',
+                f'console.log(JSON.stringify({json.dumps(nsigs)}.map(function(n) {{ '
+                f'return function({", ".join(args)}) {{ {func_body} }}(n); }})));',
                 video_id=video_id, note='Executing signature code').strip()
-
-        self.write_debug(f'Decrypted nsig {s} => {ret}')
-        return ret
+            return dict(zip(nsigs, self._parse_json(ret, video_id)))
+
+    def _load_nsig_results(self, player_id):
+        if player_id not in self._nsig_results:
+            # Results from other versions may have been decrypted by a since fixed jsinterp
+            self._nsig_results[player_id] = self.cache.load(
+                'youtube-nsig-results', player_id, min_ver=__version__) or {}
+        return self._nsig_results[player_id]
+
+    def _store_nsig_results(self, player_id):
+        # Only the most recently decrypted values of each player are kept
+        results = self._nsig_results[player_id]
+        for s in list(itertools.islice(results, max(len(results) - self._NSIG_RESULTS_CACHE_SIZE, 0))):
+            del results[s]
+        self.cache.store('youtube-nsig-results', player_id, results)
 
     def _extract_n_function_name(self, jscode):
         funcname, idx = self._search_regex(
@@ -3759,6 +3796,20 @@ def build_fragments(f):
                 })
             } for range_start in range(0, f['filesize'], CHUNK_SIZE))
 
+        def get_nsig(fmt):
+            fmt_url = fmt.get('url') or traverse_obj(urllib.parse.parse_qs(fmt.get('signatureCipher')), ('url', 0))
+            return fmt_url and traverse_obj(parse_qs(fmt_url), ('n', 0))
+
+        # Decrypt all the n values together, so that the cache is only written once
+        nsigs = [nsig for nsig in map(get_nsig, streaming_formats) if nsig]
+        if player_url and nsigs:
+            try:
+                for nsig, ret in self._decrypt_nsig_batch(nsigs, video_id, player_url).items():
+                    self._player_cache[('nsig', nsig)] = ret
+            except ExtractorError as e:
+                # The failure is reported for each format below
+                self.write_debug(e, only_once=True)
+
         for fmt in streaming_formats:
             if fmt.get('targetDurationSec'):
                 continue
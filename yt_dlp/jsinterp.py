@@ -131,6 +131,24 @@ def _js_ternary(cndn, if_true=True, if_false=False):
 _COMP_OPERATORS = {'===', '!==', '==', '!=', '<=', '>=', '<', '>'}
 
 _NAME_RE = r'[a-zA-Z_$][\w$]*'
+_EXPRESSION_RE = re.compile(fr'''(?x)
+    (?P<assign>
+        (?P<out>{_NAME_RE})(?:\[(?P<index>[^\]]+?)\])?\s*
+        (?P<op>{"|".join(map(re.escape, set(_OPERATORS) - _COMP_OPERATORS))})?
+        =(?!=)(?P<expr>.*)$
+    )|(?P<return>
+        (?!if|return|true|false|null|undefined|NaN)(?P<name>{_NAME_RE})$
+    )|(?P<indexing>
+        (?P<in>{_NAME_RE})\[(?P<idx>.+)\]$
+    )|(?P<attribute>
+        (?P<var>{_NAME_RE})(?:(?P<nullish>\?)?\.(?P<member>[^(]+)|\[(?P<member2>[^\]]+)\])\s*
+    )|(?P<function>
+        (?P<fname>{_NAME_RE})\((?P<args>.*)\)$
+    )''')
+_BUILTIN_TYPES = {
+    'String': str,
+    'Math': float,
+}
 _MATCHING_PARENS = dict(zip(*zip('()', '{}', '[]')))
 _QUOTES = '\'"/'
 
@@ -215,6 +233,8 @@ class JSInterpreter:
     def __init__(self, code, objects=None):
         self.code, self._functions = code, {}
         self._objects = {} if objects is None else objects
+        # Compiled statements, by their source
+        self._compiled = {}
 
     class Exception(ExtractorError):
         def __init__(self, msg, expr=None, *args, **kwargs):
@@ -223,8 +243,7 @@ def __init__(self, msg, expr=None, *args, **kwargs):
             super().__init__(msg, *args, **kwargs)
 
     def _named_object(self, namespace, obj):
-        self.__named_object_counter += 1
-        name = f'__yt_dlp_jsinterp_obj{self.__named_object_counter}'
+        name = self._placeholder()
         if callable(obj) and not isinstance(obj, function_with_repr):
             obj = function_with_repr(obj, f'F<{self.__named_object_counter}>')
         namespace[name] = obj
@@ -318,36 +337,63 @@ def _index(self, obj, idx, allow_undefined=False):
                 return JS_Undefined
             raise self.Exception(f'Cannot get index {idx}', repr(obj), cause=e)
 
-    def _dump(self, obj, namespace):
-        try:
-            return json.dumps(obj)
-        except TypeError:
-            return self._named_object(namespace, obj)
+    def _placeholder(self):
+        """A new name that a compiled statement binds its intermediate values to"""
+        self.__named_object_counter += 1
+        return f'__yt_dlp_jsinterp_obj{self.__named_object_counter}'
 
     @Debugger.wrap_interpreter
     def interpret_statement(self, stmt, local_vars, allow_recursion=100):
         if allow_recursion < 0:
             raise self.Exception('Recursion limit reached')
-        allow_recursion -= 1
-
-        should_return = False
+        stmt = stmt or ''
+        compiled = self._compiled.get(stmt)
+        if compiled is None:
+            compiled = self._compiled[stmt] = self._compile_statement(stmt)
+        return compiled(local_vars, allow_recursion - 1)
+
+    def _compile_statement(self, stmt):
+        """
+        Parse stmt into a function of (local_vars, allow_recursion) that returns (value, should_return)
+
+        The nested statements are compiled when they are first executed, by interpret_statement.
+        Intermediate values are bound to placeholder names in local_vars, so that the code
+        to be evaluated next does not depend on the values and needs to be compiled only once
+        """
         sub_statements = list(self._separate(stmt, ';')) or ['']
-        expr = stmt = sub_statements.pop().strip()
-
-        for sub_stmt in sub_statements:
-            ret, should_return = self.interpret_statement(sub_stmt, local_vars, allow_recursion)
-            if should_return:
-                return ret, should_return
-
+        stmt = sub_statements.pop().strip()
+        compiled = self._compile_simple_statement(stmt)
+        if not sub_statements:
+            return compiled
+
+        def run(local_vars, allow_recursion):
+            for sub_stmt in sub_statements:
+                ret, should_return = self.interpret_statement(sub_stmt, local_vars, allow_recursion)
+                if should_return:
+                    return ret, should_return
+            return compiled(local_vars, allow_recursion)
+        return run
+
+    def _compile_simple_statement(self, stmt):
+        expr, should_return = stmt, False
         m = re.match(r'(?P<var>(?:var|const|let)\s)|return(?:\s+|(?=["\'])|$)|(?P<throw>throw\s+)', stmt)
         if m:
             expr = stmt[len(m.group(0)):].strip()
             if m.group('throw'):
-                raise JS_Throw(self.interpret_expression(expr, local_vars, allow_recursion))
+                def throw(local_vars, allow_recursion):
+                    raise JS_Throw(self.interpret_expression(expr, local_vars, allow_recursion))
+                return throw
             should_return = not m.group('var')
         if not expr:
-            return None, should_return
+            return lambda local_vars, allow_recursion: (None, should_return)
+        return self._compile_expression(expr, stmt, should_return)
+
+    def _compile_continuation(self, outer, stmt, should_return):
+        """Compile `<value> outer`, with the value to be bound to the returned placeholder"""
+        name = self._placeholder()
+        return name, self._compile_expression(name + outer, stmt, should_return)
 
+    def _compile_expression(self, expr, stmt, should_return):
         if expr[0] in _QUOTES:
             inner, outer = self._separate(expr, expr[0], 1)
             if expr[0] == '/':
@@ -359,58 +405,65 @@ def interpret_statement(self, stmt, local_vars, allow_recursion=100):
             else:
                 inner = json.loads(js_to_json(f'{inner}{expr[0]}', strict=True))
             if not outer:
-                return inner, should_return
-            expr = self._named_object(local_vars, inner) + outer
+                return lambda local_vars, allow_recursion: (inner, should_return)
+            name, continuation = self._compile_continuation(outer, stmt, should_return)
+
+            def string_literal(local_vars, allow_recursion):
+                local_vars[name] = inner
+                return continuation(local_vars, allow_recursion)
+            return string_literal
 
         if expr.startswith('new '):
             obj = expr[4:]
-            if obj.startswith('Date('):
-                left, right = self._separate_at_paren(obj[4:])
+            if not obj.startswith('Date('):
+                raise self.Exception(f'Unsupported object {obj}', expr)
+            left, right = self._separate_at_paren(obj[4:])
+            name, continuation = self._compile_continuation(right, stmt, should_return)
+
+            def new_date(local_vars, allow_recursion):
                 date = unified_timestamp(
                     self.interpret_expression(left, local_vars, allow_recursion), False)
                 if date is None:
                     raise self.Exception(f'Failed to parse date {left!r}', expr)
-                expr = self._dump(int(date * 1000), local_vars) + right
-            else:
-                raise self.Exception(f'Unsupported object {obj}', expr)
+                local_vars[name] = int(date * 1000)
+                return continuation(local_vars, allow_recursion)
+            return new_date
 
         if expr.startswith('void '):
-            left = self.interpret_expression(expr[5:], local_vars, allow_recursion)
-            return None, should_return
+            def void(local_vars, allow_recursion):
+                self.interpret_expression(expr[5:], local_vars, allow_recursion)
+                return None, should_return
+            return void
 
         if expr.startswith('{'):
             inner, outer = self._separate_at_paren(expr)
             # try for object expression (Map)
             sub_expressions = [list(self._separate(sub_expr.strip(), ':', 1)) for sub_expr in self._separate(inner)]
             if all(len(sub_expr) == 2 for sub_expr in sub_expressions):
-                def dict_item(key, val):
-                    val = self.interpret_expression(val, local_vars, allow_recursion)
-                    if re.match(_NAME_RE, key):
-                        return key, val
-                    return self.interpret_expression(key, local_vars, allow_recursion), val
+                items = [(key, bool(re.match(_NAME_RE, key)), val) for key, val in sub_expressions]
 
-                return dict(dict_item(k, v) for k, v in sub_expressions), should_return
-
-            inner, should_abort = self.interpret_statement(inner, local_vars, allow_recursion)
-            if not outer or should_abort:
-                return inner, should_abort or should_return
-            else:
-                expr = self._dump(inner, local_vars) + outer
+                def object_literal(local_vars, allow_recursion):
+                    obj = {}
+                    for key, is_name, val in items:
+                        val = self.interpret_expression(val, local_vars, allow_recursion)
+                        obj[key if is_name else self.interpret_expression(key, local_vars, allow_recursion)] = val
+                    return obj, should_return
+                return object_literal
+            return self._compile_group(inner, outer, stmt, should_return)
 
         if expr.startswith('('):
-            inner, outer = self._separate_at_paren(expr)
-            inner, should_abort = self.interpret_statement(inner, local_vars, allow_recursion)
-            if not outer or should_abort:
-                return inner, should_abort or should_return
-            else:
-                expr = self._dump(inner, local_vars) + outer
+            return self._compile_group(*self._separate_at_paren(expr), stmt, should_return)
 
         if expr.startswith('['):
             inner, outer = self._separate_at_paren(expr)
-            name = self._named_object(local_vars, [
-                self.interpret_expression(item, local_vars, allow_recursion)
-                for item in self._separate(inner)])
-            expr = name + outer
+            items = list(self._separate(inner))
+            name, continuation = self._compile_continuation(outer, stmt, should_return)
+
+            def array_literal(local_vars, allow_recursion):
+                local_vars[name] = [
+                    self.interpret_expression(item, local_vars, allow_recursion) for item in items]
+                return continuation(local_vars, allow_recursion)
+            return array_literal
 
         m = re.match(r'''(?x)
                 (?P<try>try)\s*\{|
@@ -418,7 +471,164 @@ def dict_item(key, val):
                 (?P<switch>switch)\s*\(|
                 (?P<for>for)\s*\(
                 ''', expr)
-        md = m.groupdict() if m else {}
+        if m:
+            return self._compile_block(m, expr, should_return)
+
+        # Comma separated statements
+        sub_expressions = list(self._separate(expr))
+        if len(sub_expressions) > 1:
+            def comma(local_vars, allow_recursion):
+                for sub_expr in sub_expressions:
+                    ret, should_abort = self.interpret_statement(sub_expr, local_vars, allow_recursion)
+                    if should_abort:
+                        return ret, True
+                return ret, False
+            return comma
+
+        increments = [
+            (m.span(), m.group('var1') or m.group('var2'), m.group('pre_sign') or m.group('post_sign'),
+             bool(m.group('pre_sign')), self._placeholder())
+            for m in re.finditer(rf'''(?x)
+                (?P<pre_sign>\+\+|--)(?P<var1>{_NAME_RE})|
+                (?P<var2>{_NAME_RE})(?P<post_sign>\+\+|--)''', expr)]
+        if increments:
+            end, parts = 0, []
+            for (start, next_end), _, _, _, name in increments:
+                parts.extend((expr[end:start], name))
+                end = next_end
+            continuation = self._compile_expression(''.join(parts) + expr[end:], stmt, should_return)
+
+            def increment(local_vars, allow_recursion):
+                for _, var, sign, is_pre, name in increments:
+                    ret = local_vars[var]
+                    local_vars[var] += 1 if sign[0] == '+' else -1
+                    local_vars[name] = local_vars[var] if is_pre else ret
+                return continuation(local_vars, allow_recursion)
+            return increment
+
+        m = _EXPRESSION_RE.match(expr)
+        if m and m.group('assign'):
+            out, index, op, right_expr = m.group('out', 'index', 'op', 'expr')
+
+            def assign(local_vars, allow_recursion):
+                left_val = local_vars.get(out)
+                if not index:
+                    local_vars[out] = self._operator(op, left_val, right_expr, expr, local_vars, allow_recursion)
+                    return local_vars[out], should_return
+                elif left_val in (None, JS_Undefined):
+                    raise self.Exception(f'Cannot index undefined variable {out}', expr)
+
+                idx = self.interpret_expression(index, local_vars, allow_recursion)
+                if not isinstance(idx, (int, float)):
+                    raise self.Exception(f'List index {idx} must be integer', expr)
+                idx = int(idx)
+                left_val[idx] = self._operator(
+                    op, self._index(left_val, idx), right_expr, expr, local_vars, allow_recursion)
+                return left_val[idx], should_return
+            return assign
+
+        elif expr.isdigit():
+            value = int(expr)
+            return lambda local_vars, allow_recursion: (value, should_return)
+
+        elif expr in ('break', 'continue'):
+            exception = JS_Break if expr == 'break' else JS_Continue
+
+            def break_or_continue(local_vars, allow_recursion):
+                raise exception()
+            return break_or_continue
+        elif expr == 'undefined':
+            return lambda local_vars, allow_recursion: (JS_Undefined, should_return)
+        elif expr == 'NaN':
+            return lambda local_vars, allow_recursion: (float('NaN'), should_return)
+
+        elif m and m.group('return'):
+            name = m.group('name')
+            return lambda local_vars, allow_recursion: (local_vars.get(name, JS_Undefined), should_return)
+
+        with contextlib.suppress(ValueError):
+            json_expr = js_to_json(expr, strict=True)
+            value = json.loads(json_expr)
+            if isinstance(value, (list, dict)):
+                # Each evaluation must create a new object
+                return lambda local_vars, allow_recursion: (json.loads(json_expr), should_return)
+            return lambda local_vars, allow_recursion: (value, should_return)
+
+        if m and m.group('indexing'):
+            var, idx_expr = m.group('in', 'idx')
+
+            def indexing(local_vars, allow_recursion):
+                val = local_vars[var]
+                idx = self.interpret_expression(idx_expr, local_vars, allow_recursion)
+                return self._index(val, idx), should_return
+            return indexing
+
+        for op in _OPERATORS:
+            separated = list(self._separate(expr, op))
+            right_expr = separated.pop()
+            while True:
+                if op in '?<>*-' and len(separated) > 1 and not separated[-1].strip():
+                    separated.pop()
+                elif not (separated and op == '?' and right_expr.startswith('.')):
+                    break
+                right_expr = f'{op}{right_expr}'
+                if op != '-':
+                    right_expr = f'{separated.pop()}{op}{right_expr}'
+            if not separated:
+                continue
+            return self._compile_operator(op, op.join(separated), right_expr, expr, should_return)
+
+        if m and m.group('attribute'):
+            return self._compile_attribute(m, expr, stmt, should_return)
+
+        elif m and m.group('function'):
+            fname = m.group('fname')
+            arg_exprs = list(self._separate(m.group('args')))
+
+            def call(local_vars, allow_recursion):
+                argvals = [self.interpret_expression(v, local_vars, allow_recursion) for v in arg_exprs]
+                if fname in local_vars:
+                    return local_vars[fname](argvals, allow_recursion=allow_recursion), should_return
+                elif fname not in self._functions:
+                    self._functions[fname] = self.extract_function(fname)
+                return self._functions[fname](argvals, allow_recursion=allow_recursion), should_return
+            return call
+
+        raise self.Exception(
+            f'Unsupported JS expression {truncate_string(expr, 20, 20) if expr != stmt else ""}', stmt)
+
+    def _compile_group(self, inner, outer, stmt, should_return):
+        """Compile a parenthesized expression or a block, followed by outer"""
+        continuation = None
+        if outer:
+            name, continuation = self._compile_continuation(outer, stmt, should_return)
+
+        def group(local_vars, allow_recursion):
+            inner_val, should_abort = self.interpret_statement(inner, local_vars, allow_recursion)
+            if not continuation or should_abort:
+                return inner_val, should_abort or should_return
+            local_vars[name] = inner_val
+            return continuation(local_vars, allow_recursion)
+        return group
+
+    def _compile_operator(self, op, left_expr, right_expr, expr, should_return):
+        if op == '?':
+            branches = list(self._separate(right_expr, ':', 1))
+
+            def ternary(local_vars, allow_recursion):
+                left_val = self.interpret_expression(left_expr, local_vars, allow_recursion)
+                return self.interpret_expression(
+                    _js_ternary(left_val, *branches), local_vars, allow_recursion), should_return
+            return ternary
+
+        def operator(local_vars, allow_recursion):
+            left_val = self.interpret_expression(left_expr, local_vars, allow_recursion)
+            return self._operator(op, left_val, right_expr, expr, local_vars, allow_recursion), should_return
+        return operator
+
+    def _compile_block(self, m, expr, should_return):
+        """Compile a try, if, switch or for statement, followed by the rest of expr"""
+        md = m.groupdict()
         if md.get('if'):
             cndn, expr = self._separate_at_paren(expr[m.end() - 1:])
             if_expr, expr = self._separate_at_paren(expr.lstrip())
@@ -427,47 +637,54 @@ def dict_item(key, val):
             m = re.match(r'else\s*{', expr)
             if m:
                 else_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
-            cndn = _js_ternary(self.interpret_expression(cndn, local_vars, allow_recursion))
-            ret, should_abort = self.interpret_statement(
-                if_expr if cndn else else_expr, local_vars, allow_recursion)
-            if should_abort:
-                return ret, True
 
-        if md.get('try'):
-            try_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
-            err = None
-            try:
-                ret, should_abort = self.interpret_statement(try_expr, local_vars, allow_recursion)
-                if should_abort:
-                    return ret, True
-            except Exception as e:
-                # XXX: This works for now, but makes debugging future issues very hard
-                err = e
+            def run_block(local_vars, allow_recursion):
+                cndn_val = _js_ternary(self.interpret_expression(cndn, local_vars, allow_recursion))
+                ret, should_abort = self.interpret_statement(
+                    if_expr if cndn_val else else_expr, local_vars, allow_recursion)
+                return ret, should_abort
 
-            pending = (None, False)
+        elif md.get('try'):
+            try_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
+            catch_expr = err_name = finally_expr = None
             m = re.match(fr'catch\s*(?P<err>\(\s*{_NAME_RE}\s*\))?\{{', expr)
             if m:
-                sub_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
-                if err:
+                catch_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
+                err_name = m.group('err')
+            m = re.match(r'finally\s*\{', expr)
+            if m:
+                finally_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
+
+            def run_block(local_vars, allow_recursion):
+                err = None
+                try:
+                    ret, should_abort = self.interpret_statement(try_expr, local_vars, allow_recursion)
+                    if should_abort:
+                        return ret, True
+                except Exception as e:
+                    # XXX: This works for now, but makes debugging future issues very hard
+                    err = e
+
+                pending = (None, False)
+                if catch_expr is not None and err:
                     catch_vars = {}
-                    if m.group('err'):
-                        catch_vars[m.group('err')] = err.error if isinstance(err, JS_Throw) else err
+                    if err_name:
+                        catch_vars[err_name] = err.error if isinstance(err, JS_Throw) else err
                     catch_vars = local_vars.new_child(catch_vars)
-                    err, pending = None, self.interpret_statement(sub_expr, catch_vars, allow_recursion)
+                    err, pending = None, self.interpret_statement(catch_expr, catch_vars, allow_recursion)
 
-            m = re.match(r'finally\s*\{', expr)
-            if m:
-                sub_expr, expr = self._separate_at_paren(expr[m.end() - 1:])
-                ret, should_abort = self.interpret_statement(sub_expr, local_vars, allow_recursion)
+                if finally_expr is not None:
+                    ret, should_abort = self.interpret_statement(finally_expr, local_vars, allow_recursion)
+                    if should_abort:
+                        return ret, True
+
+                ret, should_abort = pending
                 if should_abort:
                     return ret, True
 
-            ret, should_abort = pending
-            if should_abort:
-                return ret, True
-
-            if err:
-                raise err
+                if err:
+                    raise err
+                return None, False
 
         elif md.get('for'):
             constructor, remaining = self._separate_at_paren(expr[m.end() - 1:])
@@ -482,291 +699,194 @@ def dict_item(key, val):
                 else:
                     body, expr = remaining, ''
             start, cndn, increment = self._separate(constructor, ';')
-            self.interpret_expression(start, local_vars, allow_recursion)
-            while True:
-                if not _js_ternary(self.interpret_expression(cndn, local_vars, allow_recursion)):
-                    break
-                try:
-                    ret, should_abort = self.interpret_statement(body, local_vars, allow_recursion)
-                    if should_abort:
-                        return ret, True
-                except JS_Break:
-                    break
-                except JS_Continue:
-                    pass
-                self.interpret_expression(increment, local_vars, allow_recursion)
 
-        elif md.get('switch'):
-            switch_val, remaining = self._separate_at_paren(expr[m.end() - 1:])
-            switch_val = self.interpret_expression(switch_val, local_vars, allow_recursion)
-            body, expr = self._separate_at_paren(remaining, '}')
-            items = body.replace('default:', 'case default:').split('case ')[1:]
-            for default in (False, True):
-                matched = False
-                for item in items:
-                    case, stmt = (i.strip() for i in self._separate(item, ':', 1))
-                    if default:
-                        matched = matched or case == 'default'
-                    elif not matched:
-                        matched = (case != 'default'
-                                   and switch_val == self.interpret_expression(case, local_vars, allow_recursion))
-                    if not matched:
-                        continue
+            def run_block(local_vars, allow_recursion):
+                self.interpret_expression(start, local_vars, allow_recursion)
+                while True:
+                    if not _js_ternary(self.interpret_expression(cndn, local_vars, allow_recursion)):
+                        break
                     try:
-                        ret, should_abort = self.interpret_statement(stmt, local_vars, allow_recursion)
+                        ret, should_abort = self.interpret_statement(body, local_vars, allow_recursion)
                         if should_abort:
-                            return ret
+                            return ret, True
                     except JS_Break:
                         break
-                if matched:
-                    break
-
-        if md:
-            ret, should_abort = self.interpret_statement(expr, local_vars, allow_recursion)
-            return ret, should_abort or should_return
-
-        # Comma separated statements
-        sub_expressions = list(self._separate(expr))
-        if len(sub_expressions) > 1:
-            for sub_expr in sub_expressions:
-                ret, should_abort = self.interpret_statement(sub_expr, local_vars, allow_recursion)
-                if should_abort:
-                    return ret, True
-            return ret, False
-
-        for m in re.finditer(rf'''(?x)
-                (?P<pre_sign>\+\+|--)(?P<var1>{_NAME_RE})|
-                (?P<var2>{_NAME_RE})(?P<post_sign>\+\+|--)''', expr):
-            var = m.group('var1') or m.group('var2')
-            start, end = m.span()
-            sign = m.group('pre_sign') or m.group('post_sign')
-            ret = local_vars[var]
-            local_vars[var] += 1 if sign[0] == '+' else -1
-            if m.group('pre_sign'):
-                ret = local_vars[var]
-            expr = expr[:start] + self._dump(ret, local_vars) + expr[end:]
-
-        if not expr:
-            return None, should_return
-
-        m = re.match(fr'''(?x)
-            (?P<assign>
-                (?P<out>{_NAME_RE})(?:\[(?P<index>[^\]]+?)\])?\s*
-                (?P<op>{"|".join(map(re.escape, set(_OPERATORS) - _COMP_OPERATORS))})?
-                =(?!=)(?P<expr>.*)$
-            )|(?P<return>
-                (?!if|return|true|false|null|undefined|NaN)(?P<name>{_NAME_RE})$
-            )|(?P<indexing>
-                (?P<in>{_NAME_RE})\[(?P<idx>.+)\]$
-            )|(?P<attribute>
-                (?P<var>{_NAME_RE})(?:(?P<nullish>\?)?\.(?P<member>[^(]+)|\[(?P<member2>[^\]]+)\])\s*
-            )|(?P<function>
-                (?P<fname>{_NAME_RE})\((?P<args>.*)\)$
-            )''', expr)
-        if m and m.group('assign'):
-            left_val = local_vars.get(m.group('out'))
-
-            if not m.group('index'):
-                local_vars[m.group('out')] = self._operator(
-                    m.group('op'), left_val, m.group('expr'), expr, local_vars, allow_recursion)
-                return local_vars[m.group('out')], should_return
-            elif left_val in (None, JS_Undefined):
-                raise self.Exception(f'Cannot index undefined variable {m.group("out")}', expr)
-
-            idx = self.interpret_expression(m.group('index'), local_vars, allow_recursion)
-            if not isinstance(idx, (int, float)):
-                raise self.Exception(f'List index {idx} must be integer', expr)
-            idx = int(idx)
-            left_val[idx] = self._operator(
-                m.group('op'), self._index(left_val, idx), m.group('expr'), expr, local_vars, allow_recursion)
-            return left_val[idx], should_return
-
-        elif expr.isdigit():
-            return int(expr), should_return
-
-        elif expr == 'break':
-            raise JS_Break()
-        elif expr == 'continue':
-            raise JS_Continue()
-        elif expr == 'undefined':
-            return JS_Undefined, should_return
-        elif expr == 'NaN':
-            return float('NaN'), should_return
-
-        elif m and m.group('return'):
-            return local_vars.get(m.group('name'), JS_Undefined), should_return
+                    except JS_Continue:
+                        pass
+                    self.interpret_expression(increment, local_vars, allow_recursion)
+                return None, False
 
-        with contextlib.suppress(ValueError):
-            return json.loads(js_to_json(expr, strict=True)), should_return
-
-        if m and m.group('indexing'):
-            val = local_vars[m.group('in')]
-            idx = self.interpret_expression(m.group('idx'), local_vars, allow_recursion)
-            return self._index(val, idx), should_return
-
-        for op in _OPERATORS:
-            separated = list(self._separate(expr, op))
-            right_expr = separated.pop()
-            while True:
-                if op in '?<>*-' and len(separated) > 1 and not separated[-1].strip():
-                    separated.pop()
-                elif not (separated and op == '?' and right_expr.startswith('.')):
-                    break
-                right_expr = f'{op}{right_expr}'
-                if op != '-':
-                    right_expr = f'{separated.pop()}{op}{right_expr}'
-            if not separated:
-                continue
-            left_val = self.interpret_expression(op.join(separated), local_vars, allow_recursion)
-            return self._operator(op, left_val, right_expr, expr, local_vars, allow_recursion), should_return
-
-        if m and m.group('attribute'):
-            variable, member, nullish = m.group('var', 'member', 'nullish')
-            if not member:
-                member = self.interpret_expression(m.group('member2'), local_vars, allow_recursion)
-            arg_str = expr[m.end():]
-            if arg_str.startswith('('):
-                arg_str, remaining = self._separate_at_paren(arg_str)
-            else:
-                arg_str, remaining = None, arg_str
-
-            def assertion(cndn, msg):
-                """ assert, but without risk of getting optimized out """
-                if not cndn:
-                    raise self.Exception(f'{member} {msg}', expr)
-
-            def eval_method():
-                if (variable, member) == ('console', 'debug'):
-                    if Debugger.ENABLED:
-                        Debugger.write(self.interpret_expression(f'[{arg_str}]', local_vars, allow_recursion))
-                    return
-
-                types = {
-                    'String': str,
-                    'Math': float,
-                }
-                obj = local_vars.get(variable, types.get(variable, NO_DEFAULT))
-                if obj is NO_DEFAULT:
-                    if variable not in self._objects:
+        elif md.get('switch'):
+            switch_val, remaining = self._separate_at_paren(expr[m.end() - 1:])
+            body, expr = self._separate_at_paren(remaining, '}')
+            items = [
+                tuple(i.strip() for i in self._separate(item, ':', 1))
+                for item in body.replace('default:', 'case default:').split('case ')[1:]]
+            for item in items:
+                if len(item) != 2:
+                    raise self.Exception('Invalid switch case', item[0])
+
+            def run_block(local_vars, allow_recursion):
+                value = self.interpret_expression(switch_val, local_vars, allow_recursion)
+                for default in (False, True):
+                    matched = False
+                    for case, case_stmt in items:
+                        if default:
+                            matched = matched or case == 'default'
+                        elif not matched:
+                            matched = (case != 'default'
+                                       and value == self.interpret_expression(case, local_vars, allow_recursion))
+                        if not matched:
+                            continue
                         try:
-                            self._objects[variable] = self.extract_object(variable)
-                        except self.Exception:
-                            if not nullish:
-                                raise
-                    obj = self._objects.get(variable, JS_Undefined)
-
-                if nullish and obj is JS_Undefined:
-                    return JS_Undefined
-
-                # Member access
-                if arg_str is None:
-                    return self._index(obj, member, nullish)
-
-                # Function call
-                argvals = [
-                    self.interpret_expression(v, local_vars, allow_recursion)
-                    for v in self._separate(arg_str)]
-
-                if obj == str:
-                    if member == 'fromCharCode':
-                        assertion(argvals, 'takes one or more arguments')
-                        return ''.join(map(chr, argvals))
-                    raise self.Exception(f'Unsupported String method {member}', expr)
-                elif obj == float:
-                    if member == 'pow':
-                        assertion(len(argvals) == 2, 'takes two arguments')
-                        return argvals[0] ** argvals[1]
-                    raise self.Exception(f'Unsupported Math method {member}', expr)
-
-                if member == 'split':
-                    assertion(argvals, 'takes one or more arguments')
-                    assertion(len(argvals) == 1, 'with limit argument is not implemented')
-                    return obj.split(argvals[0]) if argvals[0] else list(obj)
-                elif member == 'join':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(len(argvals) == 1, 'takes exactly one argument')
-                    return argvals[0].join(obj)
-                elif member == 'reverse':
-                    assertion(not argvals, 'does not take any arguments')
-                    obj.reverse()
-                    return obj
-                elif member == 'slice':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(len(argvals) == 1, 'takes exactly one argument')
-                    return obj[argvals[0]:]
-                elif member == 'splice':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(argvals, 'takes one or more arguments')
-                    index, howMany = map(int, (argvals + [len(obj)])[:2])
-                    if index < 0:
-                        index += len(obj)
-                    add_items = argvals[2:]
-                    res = []
-                    for i in range(index, min(index + howMany, len(obj))):
-                        res.append(obj.pop(index))
-                    for i, item in enumerate(add_items):
-                        obj.insert(index + i, item)
-                    return res
-                elif member == 'unshift':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(argvals, 'takes one or more arguments')
-                    for item in reversed(argvals):
-                        obj.insert(0, item)
-                    return obj
-                elif member == 'pop':
-                    assertion(isinstance(obj, list), 'must be applied on a list')
-                    assertion(not argvals, 'does not take any arguments')
-                    if not obj:
-                        return
-                    return obj.pop()
-                elif member == 'push':
-                    assertion(argvals, 'takes one or more arguments')
-                    obj.extend(argvals)
-                    return obj
-                elif member == 'forEach':
-                    assertion(argvals, 'takes one or more arguments')
-                    assertion(len(argvals) <= 2, 'takes at-most 2 arguments')
-                    f, this = (argvals + [''])[:2]
-                    return [f((item, idx, obj), {'this': this}, allow_recursion) for idx, item in enumerate(obj)]
-                elif member == 'indexOf':
-                    assertion(argvals, 'takes one or more arguments')
-                    assertion(len(argvals) <= 2, 'takes at-most 2 arguments')
-                    idx, start = (argvals + [0])[:2]
-                    try:
-                        return obj.index(idx, start)
-                    except ValueError:
-                        return -1
-                elif member == 'charCodeAt':
-                    assertion(isinstance(obj, str), 'must be applied on a string')
-                    assertion(len(argvals) == 1, 'takes exactly one argument')
-                    idx = argvals[0] if isinstance(argvals[0], int) else 0
-                    if idx >= len(obj):
-                        return None
-                    return ord(obj[idx])
-
-                idx = int(member) if isinstance(obj, list) else member
-                return obj[idx](argvals, allow_recursion=allow_recursion)
-
-            if remaining:
-                ret, should_abort = self.interpret_statement(
-                    self._named_object(local_vars, eval_method()) + remaining,
-                    local_vars, allow_recursion)
-                return ret, should_return or should_abort
-            else:
-                return eval_method(), should_return
+                            ret, should_abort = self.interpret_statement(case_stmt, local_vars, allow_recursion)
+                            if should_abort:
+                                return ret, True
+                        except JS_Break:
+                            break
+                    if matched:
+                        break
+                return None, False
 
-        elif m and m.group('function'):
-            fname = m.group('fname')
-            argvals = [self.interpret_expression(v, local_vars, allow_recursion)
-                       for v in self._separate(m.group('args'))]
-            if fname in local_vars:
-                return local_vars[fname](argvals, allow_recursion=allow_recursion), should_return
-            elif fname not in self._functions:
-                self._functions[fname] = self.extract_function(fname)
-            return self._functions[fname](argvals, allow_recursion=allow_recursion), should_return
+        def block(local_vars, allow_recursion):
+            ret, should_abort = run_block(local_vars, allow_recursion)
+            if should_abort:
+                return ret, True
+            ret, should_abort = self.interpret_statement(expr, local_vars, allow_recursion)
+            return ret, should_abort or should_return
+        return block
+
+    def _compile_attribute(self, m, expr, stmt, should_return):
+        variable, member, nullish, member_expr = m.group('var', 'member', 'nullish', 'member2')
+        arg_str = expr[m.end():]
+        if arg_str.startswith('('):
+            arg_str, remaining = self._separate_at_paren(arg_str)
+        else:
+            arg_str, remaining = None, arg_str
+        arg_exprs = None if arg_str is None else list(self._separate(arg_str))
+        name = remaining and self._placeholder()
+
+        def attribute(local_vars, allow_recursion):
+            ret = self._eval_method(
+                variable, member or self.interpret_expression(member_expr, local_vars, allow_recursion),
+                nullish, arg_str, arg_exprs, expr, local_vars, allow_recursion)
+            if not remaining:
+                return ret, should_return
+            local_vars[name] = ret
+            ret, should_abort = self.interpret_statement(name + remaining, local_vars, allow_recursion)
+            return ret, should_return or should_abort
+        return attribute
+
+    def _eval_method(self, variable, member, nullish, arg_str, arg_exprs, expr, local_vars, allow_recursion):
+        def assertion(cndn, msg):
+            """ assert, but without risk of getting optimized out """
+            if not cndn:
+                raise self.Exception(f'{member} {msg}', expr)
+
+        if (variable, member) == ('console', 'debug'):
+            if Debugger.ENABLED:
+                Debugger.write(self.interpret_expression(f'[{arg_str}]', local_vars, allow_recursion))
+            return
 
-        raise self.Exception(
-            f'Unsupported JS expression {truncate_string(expr, 20, 20) if expr != stmt else ""}', stmt)
+        obj = local_vars.get(variable, _BUILTIN_TYPES.get(variable, NO_DEFAULT))
+        if obj is NO_DEFAULT:
+            if variable not in self._objects:
+                try:
+                    self._objects[variable] = self.extract_object(variable)
+                except self.Exception:
+                    if not nullish:
+                        raise
+            obj = self._objects.get(variable, JS_Undefined)
+
+        if nullish and obj is JS_Undefined:
+            return JS_Undefined
+
+        # Member access
+        if arg_str is None:
+            return self._index(obj, member, nullish)
+
+        # Function call
+        argvals = [self.interpret_expression(v, local_vars, allow_recursion) for v in arg_exprs]
+
+        if obj == str:
+            if member == 'fromCharCode':
+                assertion(argvals, 'takes one or more arguments')
+                return ''.join(map(chr, argvals))
+            raise self.Exception(f'Unsupported String method {member}', expr)
+        elif obj == float:
+            if member == 'pow':
+                assertion(len(argvals) == 2, 'takes two arguments')
+                return argvals[0] ** argvals[1]
+            raise self.Exception(f'Unsupported Math method {member}', expr)
+
+        if member == 'split':
+            assertion(argvals, 'takes one or more arguments')
+            assertion(len(argvals) == 1, 'with limit argument is not implemented')
+            return obj.split(argvals[0]) if argvals[0] else list(obj)
+        elif member == 'join':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(len(argvals) == 1, 'takes exactly one argument')
+            return argvals[0].join(obj)
+        elif member == 'reverse':
+            assertion(not argvals, 'does not take any arguments')
+            obj.reverse()
+            return obj
+        elif member == 'slice':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(len(argvals) == 1, 'takes exactly one argument')
+            return obj[argvals[0]:]
+        elif member == 'splice':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(argvals, 'takes one or more arguments')
+            index, howMany = map(int, (argvals + [len(obj)])[:2])
+            if index < 0:
+                index += len(obj)
+            add_items = argvals[2:]
+            res = []
+            for i in range(index, min(index + howMany, len(obj))):
+                res.append(obj.pop(index))
+            for i, item in enumerate(add_items):
+                obj.insert(index + i, item)
+            return res
+        elif member == 'unshift':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(argvals, 'takes one or more arguments')
+            for item in reversed(argvals):
+                obj.insert(0, item)
+            return obj
+        elif member == 'pop':
+            assertion(isinstance(obj, list), 'must be applied on a list')
+            assertion(not argvals, 'does not take any arguments')
+            if not obj:
+                return
+            return obj.pop()
+        elif member == 'push':
+            assertion(argvals, 'takes one or more arguments')
+            obj.extend(argvals)
+            return obj
+        elif member == 'forEach':
+            assertion(argvals, 'takes one or more arguments')
+            assertion(len(argvals) <= 2, 'takes at-most 2 arguments')
+            f, this = (argvals + [''])[:2]
+            return [f((item, idx, obj), {'this': this}, allow_recursion) for idx, item in enumerate(obj)]
+        elif member == 'indexOf':
+            assertion(argvals, 'takes one or more arguments')
+            assertion(len(argvals) <= 2, 'takes at-most 2 arguments')
+            idx, start = (argvals + [0])[:2]
+            try:
+                return obj.index(idx, start)
+            except ValueError:
+                return -1
+        elif member == 'charCodeAt':
+            assertion(isinstance(obj, str), 'must be applied on a string')
+            assertion(len(argvals) == 1, 'takes exactly one argument')
+            idx = argvals[0] if isinstance(argvals[0], int) else 0
+            if idx >= len(obj):
+                return None
+            return ord(obj[idx])
+
+        idx = int(member) if isinstance(obj, list) else member
+        return obj[idx](argvals, allow_recursion=allow_recursion)
 
     def interpret_expression(self, expr, local_vars, allow_recursion):
         ret, should_return = self.interpret_statement(expr, local_vars, allow_recursion)
@@ -842,12 +962,13 @@ def call_function(self, funcname, *args):
     def build_function(self, argnames, code, *global_stack):
         global_stack = list(global_stack) or [{}]
         argnames = tuple(argnames)
+        code = code.replace('\n', ' ')
 
         def resf(args, kwargs={}, allow_recursion=100):
             global_stack[0].update(itertools.zip_longest(argnames, args, fillvalue=None))
             global_stack[0].update(kwargs)
             var_stack = LocalNameSpace(*global_stack)
-            ret, should_abort = self.interpret_statement(code.replace('\n', ' '), var_stack, allow_recursion - 1)
+            ret, should_abort = self.interpret_statement(code, var_stack, allow_recursion - 1)
             if should_abort:
                 return ret
         return resf
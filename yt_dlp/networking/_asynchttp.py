@@ -0,0 +1,340 @@
+import asyncio
+import collections
+import contextlib
+import email.message
+import io
+import re
+import socket
+import ssl
+import urllib.parse
+import urllib.request
+
+from ._helper import Resolver, make_ssl_context
+from .common import Response
+from .exceptions import (
+    CertificateVerifyError,
+    HTTPError,
+    IncompleteRead,
+    SSLError,
+    TransportError,
+    UnsupportedRequest,
+)
+from ..utils import extract_basic_auth, int_or_none, sanitize_url, traverse_obj
+from ..utils.networking import HTTPHeaderDict, clean_headers
+
+
+# The same checks as http.client, so that no header or request can be injected
+_is_legal_header_name = re.compile(r'[^:\s][^:\r\n]*').fullmatch
+_is_illegal_header_value = re.compile(r'\n(?![ \t])|\r(?![ \t\n])').search
+_contains_disallowed_url_char = re.compile('[\x00-\x20\x7f]').search
+
+
+class _Connection:
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+        self.keep_alive = True
+
+    def close(self):
+        with contextlib.suppress(Exception):
+            self.writer.close()
+
+
+class AsyncHTTPClient:
+    """
+    Minimal HTTP/1.1 client for downloading fragments from an asyncio event loop
+
+    Connections are kept alive and reused, and redirects and cookies are handled
+    like the request handlers do. Hosts are resolved with the resolver of the YoutubeDL
+    instance, if any. Proxies and content encodings are not supported, so the media is
+    always requested with "Accept-Encoding: identity"
+    """
+
+    _MAX_REDIRECTS = 10
+    _READ_SIZE = 64 * 1024
+    # Idle connections kept per host
+    _MAX_IDLE = 32
+
+    def __init__(self, ydl):
+        self._ydl = ydl
+        params = ydl.params
+        self._timeout = float(params.get('socket_timeout') or 20)
+        self._source_address = params.get('source_address')
+        self._resolver = ydl._resolver
+        self._headers = HTTPHeaderDict(params.get('http_headers'))
+        self._ssl_context = make_ssl_context(
+            verify=not params.get('nocheckcertificate'),
+            legacy_support=params.get('legacyserverconnect'),
+            use_certifi='no-certifi' not in params.get('compat_opts', []),
+            **traverse_obj(params, {
+                'client_certificate': 'client_certificate',
+                'client_certificate_key': 'client_certificate_key',
+                'client_certificate_password': 'client_certificate_password',
+            }))
+        self._idle = {}
+        self.stats = {'connections': 0, 'requests': 0}
+
+    async def _connect(self, key):
+        scheme, host, port = key
+        try:
+            reader, writer = await asyncio.wait_for(self._open_connection(host, port, scheme == 'https'), self._timeout)
+        except ssl.SSLCertVerificationError as e:
+            raise CertificateVerifyError(cause=e) from e
+        except ssl.SSLError as e:
+            raise SSLError(cause=e) from e
+        except (OSError, asyncio.TimeoutError) as e:
+            raise TransportError(cause=e) from e
+        self.stats['connections'] += 1
+        return _Connection(key, reader, writer)
+
+    async def _open_connection(self, host, port, tls):
+        kwargs = {
+            'ssl': self._ssl_context if tls else None,
+            'server_hostname': host if tls else None,
+            'local_addr': (self._source_address, 0) if self._source_address else None,
+            'limit': self._READ_SIZE,
+        }
+        if self._resolver is None:
+            return await asyncio.open_connection(host, port, **kwargs)
+
+        ip_addrs = await asyncio.get_running_loop().run_in_executor(None, self._resolver.resolve, host, port)
+        if self._source_address:
+            family = socket.AF_INET if ':' not in self._source_address else socket.AF_INET6
+            ip_addrs = [ip_addr for ip_addr in ip_addrs if ip_addr[0] == family]
+        if not ip_addrs:
+            raise OSError(f'No addresses of {host} available for connect')
+        try:
+            return await self._connect_to_addresses(ip_addrs, lambda ip_addr: asyncio.open_connection(
+                ip_addr[4][0], ip_addr[4][1], family=ip_addr[0], **kwargs))
+        except OSError as e:
+            if not isinstance(e, ssl.SSLError):
+                # The host may have moved to other addresses
+                self._resolver.invalidate(host, port)
+            raise
+
+    async def _connect_to_addresses(self, ip_addrs, connect):
+        """Connect to the addresses one after the other or, with happy eyeballs, racing them like Resolver.connect"""
+        delay = self._resolver.happy_eyeballs_delay
+        remaining = collections.deque(ip_addrs if delay is None else Resolver.interleave(ip_addrs))
+        attempts, err = set(), None
+        try:
+            while remaining or attempts:
+                if remaining and (delay is not None or not attempts):
+                    attempts.add(asyncio.ensure_future(connect(remaining.popleft())))
+                done, attempts = await asyncio.wait(
+                    attempts, timeout=delay if remaining else None, return_when=asyncio.FIRST_COMPLETED)
+                connections = [attempt.result() for attempt in done if attempt.exception() is None]
+                if connections:
+                    for _, writer in connections[1:]:
+                        writer.close()
+                    return connections[0]
+                for attempt in done:
+                    err = attempt.exception()
+                    if isinstance(err, ssl.SSLError):
+                        # The addresses are of the same host, so the others would fail too
+                        raise err
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+        raise err
+
+    def _get_connection(self, key):
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn.reader.at_eof():
+                conn.reused = True
+                return conn
+            conn.close()
+
+    def _release(self, conn):
+        idle = self._idle.setdefault(conn.key, [])
+        if len(idle) >= self._MAX_IDLE:
+            conn.close()
+        else:
+            idle.append(conn)
+
+    async def _read_line(self, conn):
+        return await asyncio.wait_for(conn.reader.readline(), self._timeout)
+
+    async def _request(self, url, headers):
+        """@returns (connection, status, reason, response headers)"""
+        parsed = urllib.parse.urlsplit(url)
+        key = (parsed.scheme, parsed.hostname, parsed.port or (443 if parsed.scheme == 'https' else 80))
+        host = parsed.hostname if ':' not in parsed.hostname else f'[{parsed.hostname}]'
+        if parsed.port:
+            host += f':{parsed.port}'
+        path = parsed.path or '/'
+        if parsed.query:
+            path += f'?{parsed.query}'
+
+        headers = HTTPHeaderDict(self._headers, headers)
+        cookie_header = self._ydl.cookiejar.get_cookie_header(url)
+        if cookie_header:
+            headers['Cookie'] = cookie_header
+        headers['Accept-Encoding'] = 'identity'
+        if _contains_disallowed_url_char(host) or _contains_disallowed_url_char(path):
+            raise UnsupportedRequest(f'URL can\'t contain control characters: {url!r}')
+        for name, value in headers.items():
+            if not _is_legal_header_name(name):
+                raise UnsupportedRequest(f'Invalid header name {name!r}')
+            if _is_illegal_header_value(value):
+                raise UnsupportedRequest(f'Invalid header value {value!r}')
+        request = ''.join((
+            f'GET {path} HTTP/1.1\r\nHost: {host}\r\n',
+            *(f'{name}: {value}\r\n' for name, value in headers.items() if name.lower() != 'host'),
+            '\r\n')).encode('latin-1', 'replace')
+
+        conn = self._get_connection(key) or await self._connect(key)
+        try:
+            while True:
+                try:
+                    conn.writer.write(request)
+                    await asyncio.wait_for(conn.writer.drain(), self._timeout)
+                    status_line = await self._read_line(conn)
+                    if not status_line:
+                        raise ConnectionResetError('Remote end closed connection without response')
+                    break
+                except (ConnectionResetError, BrokenPipeError):
+                    if not conn.reused:
+                        raise
+                    # The server closed the idle connection
+                    conn.close()
+                    conn = await self._connect(key)
+            self.stats['requests'] += 1
+
+            while True:
+                version, status, reason = (status_line.decode('latin-1').rstrip('\r\n').split(None, 2) + [''])[:3]
+                if not version.startswith('HTTP/') or not status.isdecimal():
+                    raise TransportError(f'Invalid status line: {status_line!r}')
+                response_headers = email.message.Message()
+                while True:
+                    line = await self._read_line(conn)
+                    if not line:
+                        raise ConnectionResetError('Remote end closed connection while sending headers')
+                    if line in (b'\r\n', b'\n'):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    response_headers[name.strip()] = value.strip()
+                # Informational responses are followed by the actual one
+                if not 100 <= int(status) < 200:
+                    break
+                status_line = await self._read_line(conn)
+        except (OSError, asyncio.TimeoutError) as e:
+            conn.close()
+            raise TransportError(cause=e) from e
+        except BaseException:
+            conn.close()
+            raise
+
+        conn.keep_alive = version != 'HTTP/1.0' and 'close' not in (response_headers.get('Connection') or '').lower()
+        self._ydl.cookiejar.extract_cookies(
+            urllib.request.addinfourl(io.BytesIO(), response_headers, url, int(status)),
+            urllib.request.Request(url))
+        return conn, int(status), reason, response_headers
+
+    async def _read_body(self, conn, headers, stream, report_progress):
+        received = 0
+        length = int_or_none(headers.get('Content-Length'))
+        chunked = 'chunked' in (headers.get('Transfer-Encoding') or '').lower()
+
+        async def read(size):
+            nonlocal received
+            while size:
+                data = await asyncio.wait_for(conn.reader.read(min(size, self._READ_SIZE)), self._timeout)
+                if not data:
+                    raise IncompleteRead(partial=received, expected=size if length is None else length - received)
+                stream.write(data)
+                received += len(data)
+                size -= len(data)
+                if report_progress:
+                    report_progress(received, length)
+
+        try:
+            if chunked:
+                while True:
+                    size = int((await self._read_line(conn)).split(b';')[0], 16)
+                    if not size:
+                        # Trailers
+                        while (await self._read_line(conn)) not in (b'\r\n', b'\n', b''):
+                            pass
+                        break
+                    await read(size)
+                    await self._read_line(conn)
+            elif length is not None:
+                await read(length)
+            else:
+                conn.keep_alive = False
+                while True:
+                    data = await asyncio.wait_for(conn.reader.read(self._READ_SIZE), self._timeout)
+                    if not data:
+                        break
+                    stream.write(data)
+                    received += len(data)
+                    if report_progress:
+                        report_progress(received, None)
+        except ValueError as e:
+            conn.close()
+            raise TransportError('Invalid chunked encoding', cause=e) from e
+        except (OSError, asyncio.TimeoutError) as e:
+            conn.close()
+            raise TransportError(cause=e) from e
+        except BaseException:
+            conn.close()
+            raise
+
+        if conn.keep_alive:
+            self._release(conn)
+        else:
+            conn.close()
+        return received
+
+    async def _discard_body(self, conn, headers):
+        # Short bodies are read so that the connection can be reused
+        length = int_or_none(headers.get('Content-Length'))
+        if length is not None and length <= self._READ_SIZE:
+            with contextlib.suppress(TransportError, IncompleteRead):
+                await self._read_body(conn, headers, io.BytesIO(), None)
+        else:
+            conn.close()
+
+    async def download(self, url, headers, stream, report_progress=None):
+        """
+        Download url into stream, following redirects
+
+        @param report_progress  Called as report_progress(downloaded_bytes, total_bytes)
+        @returns                The number of bytes downloaded
+        """
+        url, basic_auth_header = extract_basic_auth(sanitize_url(url))
+        headers = HTTPHeaderDict(headers)
+        if basic_auth_header:
+            headers['Authorization'] = basic_auth_header
+        clean_headers(headers)
+
+        for _ in range(self._MAX_REDIRECTS + 1):
+            conn, status, reason, response_headers = await self._request(url, headers)
+            location = response_headers.get('Location')
+            if status in (301, 302, 303, 307, 308) and location:
+                await self._discard_body(conn, response_headers)
+                new_url = urllib.parse.urljoin(url, location.encode('latin-1').decode('utf-8', 'replace'))
+                if urllib.parse.urlsplit(new_url).netloc != urllib.parse.urlsplit(url).netloc:
+                    headers.pop('Authorization', None)
+                    headers.pop('Cookie', None)
+                url = new_url
+                continue
+            if not 200 <= status < 300:
+                await self._discard_body(conn, response_headers)
+                raise HTTPError(Response(io.BytesIO(), url, response_headers, status, reason or None))
+            return await self._read_body(conn, response_headers, stream, report_progress)
+
+        raise HTTPError(Response(io.BytesIO(), url, response_headers, status, reason or None), redirect_loop=True)
+
+    async def close(self):
+        for idle in self._idle.values():
+            for conn in idle:
+                conn.close()
+                with contextlib.suppress(Exception):
+                    await conn.writer.wait_closed()
+        self._idle.clear()
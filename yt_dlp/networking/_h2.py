@@ -0,0 +1,636 @@
+from __future__ import annotations
+
+import collections
+import io
+import socket
+import ssl
+import threading
+import urllib.parse
+import urllib.request
+import urllib.response
+import zlib
+from email.message import Message
+
+from ._helper import (
+    add_accept_encoding_header,
+    create_connection,
+    create_socks_proxy_socket,
+    get_redirect_method,
+    make_socks_proxy_opts,
+    select_proxy,
+)
+from .common import (
+    Features,
+    RequestHandler,
+    Response,
+    register_preference,
+    register_rh,
+)
+from .exceptions import (
+    CertificateVerifyError,
+    HTTPError,
+    IncompleteRead,
+    ProxyError,
+    SSLError,
+    TransportError,
+    UnsupportedRequest,
+)
+from ..compat import functools
+from ..dependencies import brotli, h2
+from ..socks import ProxyError as SocksProxyError
+from ..utils import int_or_none
+
+if h2 is None:
+    raise ImportError('h2 is not installed')
+
+h2_version = tuple(int_or_none(x, default=0) for x in h2.__version__.split('.'))
+if h2_version < (4, 0):
+    raise ImportError('Only h2>=4.0 is supported')
+
+import h2.config
+import h2.connection
+import h2.errors
+import h2.events
+import h2.exceptions
+import h2.settings
+
+SUPPORTED_ENCODINGS = ['gzip', 'deflate']
+CONTENT_DECODE_ERRORS = [zlib.error]
+
+if brotli:
+    SUPPORTED_ENCODINGS.append('br')
+    CONTENT_DECODE_ERRORS.append(brotli.error)
+
+# Connection-specific headers are not allowed in HTTP/2
+# https://datatracker.ietf.org/doc/html/rfc9113#section-8.2.2
+_CONNECTION_HEADERS = {'connection', 'host', 'keep-alive', 'proxy-connection', 'te', 'transfer-encoding', 'upgrade'}
+
+
+class StreamResetError(ConnectionError):
+    pass
+
+
+class RefusedStreamError(StreamResetError):
+    """The server did not process the stream, so the request can be sent again"""
+
+
+class NotH2Error(Exception):
+    """The server did not negotiate HTTP/2"""
+
+
+class H2Stream:
+    def __init__(self, stream_id):
+        self.id = stream_id
+        self.headers = None
+        # (data, flow controlled length) received and not read yet
+        self.chunks = collections.deque()
+        self.ended = False
+        self.error = None
+
+
+class H2Connection:
+    """
+    HTTP/2 connection over TLS, on which the requests of several threads are multiplexed
+
+    The TLS layer runs over memory BIOs, so that the socket is only read by the reader thread
+    and the TLS and HTTP/2 states are only accessed with the lock held
+
+    @param sock             Connected socket
+    @param ssl_context      SSLContext offering h2 with ALPN
+    @param server_hostname  Hostname to check the certificate against
+    """
+
+    # Receive windows, which bound the data buffered for the responses that are not read
+    _STREAM_WINDOW = 4 * 1024 * 1024
+    _CONNECTION_WINDOW = 16 * 1024 * 1024
+
+    def __init__(self, sock, ssl_context, server_hostname):
+        self._sock = sock
+        self._incoming, self._outgoing = ssl.MemoryBIO(), ssl.MemoryBIO()
+        self._tls = ssl_context.wrap_bio(self._incoming, self._outgoing, server_hostname=server_hostname)
+        self._handshake()
+        if self._tls.selected_alpn_protocol() != 'h2':
+            raise NotH2Error(f'{server_hostname} did not negotiate HTTP/2')
+
+        self._cond = threading.Condition(threading.Lock())
+        self._streams = {}
+        self._error = None
+        self._closing = False
+        self._h2 = h2.connection.H2Connection(h2.config.H2Configuration(client_side=True, header_encoding=None))
+        self._h2.local_settings = h2.settings.Settings(client=True, initial_values={
+            h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: self._STREAM_WINDOW,
+            h2.settings.SettingCodes.ENABLE_PUSH: 0,
+        })
+        self._h2.initiate_connection()
+        self._h2.increment_flow_control_window(
+            self._CONNECTION_WINDOW - self._h2.inbound_flow_control_window)
+        with self._cond:
+            self._flush()
+        threading.Thread(target=self._read_loop, name=f'h2-{server_hostname}', daemon=True).start()
+
+    def _handshake(self):
+        while True:
+            try:
+                self._tls.do_handshake()
+                break
+            except ssl.SSLWantReadError:
+                self._sock.sendall(self._outgoing.read())
+                data = self._sock.recv(65536)
+                if not data:
+                    raise ssl.SSLEOFError('EOF occurred during the TLS handshake')
+                self._incoming.write(data)
+        self._sock.sendall(self._outgoing.read())
+
+    def _flush(self):
+        data = self._h2.data_to_send()
+        if data:
+            self._tls.write(data)
+        data = self._outgoing.read()
+        if data:
+            self._sock.sendall(data)
+
+    def _read_tls(self):
+        chunks = []
+        while True:
+            try:
+                data = self._tls.read(65536)
+            except ssl.SSLWantReadError:
+                break
+            except ssl.SSLZeroReturnError:
+                raise ConnectionResetError('The server closed the connection')
+            if not data:
+                break
+            chunks.append(data)
+        return b''.join(chunks)
+
+    def _read_loop(self):
+        try:
+            while True:
+                try:
+                    data = self._sock.recv(65536)
+                except socket.timeout:
+                    if self._error:
+                        return
+                    continue
+                if not data:
+                    raise ConnectionResetError('The server closed the connection')
+                with self._cond:
+                    if self._error:
+                        return
+                    self._incoming.write(data)
+                    data = self._read_tls()
+                    if data:
+                        self._handle_events(self._h2.receive_data(data))
+                    self._flush()
+        except (OSError, h2.exceptions.H2Error) as e:
+            with self._cond:
+                self._fail(e)
+
+    def _fail(self, error):
+        if self._error is None:
+            self._error = error
+        for stream in self._streams.values():
+            stream.error = stream.error or error
+        self._cond.notify_all()
+
+    def _handle_events(self, events):
+        for event in events:
+            if isinstance(event, h2.events.ConnectionTerminated):
+                self._closing = True
+                for stream in self._streams.values():
+                    if event.last_stream_id is None or stream.id > event.last_stream_id:
+                        stream.error = RefusedStreamError('The server is closing the connection')
+                continue
+
+            stream = self._streams.get(getattr(event, 'stream_id', None))
+            if isinstance(event, h2.events.DataReceived):
+                if stream is None:
+                    self._h2.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                else:
+                    stream.chunks.append((event.data, event.flow_controlled_length))
+            elif stream is None:
+                continue
+            elif isinstance(event, h2.events.ResponseReceived):
+                stream.headers = event.headers
+            elif isinstance(event, h2.events.StreamEnded):
+                stream.ended = True
+            elif isinstance(event, h2.events.StreamReset):
+                error_class = (
+                    RefusedStreamError if event.error_code == h2.errors.ErrorCodes.REFUSED_STREAM else StreamResetError)
+                stream.error = error_class(f'Stream reset by the server: {event.error_code!r}')
+        self._cond.notify_all()
+
+    def _wait(self, predicate, timeout):
+        if not self._cond.wait_for(predicate, timeout):
+            raise socket.timeout('timed out')
+
+    @property
+    def usable(self):
+        return not (self._error or self._closing)
+
+    @property
+    def idle(self):
+        return not self._streams
+
+    def open_stream(self, headers, end_stream):
+        """@returns a new stream with the headers sent, or None if no more streams can be opened"""
+        with self._cond:
+            if self._error:
+                raise self._error
+            if (self._closing or self._h2.open_outbound_streams
+                    >= self._h2.remote_settings.max_concurrent_streams):
+                return None
+            stream = H2Stream(self._h2.get_next_available_stream_id())
+            self._h2.send_headers(stream.id, headers, end_stream=end_stream)
+            self._streams[stream.id] = stream
+            self._flush()
+            return stream
+
+    def send_body(self, stream, body, timeout):
+        window = functools.partial(self._h2.local_flow_control_window, stream.id)
+        for chunk in body:
+            while chunk:
+                with self._cond:
+                    self._wait(lambda: stream.error or window() > 0, timeout)
+                    if stream.error:
+                        raise stream.error
+                    size = min(len(chunk), window(), self._h2.max_outbound_frame_size)
+                    self._h2.send_data(stream.id, chunk[:size])
+                    self._flush()
+                chunk = chunk[size:]
+        with self._cond:
+            self._h2.end_stream(stream.id)
+            self._flush()
+
+    def get_response_headers(self, stream, timeout):
+        with self._cond:
+            self._wait(lambda: stream.headers is not None or stream.error, timeout)
+            if stream.headers is None:
+                self._streams.pop(stream.id, None)
+                raise stream.error
+            return stream.headers
+
+    def read_chunk(self, stream, timeout):
+        """@returns the next data of the stream, or b'' at its end"""
+        with self._cond:
+            while True:
+                self._wait(lambda: stream.chunks or stream.ended or stream.error, timeout)
+                if stream.chunks:
+                    data, length = stream.chunks.popleft()
+                    # The window is only opened again as the data is read
+                    self._h2.acknowledge_received_data(length, stream.id)
+                    self._flush()
+                    if data:
+                        return data
+                elif stream.ended:
+                    self._streams.pop(stream.id, None)
+                    return b''
+                else:
+                    self._streams.pop(stream.id, None)
+                    raise stream.error
+
+    def close_stream(self, stream):
+        with self._cond:
+            if self._streams.pop(stream.id, None) is None or self._error:
+                return
+            for _, length in stream.chunks:
+                self._h2.acknowledge_received_data(length, stream.id)
+            stream.chunks.clear()
+            if not stream.ended:
+                try:
+                    self._h2.reset_stream(stream.id, h2.errors.ErrorCodes.CANCEL)
+                except h2.exceptions.StreamClosedError:
+                    pass
+            try:
+                self._flush()
+            except OSError as e:
+                self._fail(e)
+
+    def close(self):
+        with self._cond:
+            if self._error is None:
+                try:
+                    self._h2.close_connection()
+                    self._flush()
+                except (OSError, h2.exceptions.H2Error):
+                    pass
+            self._fail(ConnectionAbortedError('The connection was closed'))
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+
+class H2ResponseReader(io.RawIOBase):
+    def __init__(self, conn, stream, timeout, content_encoding=None, content_length=None):
+        self._conn, self._stream, self._timeout = conn, stream, timeout
+        # [encoding, decoder], in the order they are applied
+        self._decoders = []
+        for encoding in reversed([e.strip() for e in (content_encoding or '').lower().split(',')]):
+            if encoding == 'gzip':
+                self._decoders.append([encoding, zlib.decompressobj(zlib.MAX_WBITS | 16)])
+            elif encoding == 'deflate':
+                # zlib or raw deflate, as found from the first byte
+                self._decoders.append([encoding, None])
+            elif encoding == 'br' and brotli:
+                self._decoders.append([encoding, brotli.Decompressor()])
+        self._pending = b''
+        self._received = 0
+        self._content_length = None if self._decoders else content_length
+
+    def readable(self):
+        return True
+
+    def _decode(self, data, final=False):
+        for decoder in self._decoders:
+            encoding, obj = decoder
+            if encoding == 'br':
+                data = obj.process(data) if data else b''
+                continue
+            if obj is None:
+                if not data:
+                    continue
+                obj = decoder[1] = zlib.decompressobj(zlib.MAX_WBITS if data[0] & 0x0F == 8 else -zlib.MAX_WBITS)
+            data = obj.decompress(data) + (obj.flush() if final else b'')
+        return data
+
+    def readinto(self, buffer):
+        while not self._pending:
+            if self._stream is None:
+                return 0
+            try:
+                data = self._conn.read_chunk(self._stream, self._timeout)
+            except ConnectionError as e:
+                if self._content_length is not None and self._received < self._content_length:
+                    raise IncompleteRead(
+                        partial=self._received, expected=self._content_length - self._received, cause=e) from e
+                raise
+            self._received += len(data)
+            if not data:
+                self._stream = None
+            self._pending = self._decode(data, final=not data)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        if self._stream is not None:
+            self._conn.close_stream(self._stream)
+            self._stream = None
+        super().close()
+
+
+def _make_transport_error(e):
+    if isinstance(e, ssl.SSLCertVerificationError):
+        return CertificateVerifyError(cause=e)
+    elif isinstance(e, ssl.SSLError):
+        return SSLError(cause=e)
+    elif isinstance(e, SocksProxyError):
+        return ProxyError(cause=e)
+    return TransportError(cause=e)
+
+
+class H2ResponseAdapter(Response):
+    def read(self, amt: int = None):
+        try:
+            return self.fp.read(-1 if amt is None else amt)
+        except (OSError, h2.exceptions.H2Error, *CONTENT_DECODE_ERRORS) as e:
+            raise _make_transport_error(e) from e
+
+    def readinto(self, buffer):
+        try:
+            return self.fp.readinto(buffer)
+        except (OSError, h2.exceptions.H2Error, *CONTENT_DECODE_ERRORS) as e:
+            raise _make_transport_error(e) from e
+
+
+def _body_chunks(data):
+    if data is None:
+        return ()
+    elif isinstance(data, bytes):
+        return (data, )
+    elif hasattr(data, 'read'):
+        return iter(functools.partial(data.read, 65536), b'')
+    return data
+
+
+@register_rh
+class H2RH(RequestHandler):
+    """
+    HTTP/2 request handler, multiplexing the concurrent requests to a host on one connection
+    https://github.com/python-hyper/h2
+
+    HTTP/2 is only used over TLS, when the server negotiates it with ALPN.
+    The hosts that do not are remembered, and not accepted by this handler again;
+    the request that found out, or that is redirected to such a host or to http://,
+    is left to the other request handlers by raising UnsupportedRequest
+    """
+    _SUPPORTED_URL_SCHEMES = ('https',)
+    _SUPPORTED_ENCODINGS = tuple(SUPPORTED_ENCODINGS)
+    _SUPPORTED_PROXY_SCHEMES = ('socks4', 'socks4a', 'socks5', 'socks5h')
+    _SUPPORTED_FEATURES = (Features.NO_PROXY, Features.ALL_PROXY)
+    RH_NAME = 'h2'
+
+    _MAX_REDIRECTS = 10
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        # (host, port, proxy) => [H2Connection]
+        self._connections = {}
+        self._connection_locks = {}
+        # (host, port) of the servers that do not support HTTP/2
+        self._http1_hosts = set()
+        self._stats = collections.Counter()
+
+    def _debug(self, msg):
+        if self.verbose:
+            self._logger.stdout(f'h2: {msg}')
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, {}
+        for conn in (conn for conns in connections.values() for conn in conns):
+            conn.close()
+        if self._stats['connections']:
+            self._debug('{connections} connections opened, {streams} requests sent'.format_map(self._stats))
+
+    def _check_extensions(self, extensions):
+        super()._check_extensions(extensions)
+        extensions.pop('cookiejar', None)
+        extensions.pop('timeout', None)
+
+    @staticmethod
+    def _host_key(url):
+        parsed = urllib.parse.urlparse(url)
+        return parsed.hostname, parsed.port or 443
+
+    def _validate(self, request):
+        super()._validate(request)
+        if self._host_key(request.url) in self._http1_hosts:
+            raise UnsupportedRequest('The server does not support HTTP/2')
+
+    @functools.cached_property
+    def _ssl_context(self):
+        context = self._make_sslcontext()
+        context.set_alpn_protocols(['h2', 'http/1.1'])
+        return context
+
+    def _connect(self, host, port, proxy, timeout):
+        create_conn_kwargs = {
+            'source_address': (self.source_address, 0) if self.source_address else None,
+            'resolver': self.resolver,
+            'timeout': timeout,
+        }
+        if proxy:
+            socks_proxy_options = make_socks_proxy_opts(proxy)
+            sock = create_connection(
+                address=(socks_proxy_options['addr'], socks_proxy_options['port']),
+                _create_socket_func=functools.partial(
+                    create_socks_proxy_socket, (host, port), socks_proxy_options),
+                **create_conn_kwargs)
+        else:
+            sock = create_connection(address=(host, port), **create_conn_kwargs)
+        try:
+            conn = H2Connection(sock, self._ssl_context, host)
+        except BaseException:
+            sock.close()
+            raise
+        self._stats['connections'] += 1
+        self._debug(f'Connected to {host}:{port}')
+        return conn
+
+    def _open_stream(self, host, port, proxy, headers, end_stream, timeout):
+        key = (host, port, proxy)
+        with self._lock:
+            key_lock = self._connection_locks.setdefault(key, threading.Lock())
+        # Connecting with the lock held makes concurrent requests wait for the connection and share it
+        with key_lock:
+            connections = self._connections.setdefault(key, [])
+            for conn in connections[:]:
+                if not conn.usable:
+                    if conn.idle:
+                        conn.close()
+                        connections.remove(conn)
+                    continue
+                stream = conn.open_stream(headers, end_stream)
+                if stream:
+                    return conn, stream
+            conn = self._connect(host, port, proxy, timeout)
+            stream = conn.open_stream(headers, end_stream)
+            if not stream:
+                # The server sent GOAWAY right away, or does not allow any stream
+                conn.close()
+                raise TransportError(f'{host}:{port} refused to open a stream on a new connection')
+            connections.append(conn)
+            return conn, stream
+
+    def _request(self, url, method, headers, data, cookiejar, proxies, timeout):
+        parsed = urllib.parse.urlparse(url)
+        host, port = self._host_key(url)
+        h2_headers = [
+            (':method', method),
+            (':authority', headers.get('Host') or parsed.netloc.rpartition('@')[2]),
+            (':scheme', 'https'),
+            (':path', urllib.parse.urlunparse(('', '', parsed.path or '/', parsed.params, parsed.query, ''))),
+        ]
+        h2_headers.extend(
+            (name.lower(), value) for name, value in headers.items() if name.lower() not in _CONNECTION_HEADERS)
+        if 'Cookie' not in headers:
+            cookie_header = cookiejar.get_cookie_header(url)
+            if cookie_header:
+                h2_headers.append(('cookie', cookie_header))
+        if isinstance(data, bytes) and 'Content-Length' not in headers:
+            h2_headers.append(('content-length', str(len(data))))
+
+        proxy = select_proxy(url, proxies)
+        # Requests refused by the server were not processed, and can be sent again if their body can
+        retries = 1 if data is None or isinstance(data, bytes) else 0
+        while True:
+            conn, stream = self._open_stream(host, port, proxy, h2_headers, data is None, timeout)
+            self._stats['streams'] += 1
+            self._debug(f'stream {stream.id}: {method} {url}')
+            try:
+                if data is not None:
+                    conn.send_body(stream, _body_chunks(data), timeout)
+                response_headers = conn.get_response_headers(stream, timeout)
+            except RefusedStreamError:
+                conn.close_stream(stream)
+                if not retries:
+                    raise
+                retries -= 1
+                continue
+            except BaseException:
+                conn.close_stream(stream)
+                raise
+            break
+
+        status, fields = None, []
+        for name, value in response_headers:
+            name, value = name.decode('latin-1'), value.decode('latin-1')
+            if name == ':status':
+                status = int(value)
+            elif not name.startswith(':'):
+                fields.append((name, value))
+        self._debug(f'stream {stream.id}: {status}')
+
+        headers = Message()
+        for name, value in fields:
+            headers[name] = value
+        cookiejar.extract_cookies(
+            urllib.response.addinfourl(io.BytesIO(), headers, url, status), urllib.request.Request(url))
+
+        reader = H2ResponseReader(
+            conn, stream, timeout, headers.get('Content-Encoding'), int_or_none(headers.get('Content-Length')))
+        return H2ResponseAdapter(reader, url=url, headers=headers, status=status)
+
+    def _send(self, request):
+        timeout = float(request.extensions.get('timeout') or self.timeout)
+        cookiejar = request.extensions.get('cookiejar') or self.cookiejar
+        proxies = request.proxies or self.proxies
+        headers = self._merge_headers(request.headers)
+        add_accept_encoding_header(headers, SUPPORTED_ENCODINGS)
+        url, method, data = request.url, request.method, request.data
+
+        for _ in range(self._MAX_REDIRECTS + 1):
+            # The request is sent again from the start by the next request handler
+            if urllib.parse.urlparse(url).scheme != 'https':
+                raise UnsupportedRequest(f'Redirected to an unsupported url scheme: {url}')
+            elif self._host_key(url) in self._http1_hosts:
+                raise UnsupportedRequest('The server does not support HTTP/2')
+            try:
+                response = self._request(url, method, headers, data, cookiejar, proxies, timeout)
+            except NotH2Error:
+                self._debug(f'{self._host_key(url)[0]} does not support HTTP/2')
+                self._http1_hosts.add(self._host_key(url))
+                raise UnsupportedRequest('The server does not support HTTP/2')
+            except (OSError, h2.exceptions.H2Error) as e:
+                raise _make_transport_error(e) from e
+
+            location = response.get_header('Location')
+            if response.status not in (301, 302, 303, 307, 308) or not location:
+                if not 200 <= response.status < 300:
+                    raise HTTPError(response)
+                return response
+            response.close()
+
+            url = urllib.parse.urljoin(url, location)
+            new_method = get_redirect_method(method, response.status)
+            # The cookies are added again for the new url
+            remove_headers = ['Cookie']
+            # only remove payload if method changed (e.g. POST to GET)
+            if new_method != method:
+                data = None
+                remove_headers.extend(['Content-Length', 'Content-Type'])
+            for name in remove_headers:
+                headers.pop(name, None)
+            method = new_method
+
+        raise HTTPError(response, redirect_loop=True)
+
+
+@register_preference(H2RH)
+def h2_preference(rh, request):
+    return 200
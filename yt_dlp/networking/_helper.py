@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import collections
 import contextlib
 import functools
+import itertools
+import queue
 import socket
 import ssl
 import sys
+import threading
+import time
 import typing
 import urllib.parse
 import urllib.request
@@ -165,31 +170,73 @@ def make_ssl_context(
 
 
 class InstanceStoreMixin:
+    """
+    Stores the instances made by _create_instance for reuse, by their kwargs
+
+    Set _MAX_INSTANCES to close the least recently used instances once there are more
+    """
+    _MAX_INSTANCES = None
+
     def __init__(self, **kwargs):
-        self.__instances = []
+        # Hashable key -> (kwargs, instance), from the least to the most recently used
+        self.__instances = collections.OrderedDict()
+        # (kwargs, instance) that cannot be hashed, which are compared one by one
+        self.__unhashable_instances = []
+        self.__instances_lock = threading.RLock()
         super().__init__(**kwargs)  # So that both MRO works
 
     @staticmethod
     def _create_instance(**kwargs):
         raise NotImplementedError
 
+    @classmethod
+    def _instance_key(cls, value):
+        """@returns a hashable key that is equal for equal values. Raises TypeError if there is none"""
+        if isinstance(value, dict):
+            return dict, frozenset((k, cls._instance_key(v)) for k, v in value.items())
+        elif isinstance(value, (list, tuple)):
+            return type(value), tuple(map(cls._instance_key, value))
+        elif isinstance(value, (set, frozenset)):
+            return frozenset, frozenset(map(cls._instance_key, value))
+        hash(value)
+        return value
+
     def _get_instance(self, **kwargs):
-        for key, instance in self.__instances:
-            if key == kwargs:
+        try:
+            key = self._instance_key(kwargs)
+        except TypeError:
+            key = None
+
+        with self.__instances_lock:
+            if key is None:
+                for instance_kwargs, instance in self.__unhashable_instances:
+                    if instance_kwargs == kwargs:
+                        return instance
+            elif key in self.__instances:
+                self.__instances.move_to_end(key)
+                return self.__instances[key][1]
+
+            instance = self._create_instance(**kwargs)
+            if key is None:
+                self.__unhashable_instances.append((kwargs, instance))
                 return instance
 
-        instance = self._create_instance(**kwargs)
-        self.__instances.append((kwargs, instance))
-        return instance
+            self.__instances[key] = (kwargs, instance)
+            while self._MAX_INSTANCES is not None and len(self.__instances) > self._MAX_INSTANCES:
+                _, (_, old_instance) = self.__instances.popitem(last=False)
+                self._close_instance(old_instance)
+            return instance
 
     def _close_instance(self, instance):
         if callable(getattr(instance, 'close', None)):
             instance.close()
 
     def _clear_instances(self):
-        for _, instance in self.__instances:
-            self._close_instance(instance)
-        self.__instances.clear()
+        with self.__instances_lock:
+            for _, instance in (*self.__instances.values(), *self.__unhashable_instances):
+                self._close_instance(instance)
+            self.__instances.clear()
+            self.__unhashable_instances.clear()
 
 
 def add_accept_encoding_header(headers: HTTPHeaderDict, supported_encodings: Iterable[str]):
@@ -242,18 +289,141 @@ def create_socks_proxy_socket(dest_addr, proxy_args, proxy_ip_addr, timeout, sou
         raise
 
 
+def _connect_to_addresses(ip_addrs, timeout, source_address, create_socket_func):
+    err = None
+    for ip_addr in ip_addrs:
+        try:
+            sock = create_socket_func(ip_addr, timeout, source_address)
+            # Explicitly break __traceback__ reference cycle
+            # https://bugs.python.org/issue36820
+            err = None
+            return sock
+        except OSError as e:
+            err = e
+
+    try:
+        raise err
+    finally:
+        # Explicitly break __traceback__ reference cycle
+        # https://bugs.python.org/issue36820
+        err = None
+
+
+class Resolver:
+    """
+    Resolves host addresses and connects to them, for create_connection
+
+    @param cache_ttl    Seconds to cache the addresses of a host for. None = no caching.
+                        The cached addresses are discarded when none of them can be connected to
+    @param happy_eyeballs_delay  If given, the connection attempts to the addresses are raced
+                        as described by RFC 8305: the addresses are interleaved by family, and
+                        the next attempt is started after this many seconds or once the previous
+                        one fails. The first connection to succeed is used
+    @param getaddrinfo  Function used to resolve the addresses, with the signature of socket.getaddrinfo
+    """
+    # Recommended by RFC 8305, section 5
+    DEFAULT_HAPPY_EYEBALLS_DELAY = 0.25
+    _MAX_CACHE_ENTRIES = 256
+
+    def __init__(self, cache_ttl=None, happy_eyeballs_delay=None, getaddrinfo=None):
+        self.cache_ttl = cache_ttl
+        self.happy_eyeballs_delay = happy_eyeballs_delay
+        self._getaddrinfo = getaddrinfo or socket.getaddrinfo
+        # (host, port) -> (expiry time, addresses), from the least to the most recently used
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, host, port):
+        if self.cache_ttl is None:
+            return self._getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+
+        key = host, port
+        with self._lock:
+            expiry, ip_addrs = self._cache.get(key, (0, None))
+            if expiry > time.monotonic():
+                self._cache.move_to_end(key)
+                return ip_addrs
+
+        ip_addrs = self._getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, ip_addrs)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._MAX_CACHE_ENTRIES:
+                self._cache.popitem(last=False)
+        return ip_addrs
+
+    def invalidate(self, host, port):
+        with self._lock:
+            self._cache.pop((host, port), None)
+
+    @staticmethod
+    def interleave(ip_addrs):
+        """Alternate between the address families, starting with the first address' (RFC 8305, section 4)"""
+        families = collections.OrderedDict()
+        for ip_addr in ip_addrs:
+            families.setdefault(ip_addr[0], []).append(ip_addr)
+        return [ip_addr for group in itertools.zip_longest(*families.values()) for ip_addr in group if ip_addr]
+
+    def connect(self, ip_addrs, timeout, source_address, create_socket_func):
+        if self.happy_eyeballs_delay is None or len(ip_addrs) < 2:
+            return _connect_to_addresses(ip_addrs, timeout, source_address, create_socket_func)
+
+        ip_addrs = self.interleave(ip_addrs)
+        results = queue.Queue()
+        lock = threading.Lock()
+        connected = []
+
+        def attempt(ip_addr):
+            try:
+                sock = create_socket_func(ip_addr, timeout, source_address)
+            except OSError as e:
+                results.put((None, e))
+                return
+            with lock:
+                if connected:
+                    # Another attempt won the race
+                    sock.close()
+                    return
+                connected.append(sock)
+            results.put((sock, None))
+
+        started = pending = 0
+        err = None
+        while True:
+            if started < len(ip_addrs):
+                threading.Thread(target=attempt, args=(ip_addrs[started],), daemon=True).start()
+                started += 1
+                pending += 1
+            try:
+                sock, e = results.get(timeout=self.happy_eyeballs_delay if started < len(ip_addrs) else None)
+            except queue.Empty:
+                continue
+            pending -= 1
+            if sock is not None:
+                return sock
+            err = e
+            if not pending and started == len(ip_addrs):
+                try:
+                    raise err
+                finally:
+                    err = None
+
+
 def create_connection(
     address,
     timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
     source_address=None,
     *,
+    resolver=None,
     _create_socket_func=_socket_connect
 ):
     # Work around socket.create_connection() which tries all addresses from getaddrinfo() including IPv6.
     # This filters the addresses based on the given source_address.
     # Based on: https://github.com/python/cpython/blob/main/Lib/socket.py#L810
     host, port = address
-    ip_addrs = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    ip_addrs = (
+        resolver.resolve(host, port) if resolver
+        else socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM))
     if not ip_addrs:
         raise OSError('getaddrinfo returns an empty list')
     if source_address is not None:
@@ -264,20 +434,11 @@ def create_connection(
                 f'No remote IPv{4 if af == socket.AF_INET else 6} addresses available for connect. '
                 f'Can\'t use "{source_address[0]}" as source address')
 
-    err = None
-    for ip_addr in ip_addrs:
-        try:
-            sock = _create_socket_func(ip_addr, timeout, source_address)
-            # Explicitly break __traceback__ reference cycle
-            # https://bugs.python.org/issue36820
-            err = None
-            return sock
-        except OSError as e:
-            err = e
-
+    if resolver is None:
+        return _connect_to_addresses(ip_addrs, timeout, source_address, _create_socket_func)
     try:
-        raise err
-    finally:
-        # Explicitly break __traceback__ reference cycle
-        # https://bugs.python.org/issue36820
-        err = None
+        return resolver.connect(ip_addrs, timeout, source_address, _create_socket_func)
+    except OSError:
+        # The host may have moved to other addresses
+        resolver.invalidate(host, port)
+        raise
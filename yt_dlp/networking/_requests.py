@@ -4,6 +4,7 @@
 import logging
 import re
 import socket
+import threading
 import warnings
 
 from ..dependencies import brotli, requests, urllib3
@@ -134,9 +135,22 @@ def __init__(self, res: requests.models.Response):
         self._requests_response = res
 
     def read(self, amt: int = None):
+        return self._read(self.fp.read, amt)
+
+    def readinto(self, buffer):
+        # read1 (urllib3 2.x) returns the data received so far instead of waiting for the whole
+        # buffer, so that it is not lost when the connection is dropped before the buffer is filled
+        read1 = getattr(self.fp, 'read1', None)
+        if read1 is None:
+            return super().readinto(buffer)
+        data = self._read(read1, len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def _read(self, read_fn, amt):
         try:
             # Interact with urllib3 response directly.
-            return self.fp.read(amt, decode_content=True)
+            return read_fn(amt, decode_content=True)
 
         # See urllib3.response.HTTPResponse.read() for exceptions raised on read
         except urllib3.exceptions.SSLError as e:
@@ -161,17 +175,21 @@ def read(self, amt: int = None):
 
 
 class RequestsHTTPAdapter(requests.adapters.HTTPAdapter):
-    def __init__(self, ssl_context=None, proxy_ssl_context=None, source_address=None, **kwargs):
+    def __init__(self, ssl_context=None, proxy_ssl_context=None, source_address=None, resolver=None, **kwargs):
         self._pm_args = {}
         if ssl_context:
             self._pm_args['ssl_context'] = ssl_context
         if source_address:
             self._pm_args['source_address'] = (source_address, 0)
         self._proxy_ssl_context = proxy_ssl_context or ssl_context
+        self._resolver = resolver
         super().__init__(**kwargs)
 
     def init_poolmanager(self, *args, **kwargs):
-        return super().init_poolmanager(*args, **kwargs, **self._pm_args)
+        super().init_poolmanager(*args, **kwargs, **self._pm_args)
+        if self._resolver is not None:
+            # Only the direct connections are made with the resolver
+            self.poolmanager.pool_classes_by_scheme = make_resolver_pool_classes(self._resolver)
 
     def proxy_manager_for(self, proxy, **proxy_kwargs):
         extra_kwargs = {}
@@ -184,6 +202,72 @@ def cert_verify(*args, **kwargs):
         pass
 
 
+class ResolverHTTPConnection(urllib3.connection.HTTPConnection):
+    """Connects using the resolver of the class (see make_resolver_pool_classes)"""
+    _resolver = None
+
+    def _new_conn(self):
+        try:
+            sock = create_connection(
+                (self._dns_host, self.port), self.timeout, self.source_address, resolver=self._resolver)
+        except (socket.timeout, TimeoutError) as e:
+            raise urllib3.exceptions.ConnectTimeoutError(
+                self, f'Connection to {self.host} timed out. (connect timeout={self.timeout})') from e
+        except OSError as e:
+            raise urllib3.exceptions.NewConnectionError(
+                self, f'Failed to establish a new connection: {e}') from e
+        for option in self.socket_options or ():
+            sock.setsockopt(*option)
+        return sock
+
+
+class ResolverHTTPSConnection(ResolverHTTPConnection, urllib3.connection.HTTPSConnection):
+    pass
+
+
+def make_resolver_pool_classes(resolver):
+    """@returns urllib3 connection pool classes by scheme, whose connections use the resolver"""
+    return {
+        scheme: type(pool_class.__name__, (pool_class,), {
+            'ConnectionCls': type(conn_class.__name__, (conn_class,), {'_resolver': resolver}),
+        }) for scheme, pool_class, conn_class in (
+            ('http', urllib3.HTTPConnectionPool, ResolverHTTPConnection),
+            ('https', urllib3.HTTPSConnectionPool, ResolverHTTPSConnection))
+    }
+
+
+class SharedHTTPAdapters:
+    """
+    Process-wide store of RequestsHTTPAdapters, so that the handlers with the same connection
+    settings share their connection pools. Each adapter is closed once it is no longer used
+    """
+    # Maximum number of hosts with a connection pool, and of connections kept per host
+    POOL_CONNECTIONS = 32
+    POOL_MAXSIZE = 10
+
+    _adapters = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def acquire(cls, key, create_adapter):
+        with cls._lock:
+            if key not in cls._adapters:
+                cls._adapters[key] = [create_adapter(
+                    pool_connections=cls.POOL_CONNECTIONS, pool_maxsize=cls.POOL_MAXSIZE), 0]
+            cls._adapters[key][1] += 1
+            return cls._adapters[key][0]
+
+    @classmethod
+    def release(cls, key):
+        with cls._lock:
+            entry = cls._adapters[key]
+            entry[1] -= 1
+            if entry[1]:
+                return
+            del cls._adapters[key]
+        entry[0].close()
+
+
 class RequestsSession(requests.sessions.Session):
     """
     Ensure unified redirect method handling with our urllib redirect handler.
@@ -247,9 +331,13 @@ class RequestsRH(RequestHandler, InstanceStoreMixin):
     _SUPPORTED_PROXY_SCHEMES = ('http', 'https', 'socks4', 'socks4a', 'socks5', 'socks5h')
     _SUPPORTED_FEATURES = (Features.NO_PROXY, Features.ALL_PROXY)
     RH_NAME = 'requests'
+    # Sessions only differ by their cookiejar, and share the connection pools
+    _MAX_INSTANCES = 8
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._adapter = None
+        self._adapter_lock = threading.Lock()
 
         # Forward urllib3 debug messages to our logger
         logger = logging.getLogger('urllib3')
@@ -271,19 +359,37 @@ def __init__(self, *args, **kwargs):
 
     def close(self):
         self._clear_instances()
+        with self._adapter_lock:
+            if self._adapter is not None:
+                SharedHTTPAdapters.release(self._adapter_key)
+                self._adapter = None
 
     def _check_extensions(self, extensions):
         super()._check_extensions(extensions)
         extensions.pop('cookiejar', None)
         extensions.pop('timeout', None)
 
+    @property
+    def _adapter_key(self):
+        return (
+            self.verify, self.legacy_ssl_support, self.prefer_system_certs,
+            tuple(sorted(self._client_cert.items())), self.source_address, self.resolver)
+
+    def _get_adapter(self):
+        with self._adapter_lock:
+            if self._adapter is None:
+                self._adapter = SharedHTTPAdapters.acquire(
+                    self._adapter_key, lambda **kwargs: RequestsHTTPAdapter(
+                        ssl_context=self._make_sslcontext(),
+                        source_address=self.source_address,
+                        resolver=self.resolver,
+                        max_retries=urllib3.util.retry.Retry(False),
+                        **kwargs))
+            return self._adapter
+
     def _create_instance(self, cookiejar):
         session = RequestsSession()
-        http_adapter = RequestsHTTPAdapter(
-            ssl_context=self._make_sslcontext(),
-            source_address=self.source_address,
-            max_retries=urllib3.util.retry.Retry(False),
-        )
+        http_adapter = self._get_adapter()
         session.adapters.clear()
         session.headers = requests.models.CaseInsensitiveDict({'Connection': 'keep-alive'})
         session.mount('https://', http_adapter)
@@ -292,6 +398,11 @@ def _create_instance(self, cookiejar):
         session.trust_env = False  # no need, we already load proxies from env
         return session
 
+    def _close_instance(self, session):
+        # The adapter is shared, and closed by close()
+        session.adapters.clear()
+        session.close()
+
     def _send(self, request):
 
         headers = self._merge_headers(request.headers)
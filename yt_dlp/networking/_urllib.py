@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import collections
 import functools
 import http.client
 import io
+import select
 import ssl
+import threading
+import time
 import urllib.error
 import urllib.parse
 import urllib.request
@@ -51,11 +55,11 @@
     CONTENT_DECODE_ERRORS.append(brotli.error)
 
 
-def _create_http_connection(http_class, source_address, *args, **kwargs):
+def _create_http_connection(http_class, source_address, resolver, *args, **kwargs):
     hc = http_class(*args, **kwargs)
 
     if hasattr(hc, '_create_connection'):
-        hc._create_connection = create_connection
+        hc._create_connection = functools.partial(create_connection, resolver=resolver)
 
     if source_address is not None:
         hc.source_address = (source_address, 0)
@@ -63,6 +67,97 @@ def _create_http_connection(http_class, source_address, *args, **kwargs):
     return hc
 
 
+class HTTPConnectionPool:
+    """
+    Idle HTTP(S) connections kept open to be reused by later requests
+
+    The connections are keyed by scheme, host, port, proxy and tunnel;
+    the TLS configuration is that of the HTTPHandler owning the pool
+
+    @param maxsize          Maximum number of idle connections kept per key
+    @param idle_timeout     Time in seconds after which idle connections are closed
+    """
+
+    def __init__(self, maxsize=10, idle_timeout=30):
+        self.maxsize, self.idle_timeout = maxsize, idle_timeout
+        self._lock = threading.Lock()
+        # key => deque of (connection, time it became idle), the most recent last
+        self._idle = collections.defaultdict(collections.deque)
+        self._closed = False
+        self.stats = collections.Counter()
+
+    def count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    @staticmethod
+    def _is_dropped(conn):
+        # An idle connection is readable only if the server closed it (or sent unexpected data)
+        try:
+            return conn.sock is None or bool(select.select([conn.sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+    def _expire(self, now):
+        for key, idle in list(self._idle.items()):
+            while idle and now - idle[0][1] >= self.idle_timeout:
+                idle.popleft()[0].close()
+                self.stats['expired'] += 1
+            if not idle:
+                del self._idle[key]
+
+    def get(self, key):
+        """@returns an idle connection for the key, or None"""
+        with self._lock:
+            self._expire(time.monotonic())
+            idle = self._idle.get(key)
+            while idle:
+                conn, _ = idle.pop()
+                if not self._is_dropped(conn):
+                    self.stats['reused'] += 1
+                    return conn
+                conn.close()
+                self.stats['dropped'] += 1
+        return None
+
+    def put(self, key, conn):
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            idle = self._idle[key]
+            if not self._closed and conn.sock is not None and len(idle) < self.maxsize:
+                idle.append((conn, now))
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+
+
+class PooledHTTPResponse(http.client.HTTPResponse):
+    """HTTPResponse that returns its connection to the pool once the body has been read completely"""
+
+    _release_conn = None
+    _closing = False
+
+    def close(self):
+        self._closing = True
+        super().close()
+
+    def _close_conn(self):
+        # Called at the end of the body, or when the response is closed before that
+        complete = self.length == 0 or self.chunked and not self._closing
+        super()._close_conn()
+        release, self._release_conn = self._release_conn, None
+        if release:
+            release(complete)
+
+
 class HTTPHandler(urllib.request.AbstractHTTPHandler):
     """Handler for HTTP requests and responses.
 
@@ -78,30 +173,103 @@ class HTTPHandler(urllib.request.AbstractHTTPHandler):
     public domain.
     """
 
-    def __init__(self, context=None, source_address=None, *args, **kwargs):
+    def __init__(self, context=None, source_address=None, *args, pool=None, resolver=None, **kwargs):
         super().__init__(*args, **kwargs)
         self._source_address = source_address
         self._context = context
+        # If a HTTPConnectionPool is given, connections are kept alive and reused
+        self._pool = pool
+        self._resolver = resolver
 
-    @staticmethod
-    def _make_conn_class(base, req):
+    def _make_conn_class(self, base, req):
         conn_class = base
         socks_proxy = req.headers.pop('Ytdl-socks-proxy', None)
         if socks_proxy:
-            conn_class = make_socks_conn_class(conn_class, socks_proxy)
+            conn_class = make_socks_conn_class(conn_class, socks_proxy, self._resolver)
         return conn_class
 
+    @staticmethod
+    def _pool_key(req):
+        return req.type, req.host, req._tunnel_host, req.headers.get('Ytdl-socks-proxy')
+
     def http_open(self, req):
+        key = self._pool_key(req)
         conn_class = self._make_conn_class(http.client.HTTPConnection, req)
         return self.do_open(functools.partial(
-            _create_http_connection, conn_class, self._source_address), req)
+            _create_http_connection, conn_class, self._source_address, self._resolver), req, pool_key=key)
 
     def https_open(self, req):
+        key = self._pool_key(req)
         conn_class = self._make_conn_class(http.client.HTTPSConnection, req)
         return self.do_open(
             functools.partial(
-                _create_http_connection, conn_class, self._source_address),
-            req, context=self._context)
+                _create_http_connection, conn_class, self._source_address, self._resolver),
+            req, pool_key=key, context=self._context)
+
+    def do_open(self, http_class, req, pool_key=None, **http_conn_args):
+        if self._pool is None:
+            return super().do_open(http_class, req, **http_conn_args)
+
+        # Based on AbstractHTTPHandler.do_open, but without "Connection: close"
+        host = req.host
+        if not host:
+            raise urllib.error.URLError('no host given')
+
+        headers = dict(req.unredirected_hdrs)
+        headers.update({k: v for k, v in req.headers.items() if k not in headers})
+        headers = {name.title(): val for name, val in headers.items()}
+        tunnel_headers = {}
+        if req._tunnel_host and 'Proxy-Authorization' in headers:
+            # Proxy-Authorization should not be sent to origin server
+            tunnel_headers['Proxy-Authorization'] = headers.pop('Proxy-Authorization')
+        # A request whose body is a stream cannot be sent again
+        can_resend = req.data is None or isinstance(req.data, bytes)
+
+        while True:
+            h = self._pool.get(pool_key)
+            reused = h is not None
+            if reused:
+                h.timeout = req.timeout
+                h.sock.settimeout(req.timeout)
+            else:
+                h = http_class(host, timeout=req.timeout, **http_conn_args)
+                h.set_debuglevel(self._debuglevel)
+                h.response_class = PooledHTTPResponse
+                if req._tunnel_host:
+                    h.set_tunnel(req._tunnel_host, headers=tunnel_headers)
+                self._pool.count('created')
+
+            try:
+                try:
+                    h.request(req.get_method(), req.selector, req.data, headers,
+                              encode_chunked=req.has_header('Transfer-encoding'))
+                except OSError as err:  # timeout error
+                    if reused and can_resend and isinstance(err, (ConnectionResetError, BrokenPipeError)):
+                        raise
+                    raise urllib.error.URLError(err)
+                r = h.getresponse()
+            except (ConnectionResetError, BrokenPipeError):
+                h.close()
+                # The server closed the idle connection; the request is sent again with a new one
+                if reused and can_resend:
+                    self._pool.count('dropped')
+                    continue
+                raise
+            except BaseException:
+                h.close()
+                raise
+            break
+
+        if not r.will_close:
+            r._release_conn = lambda complete: self._pool.put(pool_key, h) if complete else h.close()
+
+        r.url = req.get_full_url()
+        r.msg = r.reason
+        return r
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
 
     @staticmethod
     def deflate(data):
@@ -179,7 +347,7 @@ def http_response(self, req, resp):
     https_response = http_response
 
 
-def make_socks_conn_class(base_class, socks_proxy):
+def make_socks_conn_class(base_class, socks_proxy, resolver=None):
     assert issubclass(base_class, (
         http.client.HTTPConnection, http.client.HTTPSConnection))
 
@@ -193,6 +361,7 @@ def connect(self):
                 (proxy_args['addr'], proxy_args['port']),
                 timeout=self.timeout,
                 source_address=self.source_address,
+                resolver=resolver,
                 _create_socket_func=functools.partial(
                     create_socks_proxy_socket, (self.host, self.port), proxy_args))
             if isinstance(self, http.client.HTTPSConnection):
@@ -312,6 +481,13 @@ def read(self, amt=None):
             handle_response_read_exceptions(e)
             raise e
 
+    def readinto(self, buffer):
+        try:
+            return self.fp.readinto(buffer)
+        except Exception as e:
+            handle_response_read_exceptions(e)
+            raise e
+
 
 def handle_sslerror(e: ssl.SSLError):
     if not isinstance(e, ssl.SSLError):
@@ -338,11 +514,16 @@ class UrllibRH(RequestHandler, InstanceStoreMixin):
     _SUPPORTED_FEATURES = (Features.NO_PROXY, Features.ALL_PROXY)
     RH_NAME = 'urllib'
 
+    # Maximum number of idle connections kept open per host, and for how long (seconds)
+    _POOL_MAXSIZE = 10
+    _POOL_IDLE_TIMEOUT = 30
+
     def __init__(self, *, enable_file_urls: bool = False, **kwargs):
         super().__init__(**kwargs)
         self.enable_file_urls = enable_file_urls
         if self.enable_file_urls:
             self._SUPPORTED_URL_SCHEMES = (*self._SUPPORTED_URL_SCHEMES, 'file')
+        self._connection_stats = collections.Counter()
 
     def _check_extensions(self, extensions):
         super()._check_extensions(extensions)
@@ -356,7 +537,9 @@ def _create_instance(self, proxies, cookiejar):
             HTTPHandler(
                 debuglevel=int(bool(self.verbose)),
                 context=self._make_sslcontext(),
-                source_address=self.source_address),
+                source_address=self.source_address,
+                pool=HTTPConnectionPool(self._POOL_MAXSIZE, self._POOL_IDLE_TIMEOUT),
+                resolver=self.resolver),
             HTTPCookieProcessor(cookiejar),
             DataHandler(),
             UnknownHandler(),
@@ -378,6 +561,19 @@ def _create_instance(self, proxies, cookiejar):
         opener.addheaders = []
         return opener
 
+    def _close_instance(self, opener):
+        for handler in opener.handlers:
+            if isinstance(handler, HTTPHandler) and handler._pool is not None:
+                handler.close()
+                self._connection_stats.update(handler._pool.stats)
+
+    def close(self):
+        self._clear_instances()
+        if self.verbose and self._connection_stats['created']:
+            self._logger.stdout(
+                'urllib: HTTP connections: {created} opened, {reused} reused, '
+                '{dropped} dropped by the server, {expired} expired'.format_map(self._connection_stats))
+
     def _send(self, request):
         headers = self._merge_headers(request.headers)
         add_accept_encoding_header(headers, SUPPORTED_ENCODINGS)
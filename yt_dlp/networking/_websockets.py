@@ -115,6 +115,7 @@ def _send(self, request):
         wsuri = parse_uri(request.url)
         create_conn_kwargs = {
             'source_address': (self.source_address, 0) if self.source_address else None,
+            'resolver': self.resolver,
             'timeout': timeout
         }
         proxy = select_proxy(request.url, request.proxies or self.proxies or {})
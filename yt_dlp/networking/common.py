@@ -112,6 +112,11 @@ def send(self, request: Request) -> Response:
             self._print_verbose(f'Sending request via "{handler.RH_NAME}"')
             try:
                 response = handler.send(request)
+            except UnsupportedRequest as e:
+                self._print_verbose(
+                    f'"{handler.RH_NAME}" cannot handle this request (reason: {error_to_str(e)})')
+                unsupported_errors.append(e)
+                continue
             except RequestError:
                 raise
             except Exception as e:
@@ -162,7 +167,8 @@ class RequestHandler(abc.ABC):
     Any other exception raised will be treated as a handler issue.
 
     If a Request is not supported by the handler, an UnsupportedRequest
-    should be raised with a reason.
+    should be raised with a reason. When only found out while sending it,
+    the Request is then passed on to the next handler.
 
     By default, some checks are done on the request in _validate() based on the following class variables:
     - `_SUPPORTED_URL_SCHEMES`: a tuple of supported url schemes.
@@ -188,6 +194,8 @@ class RequestHandler(abc.ABC):
             dict with {client_certificate, client_certificate_key, client_certificate_password}
     @param verify: Verify SSL certificates
     @param legacy_ssl_support: Enable legacy SSL options such as legacy server connect and older cipher support.
+    @param resolver: Resolver (see networking/_helper.py) used to resolve and connect to hosts, e.g. to cache DNS
+            lookups. By default, the addresses are looked up for every connection and tried one after another.
 
     Some configuration options may be available for individual Requests too. In this case,
     either the Request configuration option takes precedence or they are merged.
@@ -228,6 +236,7 @@ def __init__(
         client_cert: dict[str, str | None] = None,
         verify: bool = True,
         legacy_ssl_support: bool = False,
+        resolver=None,
         **_,
     ):
 
@@ -242,6 +251,7 @@ def __init__(
         self._client_cert = client_cert or {}
         self.verify = verify
         self.legacy_ssl_support = legacy_ssl_support
+        self.resolver = resolver
         super().__init__()
 
     def _make_sslcontext(self):
@@ -518,6 +528,12 @@ def read(self, amt: int = None) -> bytes:
         except Exception as e:
             raise TransportError(cause=e) from e
 
+    def readinto(self, buffer) -> int:
+        # Subclasses whose response can be read into a buffer directly should redefine this method
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
     def close(self):
         self.fp.close()
         return super().close()
@@ -521,6 +521,20 @@ def _alias_callback(option, opt_str, value, parser, opts, nargs):
         action='store_const', const='::', dest='source_address',
         help='Make all connections via IPv6',
     )
+    network.add_option(
+        '--dns-cache-ttl',
+        dest='dns_cache_ttl', type=float, default=None, metavar='SECONDS',
+        help='Cache the resolved addresses of hosts for this many seconds. By default, they are resolved for every connection')
+    network.add_option(
+        '--happy-eyeballs',
+        action='store_true', dest='happy_eyeballs', default=False,
+        help=(
+            'When a host has several addresses, start connecting to the next one if the previous has not connected '
+            'within 250ms, alternating between IPv6 and IPv4 (RFC 8305). By default, they are tried one after another'))
+    network.add_option(
+        '--no-happy-eyeballs',
+        action='store_false', dest='happy_eyeballs',
+        help='Try the addresses of a host one after another (default)')
     network.add_option(
         '--enable-file-urls', action='store_true',
         dest='enable_file_urls', default=False,
@@ -667,6 +681,18 @@ def _alias_callback(option, opt_str, value, parser, opts, nargs):
         '--no-download-archive',
         dest='download_archive', action="store_const", const=None,
         help='Do not use archive file (default)')
+    selection.add_option(
+        '--download-archive-backend', metavar='BACKEND',
+        dest='download_archive_backend', default=None,
+        help=(
+            'How the --download-archive file is stored. One of "text" (default) - a plain-text file '
+            'that is loaded into memory on startup, "compact" - the same file, but kept in memory as hashes '
+            'using much less memory for large archives, or "sqlite" - an indexed database that is queried on demand '
+            'and can be safely shared by concurrent processes'))
+    selection.add_option(
+        '--import-download-archive', metavar='FILE',
+        dest='import_download_archive', default=None,
+        help='Add the IDs from a plain-text archive file to the --download-archive before starting')
     selection.add_option(
         '--max-downloads',
         dest='max_downloads', metavar='NUMBER', type=int, default=None,
@@ -892,6 +918,20 @@ def _alias_callback(option, opt_str, value, parser, opts, nargs):
         '-N', '--concurrent-fragments',
         dest='concurrent_fragment_downloads', metavar='N', default=1, type=int,
         help='Number of fragments of a dash/hlsnative video that should be downloaded concurrently (default is %default)')
+    downloader.add_option(
+        '--max-concurrent-fragments',
+        dest='max_concurrent_fragment_downloads', metavar='N', default=None, type=int,
+        help=(
+            'Adjust the number of fragments downloaded concurrently between --concurrent-fragments and N, '
+            'based on the measured download speed and errors (e.g. HTTP 429). By default, the number is fixed'))
+    downloader.add_option(
+        '--fragment-engine',
+        metavar='ENGINE', dest='fragment_engine', default='threads', choices=('threads', 'asyncio'),
+        help=(
+            'How the fragments of dash/hlsnative videos are downloaded concurrently. One of "threads" (default; '
+            'one thread per fragment) or "asyncio" (all fragments from one thread, so --concurrent-fragments '
+            'can be in the hundreds). "asyncio" does not adjust the concurrency, and falls back to "threads" '
+            'when a proxy, rate limit or live stream requires it'))
     downloader.add_option(
         '-r', '--limit-rate', '--rate-limit',
         dest='ratelimit', metavar='RATE',
@@ -941,6 +981,13 @@ def _alias_callback(option, opt_str, value, parser, opts, nargs):
         '--no-keep-fragments',
         action='store_false', dest='keep_fragments',
         help='Delete downloaded fragments after downloading is finished (default)')
+    downloader.add_option(
+        '--fragment-memory-limit',
+        dest='fragment_memory_limit', metavar='SIZE', default=None,
+        help=(
+            'Maximum size of downloaded fragments of dash/hlsnative videos to hold in memory until they are '
+            'written to the output file, e.g. 100M (default is 64M). Any further fragments are downloaded to disk. '
+            'Use 0 to always download fragments to disk'))
     downloader.add_option(
         '--buffer-size',
         dest='buffersize', metavar='SIZE', default='1024',
@@ -959,6 +1006,12 @@ def _alias_callback(option, opt_str, value, parser, opts, nargs):
         help=(
             'Size of a chunk for chunk-based HTTP downloading, e.g. 10485760 or 10M (default is disabled). '
             'May be useful for bypassing bandwidth throttling imposed by a webserver (experimental)'))
+    downloader.add_option(
+        '--http-connections',
+        dest='http_connections', metavar='N', default=1, type=int,
+        help=(
+            'Number of connections to download a file over HTTP with, each downloading a part of it (default is %default). '
+            'Only used for servers that support range requests'))
     downloader.add_option(
         '--test',
         action='store_true', dest='test', default=False,
@@ -983,6 +1036,13 @@ def _alias_callback(option, opt_str, value, parser, opts, nargs):
         '--no-lazy-playlist',
         action='store_false', dest='lazy_playlist',
         help='Process videos in the playlist only after the entire playlist is parsed (default)')
+    downloader.add_option(
+        '--concurrent-extractions',
+        dest='concurrent_extractions', metavar='N', default=1, type=int,
+        help=(
+            'Number of playlist entries to extract concurrently, ahead of the one being processed (default is %default). '
+            'The entries are still downloaded one at a time and in order, '
+            'but the messages of the extractions running ahead are interleaved with their output'))
     downloader.add_option(
         '--xattr-set-filesize',
         dest='xattr_set_filesize', action='store_true',
@@ -1421,6 +1481,17 @@ def _alias_callback(option, opt_str, value, parser, opts, nargs):
         '--no-clean-info-json', '--no-clean-infojson',
         action='store_false', dest='clean_infojson',
         help='Write all fields to the infojson')
+    filesystem.add_option(
+        '--json-lines',
+        action='store_true', dest='json_lines', default=False,
+        help=(
+            'Write playlists to the infojson and with --dump-single-json as JSON Lines: '
+            'the playlist with "entries" set to null on the first line, followed by a line for each entry. '
+            '--dump-single-json then writes the entries as soon as they are processed'))
+    filesystem.add_option(
+        '--no-json-lines',
+        action='store_false', dest='json_lines',
+        help='Write playlists as a single JSON object (default)')
     filesystem.add_option(
         '--write-comments', '--get-comments',
         action='store_true', dest='getcomments', default=False,
@@ -1459,6 +1530,17 @@ def _alias_callback(option, opt_str, value, parser, opts, nargs):
         '--no-cookies-from-browser',
         action='store_const', const=None, dest='cookiesfrombrowser',
         help='Do not load cookies from browser (default)')
+    filesystem.add_option(
+        '--cookies-from-browser-cache',
+        action='store_true', dest='cookiesfrombrowser_cache', default=False,
+        help=(
+            'Keep the cookies loaded with --cookies-from-browser in the cache directory, '
+            'and only read the browser\'s database again when it has been modified. '
+            'Decrypted cookies are stored unencrypted, in files only readable by the current user'))
+    filesystem.add_option(
+        '--no-cookies-from-browser-cache',
+        action='store_false', dest='cookiesfrombrowser_cache',
+        help='Load the cookies from the browser every time (default)')
     filesystem.add_option(
         '--cache-dir', dest='cachedir', default=None, metavar='DIR',
         help=(
@@ -1467,6 +1549,24 @@ def _alias_callback(option, opt_str, value, parser, opts, nargs):
     filesystem.add_option(
         '--no-cache-dir', action='store_false', dest='cachedir',
         help='Disable filesystem caching')
+    filesystem.add_option(
+        '--cache-max-size',
+        dest='cache_max_size', metavar='SIZE', default=None,
+        help=(
+            'Maximum total size of the cache files, e.g. 50K or 10M (default is unlimited). '
+            'The least recently used files are removed when it is exceeded'))
+    filesystem.add_option(
+        '--cache-ttl',
+        dest='cache_ttl', metavar='[SECTION:]DURATION', default={}, type='str',
+        action='callback', callback=_dict_from_options_callback,
+        callback_kwargs={
+            'allowed_keys': r'[\w.-]+',
+            'default_key': 'default',
+            'process_key': None,
+        }, help=(
+            'Time after which the cache entries expire, e.g. 86400 or 24h (default is never), '
+            'optionally prefixed by the cache section to apply it to (e.g. youtube-nsig). '
+            'This option can be used multiple times to set the expiry of different sections'))
     filesystem.add_option(
         '--rm-cache-dir',
         action='store_true', dest='rm_cachedir',
@@ -187,8 +187,15 @@ def preferredencoding():
     return pref
 
 
-def write_json_file(obj, fn):
-    """ Encode obj as JSON and write it to fn, atomically if possible """
+def write_json_file(obj, fn, mode=0o666, encoder=None):
+    """
+    Encode obj as JSON and write it to fn, atomically if possible
+
+    @param mode     The permissions of the file, before the umask is applied
+    @param encoder  A function that yields the JSON of obj in chunks
+    """
+    if encoder is None:
+        encoder = json.JSONEncoder(ensure_ascii=False).iterencode
 
     tf = tempfile.NamedTemporaryFile(
         prefix=f'{os.path.basename(fn)}.', dir=os.path.dirname(fn),
@@ -196,7 +203,7 @@ def write_json_file(obj, fn):
 
     try:
         with tf:
-            json.dump(obj, tf, ensure_ascii=False)
+            tf.writelines(encoder(obj))
         if sys.platform == 'win32':
             # Need to remove existing file on Windows, else os.rename raises
             # WindowsError or FileExistsError.
@@ -205,7 +212,7 @@ def write_json_file(obj, fn):
         with contextlib.suppress(OSError):
             mask = os.umask(0)
             os.umask(mask)
-            os.chmod(tf.name, 0o666 & ~mask)
+            os.chmod(tf.name, mode & ~mask)
         os.rename(tf.name, fn)
     except Exception:
         with contextlib.suppress(OSError):
@@ -5196,9 +5203,18 @@ class FormatSorter:
         'extractor_preference': {'type': 'alias', 'field': 'ie_pref', 'deprecated': True},
     }
 
+    # Maximum number of ranks of values of the ordered fields (e.g. "avc1.64001F" for vcodec) that are
+    # remembered. They are shared by all the sorters of the process, see _rank_ordered_value
+    _RANK_CACHE_SIZE = 4096
+
     def __init__(self, ydl, field_preference):
         self.ydl = ydl
         self._order = []
+        # evaluate_params updates the settings, so each sorter has its own copy. This allows
+        # a sorter to be reused for many videos, even when others are created in between
+        self.settings = {field: dict(setting) for field, setting in self.settings.items()}
+        self._order_tables = {}
+        self._field_plans = {}
         self.evaluate_params(self.ydl.params, field_preference)
         if ydl.params.get('verbose'):
             self.print_verbose_info(self.ydl.write_debug)
@@ -5238,17 +5254,7 @@ def _resolve_field_value(self, field, value, convertNone=False):
         elif conversion == 'bytes':
             return parse_bytes(value)
         elif conversion == 'order':
-            order_list = (self._use_free_order and self._get_field_setting(field, 'order_free')) or self._get_field_setting(field, 'order')
-            use_regex = self._get_field_setting(field, 'regex')
-            list_length = len(order_list)
-            empty_pos = order_list.index('') if '' in order_list else list_length + 1
-            if use_regex and value is not None:
-                for i, regex in enumerate(order_list):
-                    if regex and re.match(regex, value):
-                        return list_length - i
-                return list_length - empty_pos  # not in list
-            else:  # not regex or  value = None
-                return list_length - (order_list.index(value) if value in order_list else empty_pos)
+            return self._rank_ordered_value(*self._get_order_table(field), value)
         else:
             if value.isnumeric():
                 return float(value)
@@ -5256,6 +5262,27 @@ def _resolve_field_value(self, field, value, convertNone=False):
                 self.settings[field]['convert'] = 'string'
                 return value
 
+    def _get_order_table(self, field):
+        """@returns (order list as a tuple, whether it is made of regexes)"""
+        table = self._order_tables.get(field)
+        if table is None:
+            order_list = (self._use_free_order and self._get_field_setting(field, 'order_free')) or self._get_field_setting(field, 'order')
+            table = self._order_tables[field] = tuple(order_list), bool(self._get_field_setting(field, 'regex'))
+        return table
+
+    @staticmethod
+    @functools.lru_cache(maxsize=_RANK_CACHE_SIZE)
+    def _rank_ordered_value(order_list, use_regex, value):
+        list_length = len(order_list)
+        empty_pos = order_list.index('') if '' in order_list else list_length + 1
+        if use_regex and value is not None:
+            for i, regex in enumerate(order_list):
+                if regex and re.match(regex, value):
+                    return list_length - i
+            return list_length - empty_pos  # not in list
+        else:  # not regex or  value = None
+            return list_length - (order_list.index(value) if value in order_list else empty_pos)
+
     def evaluate_params(self, params, sort_extractor):
         self._use_free_order = params.get('prefer_free_formats', False)
         self._sort_user = params.get('format_sort', [])
@@ -5325,25 +5352,54 @@ def print_verbose_info(self, write_debug):
             if self._get_field_setting(field, 'limit_text') is not None else '')
             for field in self._order if self._get_field_setting(field, 'visible')]))
 
+    def get_sort_key(self, format):
+        """@returns {field: preference} of the visible fields, in the order they are compared"""
+        return {
+            field: preference for field, preference in zip(self._order, self.calculate_preference(format))
+            if self._get_field_setting(field, 'visible')}
+
+    def print_sort_keys(self, write_debug, formats):
+        write_debug('Sort keys of the formats, from worst to best:')
+        for format in formats:
+            write_debug('  %s: %s' % (format.get('format_id'), ' '.join(
+                f'{field}={",".join(map(str, preference))}'
+                for field, preference in self.get_sort_key(format).items())))
+
+    def _get_field_plan(self, field):
+        """
+        The settings of the field that are used for calculating the preferences. They do not
+        change once the sort order is evaluated, so they are looked up only once per field
+        """
+        plan = self._field_plans.get(field)
+        if plan is None:
+            type = self._get_field_setting(field, 'type')
+            # Not part of the plan since it can change, but filled in for _calculate_field_preference_from_value
+            self._get_field_setting(field, 'convert')
+            if type == 'multiple':
+                source = tuple(self._get_field_setting(f, 'field') for f in self._get_field_setting(field, 'field'))
+            else:
+                source = self._get_field_setting(field, 'field')
+            plan = self._field_plans[field] = (
+                type, source, self._get_field_setting(field, 'function'),
+                *(self._get_field_setting(field, key) for key in (
+                    'reverse', 'closest', 'limit', 'max', 'in_list', 'not_in_list', 'default')))
+        return plan
+
     def _calculate_field_preference_from_value(self, format, field, type, value):
-        reverse = self._get_field_setting(field, 'reverse')
-        closest = self._get_field_setting(field, 'closest')
-        limit = self._get_field_setting(field, 'limit')
+        _, _, _, reverse, closest, limit, maximum, in_list, not_in_list, default = self._get_field_plan(field)
 
         if type == 'extractor':
-            maximum = self._get_field_setting(field, 'max')
             if value is None or (maximum is not None and value >= maximum):
                 value = -1
         elif type == 'boolean':
-            in_list = self._get_field_setting(field, 'in_list')
-            not_in_list = self._get_field_setting(field, 'not_in_list')
             value = 0 if ((in_list is None or value in in_list) and (not_in_list is None or value not in not_in_list)) else -1
         elif type == 'ordered':
             value = self._resolve_field_value(field, value, True)
 
         # try to convert to number
-        val_num = float_or_none(value, default=self._get_field_setting(field, 'default'))
-        is_num = self._get_field_setting(field, 'convert') != 'string' and val_num is not None
+        val_num = float_or_none(value, default=default)
+        # The conversion can change to 'string' while sorting, see _resolve_field_value
+        is_num = val_num is not None and self.settings[field]['convert'] != 'string'
         if is_num:
             value = val_num
 
@@ -5355,15 +5411,12 @@ def _calculate_field_preference_from_value(self, format, field, type, value):
                 else (-1, value, 0))
 
     def _calculate_field_preference(self, format, field):
-        type = self._get_field_setting(field, 'type')  # extractor, boolean, ordered, field, multiple
-        get_value = lambda f: format.get(self._get_field_setting(f, 'field'))
+        type, source, function, *_ = self._get_field_plan(field)  # extractor, boolean, ordered, field, multiple
         if type == 'multiple':
             type = 'field'  # Only 'field' is allowed in multiple for now
-            actual_fields = self._get_field_setting(field, 'field')
-
-            value = self._get_field_setting(field, 'function')(get_value(f) for f in actual_fields)
+            value = function(format.get(f) for f in source)
         else:
-            value = get_value(field)
+            value = format.get(source)
         return self._calculate_field_preference_from_value(format, field, type, value)
 
     def calculate_preference(self, format):
@@ -26,7 +26,7 @@ def __init__(self, initial: int):
         self._last_update = self._start_time
 
         self._lock = threading.Lock()
-        self._thread_sizes: dict[int, int] = {}
+        self._thread_sizes: dict = {}
 
         self._times = [self._start_time]
         self._downloaded = [self.downloaded]
@@ -43,20 +43,29 @@ def total(self, value: int | None):
 
             self._total = value
 
-    def thread_reset(self):
-        current_thread = threading.get_ident()
+    def thread_reset(self, key=None):
+        """Count the sizes given by the current thread, or with the given key, from 0 again"""
         with self._lock:
-            self._thread_sizes[current_thread] = 0
-
-    def update(self, size: int | None):
+            if key is None:
+                self._thread_sizes[threading.get_ident()] = 0
+            else:
+                self._thread_sizes.pop(key, None)
+
+    def update(self, size: int | None, key=None):
+        """
+        @param size     Bytes downloaded so far by the current thread
+        @param key      Tracks the size separately from the current thread's
+                        (e.g. for downloads done concurrently in one thread)
+        """
         if not size:
             return
 
-        current_thread = threading.get_ident()
+        if key is None:
+            key = threading.get_ident()
 
         with self._lock:
-            last_size = self._thread_sizes.get(current_thread, 0)
-            self._thread_sizes[current_thread] = size
+            last_size = self._thread_sizes.get(key, 0)
+            self._thread_sizes[key] = size
             self._update(size - last_size)
 
     def _update(self, size: int):